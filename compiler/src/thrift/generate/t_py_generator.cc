@@ -449,6 +449,9 @@ void t_py_generator::init_generator() {
            << render_includes() << endl
            << "from thrift.transport import TTransport" << endl
            << import_dynbase_;
+  if (gen_asyncio_) {
+    f_types_ << "from thrift.aio import TAsyncioOffload" << endl;
+  }
 
   f_types_ << "all_structs = []" << endl;
 
@@ -1012,7 +1015,15 @@ void t_py_generator::generate_py_struct_reader(ostream& out, t_struct* tstruct)
               << id << ".thrift_spec is not None:" << endl;
   indent_up();
 
-  if (is_immutable(tstruct)) {
+  if (gen_asyncio_) {
+    // Large frames may be decoded in an executor, see TAsyncioOffload.
+    if (is_immutable(tstruct)) {
+      indent(out) << "return await TAsyncioOffload.fastDecode(None, iprot, [cls, cls.thrift_spec])" << endl;
+    } else {
+      indent(out) << "await TAsyncioOffload.fastDecode(self, iprot, [self.__class__, self.thrift_spec])" << endl;
+      indent(out) << "return" << endl;
+    }
+  } else if (is_immutable(tstruct)) {
     indent(out) << "return iprot._fast_decode(None, iprot, [cls, cls.thrift_spec])" << endl;
   } else {
     indent(out) << "iprot._fast_decode(self, iprot, [self.__class__, self.thrift_spec])" << endl;
@@ -1224,7 +1235,9 @@ void t_py_generator::generate_service(t_service* tservice) {
     f_service_ << "from tornado import gen" << endl;
     f_service_ << "from tornado import concurrent" << endl;
   } else if (gen_asyncio_) {
-    f_service_ << "from thrift.aio.TAsyncioThrift import TAsyncioApplicationException" << endl;
+    f_service_ << "from thrift.aio.TAsyncioThrift import TAsyncioApplicationException" << endl
+               << "from thrift.aio.TAsyncioClient import TAsyncioClient" << endl
+               << "from thrift.aio import TAsyncioOffload" << endl;
   }
 
   f_service_ << "all_structs = []" << endl;
@@ -1357,6 +1370,8 @@ void t_py_generator::generate_service_client(t_service* tservice) {
   } else {
     if (gen_zope_interface_ && (gen_newstyle_ || gen_dynamic_)) {
       extends_client = "(object)";
+    } else if (gen_asyncio_) {
+      extends_client = gen_client_only_ ? "(TAsyncioClient)" : "TAsyncioClient, ";
     }
   }
 
@@ -1402,6 +1417,8 @@ void t_py_generator::generate_service_client(t_service* tservice) {
                  << indent() << "self._reqs = {}" << endl
                  << indent() << "self._transport.io_loop.spawn_callback(self._start_receiving)"
                  << endl;
+    } else if (gen_asyncio_) {
+      f_service_ << indent() << "TAsyncioClient.__init__(self, iprot, oprot)" << endl;
     } else {
       f_service_ << indent() << "self._iprot = self._oprot = iprot" << endl
                  << indent() << "if oprot is not None:" << endl
@@ -1488,14 +1505,22 @@ void t_py_generator::generate_service_client(t_service* tservice) {
       indent(f_service_) << "self.send_" << funname << "(";
 
     } else if (gen_asyncio_) {
-      indent(f_service_) << "await self.send_" << funname << "(";
+      indent(f_service_);
+      if ((*f_iter)->is_oneway()) {
+        f_service_ << "await self._call_oneway(self.send_" << funname;
+      } else {
+        if (!(*f_iter)->get_returntype()->is_void()) {
+          f_service_ << "return ";
+        }
+        f_service_ << "await self._call(self.send_" << funname;
+      }
 
     } else {
       indent(f_service_) << "self.send_" << funname << "(";
     }
 
     bool first = true;
-    if (gen_twisted_) {
+    if (gen_twisted_ || gen_asyncio_) {
       // we need a leading comma if there are args, since it's called as maybeDeferred(funcname,
       // arg)
       first = false;
@@ -1512,7 +1537,7 @@ void t_py_generator::generate_service_client(t_service* tservice) {
     f_service_ << ")" << endl;
 
     if (!(*f_iter)->is_oneway()) {
-      if (gen_twisted_) {
+      if (gen_twisted_ || gen_asyncio_) {
         // nothing. See the next block.
       } else if (gen_tornado_) {
         indent(f_service_) << "return future" << endl;
@@ -1521,9 +1546,6 @@ void t_py_generator::generate_service_client(t_service* tservice) {
         if (!(*f_iter)->get_returntype()->is_void()) {
           f_service_ << "return ";
         }
-        if (gen_asyncio_) {
-          f_service_ << "await ";
-        }
         f_service_ << "self.recv_" << funname << "()" << endl;
       }
     }
@@ -1576,7 +1598,7 @@ void t_py_generator::generate_service_client(t_service* tservice) {
       f_service_ << indent() << "oprot = self._oprot_factory.getProtocol(self._transport)" << endl
                  << indent() << "oprot.writeMessageBegin('" << (*f_iter)->get_name() << "', "
                  << messageType << ", self._seqid)" << endl;
-    } else {
+    } else if (!gen_asyncio_) {
       f_service_ << indent() << "self._oprot.writeMessageBegin('" << (*f_iter)->get_name() << "', "
                  << messageType << ", self._seqid)" << endl;
     }
@@ -1592,13 +1614,14 @@ void t_py_generator::generate_service_client(t_service* tservice) {
     if (gen_twisted_ || gen_tornado_) {
       f_service_ << indent() << "args.write(oprot)" << endl << indent() << "oprot.writeMessageEnd()"
                  << endl << indent() << "oprot.trans.flush()" << endl;
+    } else if (gen_asyncio_) {
+      // The whole message is written at once, after args are encoded.
+      f_service_ << indent() << "await TAsyncioOffload.writeMessage(self._oprot, '"
+                 << (*f_iter)->get_name() << "', " << messageType << ", self._seqid, args)" << endl;
     } else {
       f_service_ << indent() << "args.write(self._oprot)" << endl << indent()
-                 << "self._oprot.writeMessageEnd()" << endl << indent();
-      if (gen_asyncio_) {
-        f_service_ << "await ";
-      }
-      f_service_ << "self._oprot.trans.flush()" << endl;
+                 << "self._oprot.writeMessageEnd()" << endl << indent()
+                 << "self._oprot.trans.flush()" << endl;
     }
 
     indent_down();
@@ -1607,8 +1630,8 @@ void t_py_generator::generate_service_client(t_service* tservice) {
       std::string resultname = (*f_iter)->get_name() + "_result";
       // Open function
       f_service_ << endl;
-      if (gen_twisted_ || gen_tornado_) {
-        f_service_ << indent() << "def recv_" << (*f_iter)->get_name()
+      if (gen_twisted_ || gen_tornado_ || gen_asyncio_) {
+        f_service_ << indent() << deftype << "recv_" << (*f_iter)->get_name()
                    << "(self, iprot, mtype, rseqid):" << endl;
       } else {
         t_struct noargs(program_);
@@ -1623,14 +1646,10 @@ void t_py_generator::generate_service_client(t_service* tservice) {
 
       if (gen_twisted_) {
         f_service_ << indent() << "d = self._reqs.pop(rseqid)" << endl;
-      } else if (gen_tornado_) {
+      } else if (gen_tornado_ || gen_asyncio_) {
       } else {
         f_service_ << indent() << "iprot = self._iprot" << endl << indent()
-                   << "(fname, mtype, rseqid) = ";
-        if (gen_asyncio_) {
-          f_service_ << "await ";
-        }
-        f_service_ << "iprot.readMessageBegin()" << endl;
+                   << "(fname, mtype, rseqid) = iprot.readMessageBegin()" << endl;
       }
 
       f_service_ << indent() << "if mtype == TMessageType.EXCEPTION:" << endl
@@ -1990,10 +2009,12 @@ void t_py_generator::generate_service_server(t_service* tservice) {
   f_service_ << endl;
 
   // Generate the server implementation
-  f_service_ << indent() << "def process(self, iprot, oprot):" << endl;
+  string deftype = gen_asyncio_ ? "async def " : "def ";
+  string await = gen_asyncio_ ? "await " : "";
+  f_service_ << indent() << deftype << "process(self, iprot, oprot):" << endl;
   indent_up();
 
-  f_service_ << indent() << "(name, type, seqid) = iprot.readMessageBegin()" << endl;
+  f_service_ << indent() << "(name, type, seqid) = " << await << "iprot.readMessageBegin()" << endl;
   f_service_ << indent() << "if self._on_message_begin:" << endl;
   indent_up();
     f_service_ << indent() << "self._on_message_begin(name, type, seqid)" << endl;
@@ -2004,8 +2025,8 @@ void t_py_generator::generate_service_server(t_service* tservice) {
   // HOT: dictionary function lookup
   f_service_ << indent() << "if name not in self._processMap:" << endl;
   indent_up();
-  f_service_ << indent() << "iprot.skip(TType.STRUCT)" << endl
-             << indent() << "iprot.readMessageEnd()" << endl
+  f_service_ << indent() << await << "iprot.skip(TType.STRUCT)" << endl
+             << indent() << await << "iprot.readMessageEnd()" << endl
              << indent()
              << "x = TApplicationException(TApplicationException.UNKNOWN_METHOD, 'Unknown "
                 "function %s' % (name))"
@@ -2013,7 +2034,7 @@ void t_py_generator::generate_service_server(t_service* tservice) {
              << indent() << "oprot.writeMessageBegin(name, TMessageType.EXCEPTION, seqid)" << endl
              << indent() << "x.write(oprot)" << endl
              << indent() << "oprot.writeMessageEnd()" << endl
-             << indent() << "oprot.trans.flush()" << endl;
+             << indent() << await << "oprot.trans.flush()" << endl;
 
   if (gen_twisted_) {
     f_service_ << indent() << "return defer.succeed(None)" << endl;
@@ -2028,8 +2049,8 @@ void t_py_generator::generate_service_server(t_service* tservice) {
     f_service_ << indent() << indent_str()
                << "return self._processMap[name](self, seqid, iprot, oprot)" << endl;
   } else {
-    f_service_ << indent() << indent_str() << "self._processMap[name](self, seqid, iprot, oprot)"
-               << endl;
+    f_service_ << indent() << indent_str() << await
+               << "self._processMap[name](self, seqid, iprot, oprot)" << endl;
 
     // Read end of args field, the T_STOP, and the struct close
     f_service_ << indent() << "return True" << endl;
@@ -2057,6 +2078,9 @@ void t_py_generator::generate_process_function(t_service* tservice, t_function*
   if (gen_tornado_) {
     f_service_ << indent() << "@gen.coroutine" << endl << indent() << "def process_"
                << tfunction->get_name() << "(self, seqid, iprot, oprot):" << endl;
+  } else if (gen_asyncio_) {
+    f_service_ << indent() << "async def process_" << tfunction->get_name()
+               << "(self, seqid, iprot, oprot):" << endl;
   } else {
     f_service_ << indent() << "def process_" << tfunction->get_name()
                << "(self, seqid, iprot, oprot):" << endl;
@@ -2066,9 +2090,11 @@ void t_py_generator::generate_process_function(t_service* tservice, t_function*
 
   string argsname = tfunction->get_name() + "_args";
   string resultname = tfunction->get_name() + "_result";
+  string await = gen_asyncio_ ? "await " : "";
 
-  f_service_ << indent() << "args = " << argsname << "()" << endl << indent() << "args.read(iprot)"
-             << endl << indent() << "iprot.readMessageEnd()" << endl;
+  f_service_ << indent() << "args = " << argsname << "()" << endl
+             << indent() << await << "args.read(iprot)" << endl
+             << indent() << await << "iprot.readMessageEnd()" << endl;
 
   t_struct* xs = tfunction->get_xceptions();
   const std::vector<t_field*>& xceptions = xs->get_members();
@@ -2262,7 +2288,7 @@ void t_py_generator::generate_process_function(t_service* tservice, t_function*
     if (!tfunction->is_oneway() && !tfunction->get_returntype()->is_void()) {
       f_service_ << "result.success = ";
     }
-    f_service_ << "self._handler." << tfunction->get_name() << "(";
+    f_service_ << await << "self._handler." << tfunction->get_name() << "(";
     bool first = true;
     for (f_iter = fields.begin(); f_iter != fields.end(); ++f_iter) {
       if (first) {
@@ -2305,12 +2331,17 @@ void t_py_generator::generate_process_function(t_service* tservice, t_function*
                  << indent() << indent_str()
                  << "result = TApplicationException(TApplicationException.INTERNAL_ERROR, "
                     "'Internal error')"
-                 << endl
-                 << indent() << "oprot.writeMessageBegin(\"" << tfunction->get_name()
-                 << "\", msg_type, seqid)" << endl
-                 << indent() << "result.write(oprot)" << endl
-                 << indent() << "oprot.writeMessageEnd()" << endl
-                 << indent() << "oprot.trans.flush()" << endl;
+                 << endl;
+      if (gen_asyncio_) {
+        f_service_ << indent() << "await TAsyncioOffload.writeMessage(oprot, \""
+                   << tfunction->get_name() << "\", msg_type, seqid, result)" << endl;
+      } else {
+        f_service_ << indent() << "oprot.writeMessageBegin(\"" << tfunction->get_name()
+                   << "\", msg_type, seqid)" << endl
+                   << indent() << "result.write(oprot)" << endl
+                   << indent() << "oprot.writeMessageEnd()" << endl
+                   << indent() << "oprot.trans.flush()" << endl;
+      }
     } else {
       f_service_ << indent() << "except Exception:" << endl
                  << indent() << indent_str() << "logging.exception('Exception in oneway handler')" << endl;
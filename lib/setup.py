@@ -111,6 +111,7 @@ def run_setup(with_binary):
               'thriftx.aio',
               'thriftx.aio.protocol',
               'thriftx.aio.transport',
+              'thriftx.aio.server',
           ],
           classifiers=[
               'Development Status :: 5 - Production/Stable',
@@ -0,0 +1,243 @@
+"""A small service, written as the asyncio generator would write it.
+
+service Echo {
+  string echo(1: string s)
+  double sleep(1: double secs)
+  oneway void log(1: string msg)
+}
+"""
+
+import asyncio
+import logging
+
+from thriftx.aio import TAsyncioOffload
+from thriftx.aio.TAsyncioClient import TAsyncioClient
+from thriftx.aio.TAsyncioThrift import TAsyncioApplicationException
+from thriftx.Thrift import TApplicationException, TMessageType, TProcessor, TType
+from thriftx.transport import TTransport
+
+_readers = {
+    TType.STRING: "readString",
+    TType.DOUBLE: "readDouble",
+}
+_writers = {
+    TType.STRING: "writeString",
+    TType.DOUBLE: "writeDouble",
+}
+
+
+class Struct:
+    """Reads and writes the fields of its thrift_spec, like generated code."""
+
+    thrift_spec = ()
+
+    def __init__(self, *args):
+        fields = [spec for spec in self.thrift_spec if spec is not None]
+        for spec in fields:
+            setattr(self, spec[2], None)
+        for spec, value in zip(fields, args):
+            setattr(self, spec[2], value)
+
+    async def read(self, iprot):
+        if (
+            iprot._fast_decode is not None
+            and isinstance(iprot.trans, TTransport.CReadableTransport)
+        ):
+            await TAsyncioOffload.fastDecode(
+                self, iprot, [self.__class__, self.thrift_spec]
+            )
+            return
+        await iprot.readStructBegin()
+        while True:
+            (fname, ftype, fid) = await iprot.readFieldBegin()
+            if ftype == TType.STOP:
+                break
+            spec = self.thrift_spec[fid] if 0 <= fid < len(self.thrift_spec) else None
+            if spec is not None and spec[1] == ftype:
+                setattr(self, spec[2], await getattr(iprot, _readers[ftype])())
+            else:
+                await iprot.skip(ftype)
+            await iprot.readFieldEnd()
+        await iprot.readStructEnd()
+
+    def write(self, oprot):
+        if oprot._fast_encode is not None:
+            oprot.trans.write(
+                oprot._fast_encode(self, [self.__class__, self.thrift_spec])
+            )
+            return
+        oprot.writeStructBegin(self.__class__.__name__)
+        for spec in self.thrift_spec:
+            if spec is None or getattr(self, spec[2]) is None:
+                continue
+            oprot.writeFieldBegin(spec[2], spec[1], spec[0])
+            getattr(oprot, _writers[spec[1]])(getattr(self, spec[2]))
+            oprot.writeFieldEnd()
+        oprot.writeFieldStop()
+        oprot.writeStructEnd()
+
+    def __eq__(self, other):
+        return isinstance(other, self.__class__) and self.__dict__ == other.__dict__
+
+
+class echo_args(Struct):
+    thrift_spec = (None, (1, TType.STRING, "s", None, None))
+
+
+class echo_result(Struct):
+    thrift_spec = ((0, TType.STRING, "success", None, None),)
+
+
+class sleep_args(Struct):
+    thrift_spec = (None, (1, TType.DOUBLE, "secs", None, None))
+
+
+class sleep_result(Struct):
+    thrift_spec = ((0, TType.DOUBLE, "success", None, None),)
+
+
+class log_args(Struct):
+    thrift_spec = (None, (1, TType.STRING, "msg", None, None))
+
+
+class Client(TAsyncioClient):
+    async def echo(self, s):
+        return await self._call(self.send_echo, s)
+
+    async def send_echo(self, s):
+        await TAsyncioOffload.writeMessage(
+            self._oprot, "echo", TMessageType.CALL, self._seqid, echo_args(s)
+        )
+
+    async def recv_echo(self, iprot, mtype, rseqid):
+        return await self._recv(iprot, mtype, echo_result())
+
+    async def sleep(self, secs):
+        return await self._call(self.send_sleep, secs)
+
+    async def send_sleep(self, secs):
+        await TAsyncioOffload.writeMessage(
+            self._oprot, "sleep", TMessageType.CALL, self._seqid, sleep_args(secs)
+        )
+
+    async def recv_sleep(self, iprot, mtype, rseqid):
+        return await self._recv(iprot, mtype, sleep_result())
+
+    async def log(self, msg):
+        await self._call_oneway(self.send_log, msg)
+
+    async def send_log(self, msg):
+        await TAsyncioOffload.writeMessage(
+            self._oprot, "log", TMessageType.ONEWAY, self._seqid, log_args(msg)
+        )
+
+    async def _recv(self, iprot, mtype, result):
+        if mtype == TMessageType.EXCEPTION:
+            x = TAsyncioApplicationException()
+            await x.read(iprot)
+            await iprot.readMessageEnd()
+            raise x
+        await result.read(iprot)
+        await iprot.readMessageEnd()
+        if result.success is not None:
+            return result.success
+        raise TAsyncioApplicationException(
+            TAsyncioApplicationException.MISSING_RESULT, "unknown result"
+        )
+
+
+class Processor(TProcessor):
+    def __init__(self, handler):
+        self._handler = handler
+        self._processMap = {
+            "echo": Processor.process_echo,
+            "sleep": Processor.process_sleep,
+            "log": Processor.process_log,
+        }
+        self._on_message_begin = None
+
+    def on_message_begin(self, func):
+        self._on_message_begin = func
+
+    async def process(self, iprot, oprot):
+        (name, type, seqid) = await iprot.readMessageBegin()
+        if self._on_message_begin:
+            self._on_message_begin(name, type, seqid)
+        if name not in self._processMap:
+            await iprot.skip(TType.STRUCT)
+            await iprot.readMessageEnd()
+            x = TApplicationException(
+                TApplicationException.UNKNOWN_METHOD, "Unknown function %s" % (name)
+            )
+            oprot.writeMessageBegin(name, TMessageType.EXCEPTION, seqid)
+            x.write(oprot)
+            oprot.writeMessageEnd()
+            await oprot.trans.flush()
+            return
+        else:
+            await self._processMap[name](self, seqid, iprot, oprot)
+        return True
+
+    async def process_echo(self, seqid, iprot, oprot):
+        args = echo_args()
+        await args.read(iprot)
+        await iprot.readMessageEnd()
+        await self._reply(
+            oprot, "echo", seqid, echo_result(), self._handler.echo(args.s)
+        )
+
+    async def process_sleep(self, seqid, iprot, oprot):
+        args = sleep_args()
+        await args.read(iprot)
+        await iprot.readMessageEnd()
+        await self._reply(
+            oprot, "sleep", seqid, sleep_result(), self._handler.sleep(args.secs)
+        )
+
+    async def process_log(self, seqid, iprot, oprot):
+        args = log_args()
+        await args.read(iprot)
+        await iprot.readMessageEnd()
+        try:
+            await self._handler.log(args.msg)
+        except TTransport.TTransportException:
+            raise
+        except Exception:
+            logging.exception("Exception in oneway handler")
+
+    async def _reply(self, oprot, name, seqid, result, call):
+        try:
+            result.success = await call
+            msg_type = TMessageType.REPLY
+        except TTransport.TTransportException:
+            raise
+        except TApplicationException as ex:
+            msg_type = TMessageType.EXCEPTION
+            result = ex
+        except Exception:
+            logging.exception("Unexpected exception in handler")
+            msg_type = TMessageType.EXCEPTION
+            result = TApplicationException(
+                TApplicationException.INTERNAL_ERROR, "Internal error"
+            )
+        await TAsyncioOffload.writeMessage(oprot, name, msg_type, seqid, result)
+
+
+class Handler:
+    def __init__(self):
+        self.calls = 0
+        self.logged = []
+
+    async def echo(self, s):
+        self.calls += 1
+        if s == "fail":
+            raise TApplicationException(TApplicationException.UNKNOWN, "failed")
+        return s
+
+    async def sleep(self, secs):
+        self.calls += 1
+        await asyncio.sleep(secs)
+        return secs
+
+    async def log(self, msg):
+        self.logged.append(msg)
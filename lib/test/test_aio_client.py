@@ -0,0 +1,274 @@
+import asyncio
+import functools
+import unittest
+
+from aio_service import Client, Handler, Processor
+from thriftx.aio.protocol.TAsyncioBinaryProtocol import (
+    TAsyncioBinaryProtocol,
+    TAsyncioBinaryProtocolAccelerated,
+    TAsyncioBinaryProtocolAcceleratedFactory,
+    TAsyncioBinaryProtocolFactory,
+)
+from thriftx.aio.server.TAsyncioServer import TAsyncioServer
+from thriftx.aio.TAsyncioCachingClient import TAsyncioCachingClient
+from thriftx.aio.TAsyncioOffload import TAsyncioOffload
+from thriftx.aio.TAsyncioClient import deadline
+from thriftx.aio.transport.TAsyncioSocket import TAsyncioServerSocket, TAsyncioSocket
+from thriftx.aio.transport.TAsyncioTransport import (
+    TAsyncioFramedTransport,
+    TAsyncioFramedTransportFactory,
+)
+from thriftx.Thrift import TApplicationException
+from thriftx.transport.TTransport import TTransportException
+
+
+class ServerTestCase(unittest.IsolatedAsyncioTestCase):
+    """Serves aio_service.Processor, and connects self.client to it."""
+
+    protocol_class = TAsyncioBinaryProtocol
+    protocol_factory = TAsyncioBinaryProtocolFactory
+    transport_factory = TAsyncioFramedTransportFactory
+    handler_class = Handler
+
+    async def asyncSetUp(self):
+        self.handler = self.handler_class()
+        self.server = TAsyncioServer(
+            Processor(self.handler),
+            self.serverTransport(),
+            self.transport_factory(),
+            self.protocol_factory(),
+        )
+        self.configure(self.server)
+        self.serving = asyncio.ensure_future(self.server.serve())
+        while self.server.serverTransport.handle is None:
+            await asyncio.sleep(0.01)
+        self.port = self.server.serverTransport.handle.sockets[0].getsockname()[1]
+        self.trans, self.client = await self.connect()
+
+    def serverTransport(self):
+        return TAsyncioServerSocket("127.0.0.1", 0)
+
+    def configure(self, server):
+        pass
+
+    async def connect(self):
+        trans = TAsyncioFramedTransport(TAsyncioSocket("127.0.0.1", self.port))
+        await trans.open()
+        return trans, Client(self.protocol_class(trans))
+
+    async def asyncTearDown(self):
+        await self.trans.close()
+        self.server.stop()
+        await self.serving
+
+
+class TAsyncioClientTest(ServerTestCase):
+    async def test_call(self):
+        self.assertEqual(await self.client.echo("hello"), "hello")
+        self.assertEqual(await self.client.echo("again"), "again")
+
+    async def test_pipelined_calls(self):
+        values = ["value %d" % i for i in range(100)]
+        results = await asyncio.gather(*[self.client.echo(v) for v in values])
+        self.assertEqual(results, values)
+
+    async def test_replies_out_of_order(self):
+        slow = asyncio.ensure_future(self.client.sleep(0.2))
+        self.assertEqual(await self.client.echo("fast"), "fast")
+        self.assertFalse(slow.done())
+        self.assertEqual(await slow, 0.2)
+
+    async def test_application_exception(self):
+        with self.assertRaises(TApplicationException):
+            await self.client.echo("fail")
+        self.assertEqual(await self.client.echo("hello"), "hello")
+
+    async def test_oneway(self):
+        await self.client.log("message")
+        self.assertEqual(await self.client.echo("hello"), "hello")
+        self.assertEqual(self.handler.logged, ["message"])
+
+    async def test_connection_lost(self):
+        call = asyncio.ensure_future(self.client.sleep(5))
+        await asyncio.sleep(0.05)
+        self.server.stop()
+        with self.assertRaises((TTransportException, EOFError)):
+            await asyncio.wait_for(call, 5)
+
+
+class AcceleratedClientTest(TAsyncioClientTest):
+    """Decodes whole frames with fastbinary on both ends."""
+
+    protocol_class = TAsyncioBinaryProtocolAccelerated
+    protocol_factory = TAsyncioBinaryProtocolAcceleratedFactory
+
+
+class OffloadClientTest(TAsyncioClientTest):
+    """(De)serializes every struct in the default executor on both ends."""
+
+    protocol_class = functools.partial(
+        TAsyncioBinaryProtocolAccelerated, offload=TAsyncioOffload(threshold=0)
+    )
+    protocol_factory = functools.partial(
+        TAsyncioBinaryProtocolAcceleratedFactory, offload=TAsyncioOffload(threshold=0)
+    )
+
+    async def test_large_values(self):
+        value = "x" * 1000000
+        results = await asyncio.gather(*[self.client.echo(value) for i in range(4)])
+        self.assertEqual(results, [value] * 4)
+
+
+class TimeoutTest(ServerTestCase):
+    async def assertTimesOut(self, call):
+        with self.assertRaises(TTransportException) as cm:
+            await call
+        self.assertEqual(cm.exception.type, TTransportException.TIMED_OUT)
+
+    async def assertUsable(self):
+        # Late replies are read and dropped, keeping the stream in sync.
+        self.assertEqual(await self.client.echo("next"), "next")
+        await asyncio.sleep(0.2)
+        self.assertEqual(await self.client.echo("later"), "later")
+        self.assertEqual(self.client._reqs, {})
+
+    async def test_timeout(self):
+        self.client.setTimeout(50)
+        await self.assertTimesOut(self.client.sleep(0.2))
+        await self.assertUsable()
+        self.client.setTimeout(None)
+        self.assertEqual(await self.client.sleep(0.1), 0.1)
+
+    async def test_deadline(self):
+        with deadline(50):
+            await self.assertTimesOut(self.client.sleep(0.2))
+        await self.assertUsable()
+
+    async def test_deadline_shared_by_calls(self):
+        with deadline(300):
+            self.assertEqual(await self.client.sleep(0.2), 0.2)
+            # Only what is left of the deadline applies to the next call.
+            await self.assertTimesOut(self.client.sleep(0.2))
+
+    async def test_deadline_in_tasks(self):
+        with deadline(50):
+            task = asyncio.ensure_future(self.client.sleep(0.2))
+        await self.assertTimesOut(task)
+
+    async def test_nested_deadlines(self):
+        with deadline(50):
+            with deadline(1000):
+                await self.assertTimesOut(self.client.sleep(0.2))
+        with deadline(1000):
+            with deadline(50):
+                await self.assertTimesOut(self.client.sleep(0.2))
+            self.assertEqual(await self.client.echo("hello"), "hello")
+
+    async def test_deadline_before_timeout(self):
+        self.client.setTimeout(1000)
+        with deadline(50):
+            await self.assertTimesOut(asyncio.wait_for(self.client.sleep(0.5), 0.4))
+
+    async def test_expired_deadline(self):
+        with deadline(0):
+            await self.assertTimesOut(self.client.echo("hello"))
+        self.assertEqual(await self.client.echo("hello"), "hello")
+
+    async def test_cancelled_call(self):
+        call = asyncio.ensure_future(self.client.sleep(0.1))
+        await asyncio.sleep(0.02)
+        call.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await call
+        await self.assertUsable()
+
+
+class CoalescingTest(ServerTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.client.setCoalescing("echo", "sleep")
+
+    async def test_identical_calls(self):
+        results = await asyncio.gather(*[self.client.echo("same") for i in range(10)])
+        self.assertEqual(results, ["same"] * 10)
+        self.assertEqual(self.handler.calls, 1)
+        # Calls made once the request has completed send a new one.
+        self.assertEqual(await self.client.echo("same"), "same")
+        self.assertEqual(self.handler.calls, 2)
+        self.assertEqual(self.client._inflight, {})
+
+    async def test_different_arguments(self):
+        values = ["a", "b", "a", "c", "b"]
+        results = await asyncio.gather(*[self.client.echo(v) for v in values])
+        self.assertEqual(results, values)
+        self.assertEqual(self.handler.calls, 3)
+
+    async def test_other_methods(self):
+        self.client.setCoalescing("sleep")
+        results = await asyncio.gather(*[self.client.echo("same") for i in range(3)])
+        self.assertEqual(results, ["same"] * 3)
+        self.assertEqual(self.handler.calls, 3)
+
+    async def test_shared_exception(self):
+        calls = [self.client.echo("fail") for i in range(3)]
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        for result in results:
+            self.assertIsInstance(result, TApplicationException)
+        self.assertEqual(self.handler.calls, 1)
+
+    async def test_cancelled_caller(self):
+        calls = [asyncio.ensure_future(self.client.sleep(0.1)) for i in range(3)]
+        await asyncio.sleep(0.02)
+        calls[0].cancel()
+        self.assertEqual(await asyncio.gather(*calls[1:]), [0.1, 0.1])
+        self.assertTrue(calls[0].cancelled())
+        self.assertEqual(self.handler.calls, 1)
+
+    async def test_timeout_per_caller(self):
+        with deadline(30):
+            short = asyncio.ensure_future(self.client.sleep(0.1))
+        other = asyncio.ensure_future(self.client.sleep(0.1))
+        with self.assertRaises(TTransportException) as cm:
+            await short
+        self.assertEqual(cm.exception.type, TTransportException.TIMED_OUT)
+        self.assertEqual(await other, 0.1)
+        self.assertEqual(self.handler.calls, 1)
+
+    async def test_unknown_method(self):
+        with self.assertRaises(AttributeError):
+            self.client.setCoalescing("missing")
+
+
+class CachingClientTest(ServerTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.caching = TAsyncioCachingClient(self.client)
+        self.caching.setTTL("echo", 1000)
+
+    async def test_cached(self):
+        self.assertEqual(await self.caching.echo("a"), "a")
+        self.assertEqual(await self.caching.echo("a"), "a")
+        self.assertEqual(await self.caching.echo("b"), "b")
+        self.assertEqual(self.handler.calls, 2)
+        self.assertEqual((self.caching.hits, self.caching.misses), (1, 2))
+        # Methods without a TTL go straight to the client.
+        self.assertEqual(await self.caching.sleep(0), 0)
+        self.assertEqual(await self.caching.sleep(0), 0)
+        self.assertEqual(self.handler.calls, 4)
+
+    async def test_application_exceptions_are_not_cached(self):
+        for i in range(2):
+            with self.assertRaises(TApplicationException):
+                await self.caching.echo("fail")
+        self.assertEqual(self.handler.calls, 2)
+
+    async def test_with_coalescing(self):
+        self.client.setCoalescing("echo")
+        results = await asyncio.gather(*[self.caching.echo("a") for i in range(5)])
+        self.assertEqual(results, ["a"] * 5)
+        self.assertEqual(await self.caching.echo("a"), "a")
+        self.assertEqual(self.handler.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+import asyncio
+import unittest
+from struct import pack
+
+from aio_service import Client
+from test_aio_client import ServerTestCase
+from test_aio_transport import ChunkedTransport
+from thriftx.aio.protocol.TAsyncioHeaderProtocol import (
+    TAsyncioHeaderProtocol,
+    TAsyncioHeaderProtocolFactory,
+)
+from thriftx.aio.transport.TAsyncioHeaderTransport import TAsyncioHeaderTransport
+from thriftx.aio.transport.TAsyncioSocket import TAsyncioSocket
+from thriftx.aio.transport.TAsyncioTransport import TAsyncioMemoryBuffer
+from thriftx.protocol.THeaderProtocol import THeaderProtocol
+from thriftx.Thrift import TMessageType, TType
+from thriftx.transport import TTransport
+from thriftx.transport.THeaderTransport import (
+    THeaderClientType,
+    THeaderSubprotocolID,
+    THeaderTransformID,
+)
+
+ALL_CLIENT_TYPES = (
+    THeaderClientType.HEADERS,
+    THeaderClientType.FRAMED_BINARY,
+    THeaderClientType.FRAMED_COMPACT,
+)
+
+
+def write_message(prot, name="call", seqid=1):
+    prot.writeMessageBegin(name, TMessageType.CALL, seqid)
+    prot.writeStructBegin("args")
+    prot.writeFieldBegin("s", TType.STRING, 1)
+    prot.writeString("x" * 1000)
+    prot.writeFieldEnd()
+    prot.writeFieldBegin("i", TType.I32, 2)
+    prot.writeI32(seqid)
+    prot.writeFieldEnd()
+    prot.writeFieldStop()
+    prot.writeStructEnd()
+    prot.writeMessageEnd()
+
+
+class TAsyncioHeaderTransportTest(unittest.IsolatedAsyncioTestCase):
+    async def read_message(self, prot):
+        name, type, seqid = await prot.readMessageBegin()
+        await prot.readStructBegin()
+        values = []
+        while True:
+            fname, ftype, fid = await prot.readFieldBegin()
+            if ftype == TType.STOP:
+                break
+            if ftype == TType.STRING:
+                values.append(await prot.readString())
+            else:
+                values.append(await prot.readI32())
+            await prot.readFieldEnd()
+        await prot.readStructEnd()
+        await prot.readMessageEnd()
+        return name, seqid, values
+
+    async def write_async(self, configure=None):
+        buf = TAsyncioMemoryBuffer()
+        prot = TAsyncioHeaderProtocol(buf, ALL_CLIENT_TYPES)
+        if configure is not None:
+            configure(prot)
+        for seqid in (1, 2):
+            # Headers are sent with one frame only.
+            prot.set_header(b"seqid", b"%d" % seqid)
+            write_message(prot, seqid=seqid)
+            await prot.trans.flush()
+        return buf.getvalue()
+
+    async def check(self, data, chunk=None, headers=True):
+        if chunk is None:
+            trans = TAsyncioMemoryBuffer(data)
+        else:
+            trans = ChunkedTransport(data, chunk)
+        prot = TAsyncioHeaderProtocol(trans, ALL_CLIENT_TYPES)
+        for seqid in (1, 2):
+            self.assertEqual(
+                await self.read_message(prot), ("call", seqid, ["x" * 1000, seqid])
+            )
+            if headers:
+                self.assertEqual(prot.get_headers(), {b"seqid": b"%d" % seqid})
+        return prot
+
+    async def test_round_trip(self):
+        def configure(prot):
+            prot.add_transform(THeaderTransformID.ZLIB)
+
+        data = await self.write_async(configure)
+        await self.check(data)
+        for chunk in (1, 7, 100):
+            with self.subTest(chunk=chunk):
+                await self.check(data, chunk)
+
+    async def test_compact(self):
+        def configure(prot):
+            prot.trans._protocol_id = THeaderSubprotocolID.COMPACT
+            prot._set_protocol()
+
+        prot = await self.check(await self.write_async(configure))
+        self.assertEqual(prot.trans.protocol_id, THeaderSubprotocolID.COMPACT)
+
+    async def test_framed_client_types(self):
+        for client_type in ALL_CLIENT_TYPES[1:]:
+            with self.subTest(client_type=client_type):
+                buf = TAsyncioMemoryBuffer()
+                prot = TAsyncioHeaderProtocol(buf, ALL_CLIENT_TYPES)
+                prot.trans._set_client_type(client_type)
+                for seqid in (1, 2):
+                    write_message(prot, seqid=seqid)
+                    await prot.trans.flush()
+                # The frame starts with its size, not with header magic.
+                data = buf.getvalue()
+                self.assertEqual(data[:4], pack("!i", len(data) // 2 - 4))
+                await self.check(data, headers=False)
+
+    async def test_from_sync(self):
+        buf = TTransport.TMemoryBuffer()
+        prot = THeaderProtocol(buf, ALL_CLIENT_TYPES)
+        prot.add_transform(THeaderTransformID.ZLIB)
+        for seqid in (1, 2):
+            prot.set_header(b"seqid", b"%d" % seqid)
+            write_message(prot, seqid=seqid)
+            prot.trans.flush()
+        await self.check(buf.getvalue())
+
+    async def test_to_sync(self):
+        def configure(prot):
+            prot.add_transform(THeaderTransformID.ZLIB)
+
+        data = await self.write_async(configure)
+        prot = THeaderProtocol(TTransport.TMemoryBuffer(data), ALL_CLIENT_TYPES)
+        for seqid in (1, 2):
+            name, type, rseqid = prot.readMessageBegin()
+            self.assertEqual((name, rseqid), ("call", seqid))
+            prot.skip(TType.STRUCT)
+            prot.readMessageEnd()
+            self.assertEqual(prot.get_headers(), {b"seqid": b"%d" % seqid})
+
+    async def test_truncated_frame(self):
+        data = await self.write_async()
+        prot = TAsyncioHeaderProtocol(
+            TAsyncioMemoryBuffer(data[: len(data) // 2 - 1]), ALL_CLIENT_TYPES
+        )
+        with self.assertRaises(EOFError):
+            await prot.readMessageBegin()
+
+    async def test_end_of_message(self):
+        # A message never spans frames, so reading past one is an error.
+        data = await self.write_async()
+        prot = TAsyncioHeaderProtocol(TAsyncioMemoryBuffer(data), ALL_CLIENT_TYPES)
+        await prot.readMessageBegin()
+        await prot.skip(TType.STRUCT)
+        with self.assertRaises(EOFError):
+            await prot.readI32()
+
+    async def test_unframed_client(self):
+        buf = TTransport.TMemoryBuffer()
+        prot = THeaderProtocol(buf, [THeaderClientType.UNFRAMED_BINARY])
+        prot.trans._set_client_type(THeaderClientType.UNFRAMED_BINARY)
+        write_message(prot)
+        prot.trans.flush()
+        trans = TAsyncioHeaderTransport(
+            TAsyncioMemoryBuffer(buf.getvalue()),
+            [THeaderClientType.UNFRAMED_BINARY],
+        )
+        with self.assertRaises(TTransport.TTransportException) as cm:
+            await trans.readFrame(0)
+        self.assertEqual(
+            cm.exception.type, TTransport.TTransportException.INVALID_CLIENT_TYPE
+        )
+
+    async def test_frame_size(self):
+        trans = TAsyncioHeaderTransport(
+            TAsyncioMemoryBuffer(pack("!i", 11) + b"x" * 11),
+            [THeaderClientType.HEADERS],
+        )
+        trans.set_max_frame_size(10)
+        with self.assertRaises(TTransport.TTransportException) as cm:
+            await trans.readFrame(0)
+        self.assertEqual(cm.exception.type, TTransport.TTransportException.SIZE_LIMIT)
+
+
+class TAsyncioHeaderClientTest(ServerTestCase):
+    protocol_factory = TAsyncioHeaderProtocolFactory
+    transport_factory = TTransport.TTransportFactoryBase
+
+    async def connect(self):
+        trans = TAsyncioHeaderTransport(
+            TAsyncioSocket("127.0.0.1", self.port), [THeaderClientType.HEADERS]
+        )
+        await trans.open()
+        prot = TAsyncioHeaderProtocol(trans, [THeaderClientType.HEADERS])
+        return trans, Client(prot)
+
+    async def test_calls(self):
+        self.trans.add_transform(THeaderTransformID.ZLIB)
+        self.assertEqual(await self.client.echo("hello"), "hello")
+        values = ["value %d" % i for i in range(50)]
+        results = await asyncio.gather(*[self.client.echo(v) for v in values])
+        self.assertEqual(results, values)
+        await self.client.log("message")
+        self.assertEqual(await self.client.echo("hello"), "hello")
+        self.assertEqual(self.handler.logged, ["message"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+import asyncio
+import unittest
+import warnings
+
+from aio_service import Client, Handler, Processor
+from test_aio_server import free_port
+from thriftx.aio.protocol.TAsyncioBinaryProtocol import (
+    TAsyncioBinaryProtocol,
+    TAsyncioBinaryProtocolAccelerated,
+    TAsyncioBinaryProtocolAcceleratedFactory,
+)
+from thriftx.aio.protocol.TAsyncioJSONProtocol import (
+    TAsyncioJSONProtocol,
+    TAsyncioJSONProtocolFactory,
+)
+from thriftx.Thrift import TApplicationException
+
+try:
+    import aiohttp
+    from thriftx.aio.server.TAsyncioHttpServer import TAsyncioAiohttpServer
+    from thriftx.aio.transport.TAsyncioHttpClient import (
+        TAsyncioAiohttpBufferedClient,
+        TAsyncioAiohttpClient,
+    )
+except ImportError:
+    aiohttp = None
+
+try:
+    import aiodns
+except ImportError:
+    aiodns = None
+
+
+@unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+class AiohttpTestCase(unittest.IsolatedAsyncioTestCase):
+    """Serves aio_service.Processor over HTTP."""
+
+    protocol_factory = TAsyncioBinaryProtocolAcceleratedFactory
+    compress = False
+
+    async def asyncSetUp(self):
+        self.handler = Handler()
+        self.port = free_port()
+        self.url = "http://127.0.0.1:%d/thrift" % self.port
+        self.server = TAsyncioAiohttpServer(
+            Processor(self.handler),
+            ("127.0.0.1", self.port),
+            self.protocol_factory(),
+            path="/thrift",
+            compress=self.compress,
+            compress_min_size=100,
+        )
+        self.serving = asyncio.ensure_future(self.server.serve())
+        self.addAsyncCleanup(self.stop)
+        self.session = aiohttp.ClientSession()
+        self.addAsyncCleanup(self.session.close)
+        while True:
+            try:
+                async with self.session.get(self.url):
+                    break
+            except aiohttp.ClientConnectionError:
+                await asyncio.sleep(0.01)
+
+    async def stop(self):
+        self.server.stop()
+        await self.serving
+
+    def client(self, transport_class, protocol_class):
+        trans = transport_class(self.url, session=self.session)
+        return trans, Client(protocol_class(trans))
+
+
+class TAsyncioAiohttpClientTest(AiohttpTestCase):
+    async def check(self, client):
+        self.assertEqual(await client.echo("hello"), "hello")
+        values = ["value %d" % i for i in range(50)]
+        results = await asyncio.gather(*[client.echo(v) for v in values])
+        self.assertEqual(results, values)
+        with self.assertRaises(TApplicationException):
+            await client.echo("fail")
+        await client.log("message")
+        self.assertEqual(await client.echo("after"), "after")
+        self.assertEqual(self.handler.logged, ["message"])
+
+    async def test_client(self):
+        trans, client = self.client(TAsyncioAiohttpClient, TAsyncioBinaryProtocol)
+        await self.check(client)
+        self.assertEqual(trans.code, 200)
+
+    async def test_buffered_client(self):
+        trans, client = self.client(
+            TAsyncioAiohttpBufferedClient, TAsyncioBinaryProtocolAccelerated
+        )
+        await self.check(client)
+
+    async def test_replies_out_of_order(self):
+        trans, client = self.client(
+            TAsyncioAiohttpBufferedClient, TAsyncioBinaryProtocol
+        )
+        slow = asyncio.ensure_future(client.sleep(0.2))
+        self.assertEqual(await client.echo("fast"), "fast")
+        self.assertFalse(slow.done())
+        self.assertEqual(await slow, 0.2)
+
+    async def test_oneway_responses_are_not_queued(self):
+        for transport_class in (TAsyncioAiohttpClient, TAsyncioAiohttpBufferedClient):
+            with self.subTest(transport_class=transport_class.__name__):
+                trans, client = self.client(transport_class, TAsyncioBinaryProtocol)
+                for i in range(20):
+                    await client.log("message %d" % i)
+                self.assertEqual(trans._responses.qsize(), 0)
+                self.assertEqual(await client.echo("hello"), "hello")
+
+    async def test_custom_headers(self):
+        trans, client = self.client(TAsyncioAiohttpClient, TAsyncioBinaryProtocol)
+        trans.setCustomHeaders({"X-Test": "yes"})
+        self.assertEqual(trans._custom_headers["Content-Type"], "application/x-thrift")
+        self.assertEqual(await client.echo("hello"), "hello")
+
+    async def test_bad_request(self):
+        async with self.session.post(self.url, data=b"\x80\x01") as response:
+            self.assertEqual(response.status, 400)
+
+    @unittest.skipIf(aiodns is None, "aiodns is not installed")
+    async def test_own_session(self):
+        trans = TAsyncioAiohttpBufferedClient(self.url)
+        self.addAsyncCleanup(trans.close)
+        client = Client(TAsyncioBinaryProtocol(trans))
+        self.assertEqual(await client.echo("hello"), "hello")
+
+
+class TAsyncioAiohttpServerTest(AiohttpTestCase):
+    def test_no_deprecated_handler(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            TAsyncioAiohttpServer(Processor(self.handler), ("127.0.0.1", 0))
+
+    async def test_oneway_does_not_wait(self):
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def log(msg):
+            started.set()
+            await release.wait()
+            self.handler.logged.append(msg)
+
+        self.handler.log = log
+        trans, client = self.client(
+            TAsyncioAiohttpBufferedClient, TAsyncioBinaryProtocol
+        )
+        await asyncio.wait_for(client.log("message"), 5)
+        await started.wait()
+        self.assertEqual(self.handler.logged, [])
+        release.set()
+        self.assertEqual(await client.echo("hello"), "hello")
+        self.assertEqual(self.handler.logged, ["message"])
+
+    async def test_stop(self):
+        self.server.stop()
+        await asyncio.wait_for(self.serving, 5)
+        trans, client = self.client(TAsyncioAiohttpClient, TAsyncioBinaryProtocol)
+        with self.assertRaises(aiohttp.ClientConnectionError):
+            await client.echo("hello")
+
+
+class TAsyncioAiohttpJSONTest(AiohttpTestCase):
+    protocol_factory = TAsyncioJSONProtocolFactory
+
+    async def test_calls(self):
+        trans, client = self.client(TAsyncioAiohttpBufferedClient, TAsyncioJSONProtocol)
+        self.assertEqual(await client.echo('hello "json"'), 'hello "json"')
+        await client.log("message")
+        values = ["value %d" % i for i in range(20)]
+        results = await asyncio.gather(*[client.echo(v) for v in values])
+        self.assertEqual(results, values)
+
+
+class TAsyncioAiohttpCompressionTest(AiohttpTestCase):
+    compress = True
+
+    async def test_compressed_responses(self):
+        trans, client = self.client(
+            TAsyncioAiohttpBufferedClient, TAsyncioBinaryProtocol
+        )
+        self.assertEqual(await client.echo("short"), "short")
+        self.assertNotIn("Content-Encoding", trans.headers)
+        value = "x" * 10000
+        self.assertEqual(await client.echo(value), value)
+        self.assertIn(trans.headers["Content-Encoding"], ("gzip", "deflate"))
+
+
+if __name__ == "__main__":
+    unittest.main()
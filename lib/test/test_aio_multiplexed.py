@@ -0,0 +1,159 @@
+import unittest
+
+from aio_service import Handler, Processor, echo_args, echo_result
+from thriftx.aio.protocol.TAsyncioBinaryProtocol import TAsyncioBinaryProtocol
+from thriftx.aio.protocol.TAsyncioMultiplexedProtocol import (
+    TAsyncioMultiplexedProtocol,
+)
+from thriftx.aio.TAsyncioMultiplexedProcessor import TAsyncioMultiplexedProcessor
+from thriftx.aio.TAsyncioThrift import TAsyncioApplicationException
+from thriftx.aio.transport.TAsyncioTransport import TAsyncioMemoryBuffer
+from thriftx.Thrift import TApplicationException, TMessageType, TProcessor
+
+
+class NameProcessor(TProcessor):
+    """Replies to every message with its name, prefixed by tag."""
+
+    def __init__(self, tag):
+        self.tag = tag
+        self._on_message_begin = None
+
+    def on_message_begin(self, func):
+        self._on_message_begin = func
+
+    async def process(self, iprot, oprot):
+        name, type, seqid = await iprot.readMessageBegin()
+        if self._on_message_begin:
+            self._on_message_begin(name, type, seqid)
+        await iprot.readString()
+        await iprot.readMessageEnd()
+        oprot.writeMessageBegin(name, TMessageType.REPLY, seqid)
+        oprot.writeString("%s.%s" % (self.tag, name))
+        oprot.writeMessageEnd()
+        await oprot.trans.flush()
+        return True
+
+
+class TAsyncioMultiplexedProcessorTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.processor = TAsyncioMultiplexedProcessor()
+        self.processor.registerProcessor("A", NameProcessor("a"))
+        self.processor.registerProcessor("B", NameProcessor("b"))
+
+    async def call(self, service, name):
+        request = TAsyncioMemoryBuffer()
+        prot = TAsyncioBinaryProtocol(request)
+        if service is not None:
+            prot = TAsyncioMultiplexedProtocol(prot, service)
+        prot.writeMessageBegin(name, TMessageType.CALL, 7)
+        prot.writeString("arg")
+        prot.writeMessageEnd()
+        reply = TAsyncioMemoryBuffer()
+        await self.processor.process(
+            TAsyncioBinaryProtocol(TAsyncioMemoryBuffer(request.getvalue())),
+            TAsyncioBinaryProtocol(reply),
+        )
+        iprot = TAsyncioBinaryProtocol(TAsyncioMemoryBuffer(reply.getvalue()))
+        name, type, seqid = await iprot.readMessageBegin()
+        self.assertEqual(seqid, 7)
+        if type == TMessageType.EXCEPTION:
+            x = TAsyncioApplicationException()
+            await x.read(iprot)
+            return name, x
+        return name, await iprot.readString()
+
+    async def test_dispatch(self):
+        self.assertEqual(await self.call("A", "ping"), ("ping", "a.ping"))
+        self.assertEqual(await self.call("B", "ping"), ("ping", "b.ping"))
+
+    async def test_unknown_service(self):
+        name, x = await self.call("C", "ping")
+        self.assertEqual(name, "ping")
+        self.assertEqual(x.type, TApplicationException.UNKNOWN_METHOD)
+
+    async def test_default_processor(self):
+        name, x = await self.call(None, "ping")
+        self.assertEqual(x.type, TApplicationException.UNKNOWN_METHOD)
+        self.processor.registerDefault(NameProcessor("default"))
+        self.assertEqual(await self.call(None, "ping"), ("ping", "default.ping"))
+
+    async def test_on_message_begin(self):
+        messages = []
+        self.processor.on_message_begin(
+            lambda name, type, seqid: messages.append((name, type, seqid))
+        )
+        await self.call("A", "ping")
+        await self.call("B", "pong")
+        self.assertEqual(
+            messages, [("ping", TMessageType.CALL, 7), ("pong", TMessageType.CALL, 7)]
+        )
+
+
+class GeneratedProcessorTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.processor = TAsyncioMultiplexedProcessor()
+        self.processor.registerProcessor("Echo", Processor(Handler()))
+
+    async def call(self, name, s):
+        request = TAsyncioMemoryBuffer()
+        prot = TAsyncioBinaryProtocol(request)
+        prot.writeMessageBegin(name, TMessageType.CALL, 7)
+        echo_args(s).write(prot)
+        prot.writeMessageEnd()
+        self.iprot = TAsyncioBinaryProtocol(TAsyncioMemoryBuffer(request.getvalue()))
+        reply = TAsyncioMemoryBuffer()
+        await self.processor.process(self.iprot, TAsyncioBinaryProtocol(reply))
+        iprot = TAsyncioBinaryProtocol(TAsyncioMemoryBuffer(reply.getvalue()))
+        name, type, seqid = await iprot.readMessageBegin()
+        self.assertEqual(seqid, 7)
+        if type == TMessageType.EXCEPTION:
+            x = TAsyncioApplicationException()
+            await x.read(iprot)
+            return name, x
+        result = echo_result()
+        await result.read(iprot)
+        return name, result.success
+
+    async def test_dispatch(self):
+        self.assertEqual(await self.call("Echo:echo", "hello"), ("echo", "hello"))
+
+    async def test_input_protocol_is_not_wrapped(self):
+        protocols = []
+        processor = self.processor.services["Echo"]
+
+        async def process_echo(self, seqid, iprot, oprot):
+            protocols.append(iprot)
+            await Processor.process_echo(self, seqid, iprot, oprot)
+
+        processor._processMap = dict(processor._processMap, echo=process_echo)
+        self.processor.registerProcessor("Echo", processor)
+        await self.call("Echo:echo", "hello")
+        self.assertEqual(protocols, [self.iprot])
+
+    async def test_unknown_method(self):
+        name, x = await self.call("Echo:missing", "hello")
+        self.assertEqual(name, "missing")
+        self.assertEqual(x.type, TApplicationException.UNKNOWN_METHOD)
+        self.assertEqual(x.message, "Unknown function missing")
+
+    async def test_replaced_processor(self):
+        handler = Handler()
+        self.processor.registerProcessor("Echo", Processor(handler))
+        await self.call("Echo:echo", "hello")
+        self.assertEqual(handler.calls, 1)
+
+    async def test_on_message_begin(self):
+        messages = []
+        self.processor.on_message_begin(
+            lambda name, type, seqid: messages.append((name, type, seqid))
+        )
+        await self.call("Echo:echo", "hello")
+        await self.call("Echo:missing", "hello")
+        self.assertEqual(
+            messages,
+            [("echo", TMessageType.CALL, 7), ("missing", TMessageType.CALL, 7)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import asyncio
+import unittest
+
+from aio_service import Client
+from test_aio_client import ServerTestCase
+from thriftx.aio.protocol.TAsyncioBinaryProtocol import TAsyncioBinaryProtocolFactory
+from thriftx.aio.TAsyncioConnectionPool import TAsyncioConnectionPool
+from thriftx.aio.transport.TAsyncioSocket import TAsyncioSocket
+from thriftx.aio.transport.TAsyncioTransport import (
+    TAsyncioFramedTransport,
+    TAsyncioTransportBase,
+)
+from thriftx.transport.TTransport import TTransportException
+
+
+class FakeTransport(TAsyncioTransportBase):
+    def __init__(self, refuse=False):
+        self.refuse = refuse
+        self.opened = False
+        self.closed = False
+
+    def isOpen(self):
+        return self.opened and not self.closed
+
+    async def open(self):
+        if self.refuse:
+            raise TTransportException(type=TTransportException.NOT_OPEN)
+        self.opened = True
+
+    async def close(self):
+        self.closed = True
+
+
+class TAsyncioConnectionPoolTest(unittest.IsolatedAsyncioTestCase):
+    def make_pool(self, **kwargs):
+        self.transports = []
+        self.refuse = False
+
+        def factory():
+            trans = FakeTransport(self.refuse)
+            self.transports.append(trans)
+            return trans
+
+        pool = TAsyncioConnectionPool(factory, **kwargs)
+        self.addAsyncCleanup(pool.close)
+        return pool
+
+    async def test_reuse(self):
+        pool = self.make_pool()
+        async with pool.connection() as conn:
+            self.assertTrue(conn.trans.isOpen())
+        async with pool.connection() as again:
+            self.assertIs(again, conn)
+        self.assertEqual((pool.size, pool.idle), (1, 1))
+
+    async def test_max_size(self):
+        pool = self.make_pool(max_size=2)
+        first = await pool.acquire()
+        second = await pool.acquire()
+        third = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0.01)
+        self.assertFalse(third.done())
+        await pool.release(first)
+        self.assertIs(await third, first)
+        await pool.release(second)
+        await pool.release(first)
+        self.assertEqual(len(self.transports), 2)
+
+    async def test_cancelled_waiter(self):
+        pool = self.make_pool(max_size=1)
+        conn = await pool.acquire()
+        waiter = asyncio.ensure_future(pool.acquire())
+        other = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await pool.release(conn)
+        self.assertIs(await asyncio.wait_for(other, 1), conn)
+
+    async def test_discard_on_error(self):
+        pool = self.make_pool()
+        with self.assertRaises(TTransportException):
+            async with pool.connection():
+                raise TTransportException()
+        self.assertTrue(self.transports[0].closed)
+        self.assertEqual(pool.size, 0)
+
+    async def test_keep_after_client_timeout(self):
+        pool = self.make_pool()
+        with self.assertRaises(TTransportException):
+            async with pool.client(Client):
+                raise TTransportException(type=TTransportException.TIMED_OUT)
+        self.assertFalse(self.transports[0].closed)
+        self.assertEqual(pool.idle, 1)
+
+    async def test_other_errors_keep_the_connection(self):
+        pool = self.make_pool()
+        with self.assertRaises(ValueError):
+            async with pool.connection():
+                raise ValueError()
+        self.assertEqual(pool.idle, 1)
+
+    async def test_connect_failure(self):
+        pool = self.make_pool(max_size=1)
+        self.refuse = True
+        with self.assertRaises(TTransportException):
+            await pool.acquire()
+        self.assertEqual(pool.size, 0)
+        self.refuse = False
+        await pool.release(await pool.acquire())
+
+    async def test_min_size_and_max_idle(self):
+        pool = self.make_pool(min_size=1, max_size=3, max_idle=0.05)
+        await pool.open()
+        self.assertEqual((pool.size, pool.idle), (1, 1))
+        conns = [await pool.acquire() for i in range(3)]
+        for conn in conns:
+            await pool.release(conn)
+        self.assertEqual(pool.idle, 3)
+        await asyncio.sleep(0.3)
+        # Idle connections are evicted down to min_size.
+        self.assertEqual((pool.size, pool.idle), (1, 1))
+
+    async def test_max_lifetime(self):
+        pool = self.make_pool(max_lifetime=0.05)
+        conn = await pool.acquire()
+        await asyncio.sleep(0.06)
+        await pool.release(conn)
+        self.assertTrue(conn.trans.closed)
+        self.assertEqual(pool.size, 0)
+
+    async def test_health_check(self):
+        healthy = []
+
+        async def check(conn):
+            return healthy.pop()
+
+        pool = self.make_pool(health_check=check, health_check_interval=0)
+        conn = await pool.acquire()
+        await pool.release(conn)
+        healthy.append(True)
+        self.assertIs(await pool.acquire(), conn)
+        await pool.release(conn)
+        healthy.append(False)
+        self.assertIsNot(await pool.acquire(), conn)
+        self.assertTrue(conn.trans.closed)
+
+    async def test_close(self):
+        pool = self.make_pool(max_size=1)
+        conn = await pool.acquire()
+        waiter = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0.01)
+        await pool.close()
+        with self.assertRaises(TTransportException) as cm:
+            await waiter
+        self.assertEqual(cm.exception.type, TTransportException.NOT_OPEN)
+        await pool.release(conn)
+        self.assertTrue(conn.trans.closed)
+        with self.assertRaises(TTransportException):
+            await pool.acquire()
+
+
+class PooledClientTest(ServerTestCase):
+    async def test_clients(self):
+        pool = TAsyncioConnectionPool(
+            lambda: TAsyncioFramedTransport(TAsyncioSocket("127.0.0.1", self.port)),
+            TAsyncioBinaryProtocolFactory(),
+            max_size=2,
+        )
+        async with pool:
+
+            async def call(i):
+                async with pool.client(Client) as client:
+                    return await client.echo("call %d" % i)
+
+            results = await asyncio.gather(*[call(i) for i in range(20)])
+            self.assertEqual(results, ["call %d" % i for i in range(20)])
+            self.assertEqual(pool.size, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
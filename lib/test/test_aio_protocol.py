@@ -0,0 +1,470 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from thriftx.aio import TAsyncioOffload
+from thriftx.aio.protocol.TAsyncioBinaryProtocol import (
+    TAsyncioBinaryProtocol,
+    TAsyncioBinaryProtocolAccelerated,
+)
+from thriftx.aio.protocol.TAsyncioCompactProtocol import (
+    TAsyncioCompactProtocol,
+    TAsyncioCompactProtocolAccelerated,
+)
+from thriftx.aio.protocol.TAsyncioJSONProtocol import TAsyncioJSONProtocol
+from thriftx.aio.transport.TAsyncioTransport import (
+    TAsyncioBufferedTransport,
+    TAsyncioFramedTransport,
+    TAsyncioMemoryBuffer,
+    TAsyncioTransportBase,
+)
+from thriftx.protocol.TBase import TBase
+from thriftx.protocol.TBinaryProtocol import TBinaryProtocol
+from thriftx.protocol.TCompactProtocol import TCompactProtocol
+from thriftx.protocol.TJSONProtocol import TJSONProtocol
+from thriftx.protocol.TProtocol import TProtocolException
+from thriftx.Thrift import TMessageType, TType
+from thriftx.transport import TTransport
+
+try:
+    from thriftx.protocol import fastbinary
+except ImportError:
+    fastbinary = None
+
+
+class Point(TBase):
+    __slots__ = ("x", "y")
+    thrift_spec = (
+        None,
+        (1, TType.I32, "x", None, None),
+        (2, TType.I32, "y", None, None),
+    )
+
+    def __init__(self, x=None, y=None):
+        self.x = x
+        self.y = y
+
+
+class Item(TBase):
+    __slots__ = ("id", "name", "flag", "ratio", "tags", "points", "scores")
+    thrift_spec = (
+        None,
+        (1, TType.I64, "id", None, None),
+        (2, TType.STRING, "name", "UTF8", None),
+        (3, TType.BOOL, "flag", None, None),
+        (4, TType.DOUBLE, "ratio", None, None),
+        (5, TType.SET, "tags", (TType.STRING, "UTF8", False), None),
+        (6, TType.LIST, "points", (TType.STRUCT, [Point, None], False), None),
+        (7, TType.MAP, "scores", (TType.STRING, "UTF8", TType.I32, None, False), None),
+    )
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.get(name))
+
+
+Item.thrift_spec[6][3][1][1] = Point.thrift_spec
+
+
+class ChunkedTransport(TAsyncioTransportBase):
+    """Returns at most chunk bytes per read."""
+
+    def __init__(self, data, chunk):
+        self.data = data
+        self.chunk = chunk
+
+    async def read(self, sz):
+        ret = self.data[: min(sz, self.chunk)]
+        self.data = self.data[len(ret) :]
+        return ret
+
+
+def make_item(n):
+    return Item(
+        id=-(2**62) + n,
+        name="item é %d" % n,
+        flag=n % 2 == 0,
+        ratio=n / 3.0,
+        tags={"tag%d" % i for i in range(n % 5)},
+        points=[Point(i, -i) for i in range(n % 20)],
+        scores={"score%d" % i: i * 1000 for i in range(n % 17)},
+    )
+
+
+def frames(protocol_class, items):
+    """Encodes items with the sync protocol, one frame for every two."""
+    data = b""
+    for i in range(0, len(items), 2):
+        buf = TTransport.TMemoryBuffer()
+        for item in items[i : i + 2]:
+            item.write(protocol_class(buf))
+        payload = buf.getvalue()
+        data += len(payload).to_bytes(4, "big") + payload
+    return data
+
+
+@unittest.skipIf(fastbinary is None, "fastbinary is not built")
+class AcceleratedDecodeTest(unittest.IsolatedAsyncioTestCase):
+    async def decode(self, protocol_class, data, count):
+        trans = TAsyncioFramedTransport(TAsyncioMemoryBuffer(data))
+        iprot = protocol_class(trans, fallback=False)
+        self.assertIsInstance(trans, TTransport.CReadableTransport)
+        items = []
+        for i in range(count):
+            if i % 2 == 0:
+                # Generated code awaits a frame before decoding from it.
+                await trans.readFrame()
+            item = Item()
+            await TAsyncioOffload.fastDecode(item, iprot, [Item, Item.thrift_spec])
+            items.append(item)
+        return items
+
+    async def test_binary(self):
+        items = [make_item(n) for n in range(50)]
+        data = frames(TBinaryProtocol, items)
+        decoded = await self.decode(TAsyncioBinaryProtocolAccelerated, data, 50)
+        self.assertEqual(decoded, items)
+
+    async def test_compact(self):
+        items = [make_item(n) for n in range(50)]
+        data = frames(TCompactProtocol, items)
+        decoded = await self.decode(TAsyncioCompactProtocolAccelerated, data, 50)
+        self.assertEqual(decoded, items)
+
+    async def test_truncated_frame(self):
+        buf = TTransport.TMemoryBuffer()
+        make_item(30).write(TBinaryProtocol(buf))
+        payload = buf.getvalue()[:-10]
+        data = len(payload).to_bytes(4, "big") + payload
+        with self.assertRaises(EOFError):
+            await self.decode(TAsyncioBinaryProtocolAccelerated, data, 1)
+
+    def test_unframed_transports_fall_back(self):
+        # Only transports holding whole messages can be decoded from C.
+        trans = TAsyncioBufferedTransport(TAsyncioMemoryBuffer())
+        self.assertNotIsInstance(trans, TTransport.CReadableTransport)
+
+    async def test_encode(self):
+        trans = TAsyncioFramedTransport(TAsyncioMemoryBuffer())
+        oprot = TAsyncioBinaryProtocolAccelerated(trans, fallback=False)
+        make_item(7).write(oprot)
+        buf = TTransport.TMemoryBuffer()
+        make_item(7).write(TBinaryProtocol(buf))
+        self.assertEqual(trans._wbuf.getvalue(), buf.getvalue())
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(2)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+@unittest.skipIf(fastbinary is None, "fastbinary is not built")
+class TAsyncioOffloadTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.executor = CountingExecutor()
+        self.addCleanup(self.executor.shutdown)
+
+    async def decode(self, data, threshold):
+        offload = TAsyncioOffload.TAsyncioOffload(self.executor, threshold)
+        trans = TAsyncioFramedTransport(TAsyncioMemoryBuffer(data))
+        iprot = TAsyncioBinaryProtocolAccelerated(trans, offload=offload)
+        await trans.readFrame()
+        item = Item()
+        await TAsyncioOffload.fastDecode(item, iprot, [Item, Item.thrift_spec])
+        return item
+
+    async def test_decode(self):
+        item = make_item(19)
+        data = frames(TBinaryProtocol, [item])
+        self.assertEqual(await self.decode(data, len(data)), item)
+        self.assertEqual(self.executor.submitted, 0)
+        self.assertEqual(await self.decode(data, len(data) - 4), item)
+        self.assertEqual(self.executor.submitted, 1)
+
+    async def test_decode_truncated(self):
+        buf = TTransport.TMemoryBuffer()
+        make_item(30).write(TBinaryProtocol(buf))
+        payload = buf.getvalue()[:-10]
+        data = len(payload).to_bytes(4, "big") + payload
+        with self.assertRaises(EOFError):
+            await self.decode(data, 0)
+        self.assertEqual(self.executor.submitted, 1)
+
+    async def test_encode(self):
+        def encoded(obj):
+            buf = TTransport.TMemoryBuffer()
+            obj.write(TBinaryProtocol(buf))
+            return buf.getvalue()
+
+        offload = TAsyncioOffload.TAsyncioOffload(self.executor, 100)
+        oprot = TAsyncioBinaryProtocolAccelerated(
+            TAsyncioMemoryBuffer(), offload=offload
+        )
+        large = make_item(19)
+        # Structs are only encoded in the executor once one of their type
+        # has been seen to be large.
+        self.assertEqual(await offload.encode(oprot, large), encoded(large))
+        self.assertEqual(self.executor.submitted, 0)
+        self.assertEqual(await offload.encode(oprot, large), encoded(large))
+        self.assertEqual(self.executor.submitted, 1)
+        self.assertEqual(await offload.encode(oprot, Point(1, 2)), encoded(Point(1, 2)))
+        await offload.encode(oprot, make_item(0))
+        await offload.encode(oprot, large)
+        self.assertEqual(self.executor.submitted, 2)
+
+    async def test_write_message(self):
+        def message(oprot):
+            oprot.writeMessageBegin("call", TMessageType.REPLY, 3)
+            make_item(19).write(oprot)
+            oprot.writeMessageEnd()
+
+        buf = TTransport.TMemoryBuffer()
+        message(TBinaryProtocol(buf))
+        offload = TAsyncioOffload.TAsyncioOffload(self.executor, 0)
+        trans = TAsyncioMemoryBuffer()
+        oprot = TAsyncioBinaryProtocolAccelerated(trans, offload=offload)
+        for i in range(2):
+            await TAsyncioOffload.writeMessage(
+                oprot, "call", TMessageType.REPLY, 3, make_item(19)
+            )
+        self.assertEqual(trans.getvalue(), buf.getvalue() * 2)
+        self.assertEqual(self.executor.submitted, 2)
+
+
+class TAsyncioBinaryProtocolTest(unittest.IsolatedAsyncioTestCase):
+    async def test_primitives(self):
+        buf = TTransport.TMemoryBuffer()
+        prot = TBinaryProtocol(buf)
+        prot.writeByte(-128)
+        prot.writeI16(-32768)
+        prot.writeI32(2**31 - 1)
+        prot.writeI64(-(2**63))
+        prot.writeDouble(1.5)
+        prot.writeBool(True)
+        prot.writeString("héllo")
+        prot.writeBinary(b"\x00\xff")
+        # Read in small chunks, through the buffered transport.
+        trans = TAsyncioBufferedTransport(TAsyncioMemoryBuffer(buf.getvalue()), 3)
+        iprot = TAsyncioBinaryProtocol(trans)
+        self.assertEqual(await iprot.readByte(), -128)
+        self.assertEqual(await iprot.readI16(), -32768)
+        self.assertEqual(await iprot.readI32(), 2**31 - 1)
+        self.assertEqual(await iprot.readI64(), -(2**63))
+        self.assertEqual(await iprot.readDouble(), 1.5)
+        self.assertEqual(await iprot.readBool(), True)
+        self.assertEqual(await iprot.readString(), "héllo")
+        self.assertEqual(await iprot.readBinary(), b"\x00\xff")
+        with self.assertRaises(EOFError):
+            await iprot.readByte()
+
+
+# The fields of the struct written by write_message(), as (id, type, value).
+FIELDS = [
+    (1, TType.BOOL, True),
+    (2, TType.BOOL, False),
+    (3, TType.BYTE, -7),
+    (4, TType.I16, -300),
+    (20, TType.I32, 2**31 - 1),
+    (21, TType.I64, -(2**63)),
+    (300, TType.I64, 2**40),
+    (301, TType.DOUBLE, -2.5),
+    (-5, TType.STRING, "négatif"),
+    (400, TType.STRING, "x" * 200),
+]
+
+
+def write_message(prot):
+    prot.writeMessageBegin("method", TMessageType.CALL, 2**31 - 1)
+    prot.writeStructBegin("args")
+    writers = {
+        TType.BOOL: prot.writeBool,
+        TType.BYTE: prot.writeByte,
+        TType.I16: prot.writeI16,
+        TType.I32: prot.writeI32,
+        TType.I64: prot.writeI64,
+        TType.DOUBLE: prot.writeDouble,
+        TType.STRING: prot.writeString,
+    }
+    for fid, ftype, value in FIELDS:
+        prot.writeFieldBegin("field", ftype, fid)
+        writers[ftype](value)
+        prot.writeFieldEnd()
+    prot.writeFieldBegin("short", TType.LIST, 401)
+    prot.writeListBegin(TType.I32, 3)
+    for i in (0, -1, 2**20):
+        prot.writeI32(i)
+    prot.writeListEnd()
+    prot.writeFieldEnd()
+    prot.writeFieldBegin("long", TType.SET, 402)
+    prot.writeSetBegin(TType.BOOL, 20)
+    for i in range(20):
+        prot.writeBool(i % 3 == 0)
+    prot.writeSetEnd()
+    prot.writeFieldEnd()
+    prot.writeFieldBegin("empty", TType.MAP, 403)
+    prot.writeMapBegin(TType.STRING, TType.I64, 0)
+    prot.writeMapEnd()
+    prot.writeFieldEnd()
+    prot.writeFieldBegin("map", TType.MAP, 404)
+    prot.writeMapBegin(TType.I16, TType.LIST, 200)
+    for i in range(200):
+        prot.writeI16(i)
+        prot.writeListBegin(TType.I64, 1)
+        prot.writeI64(-i)
+        prot.writeListEnd()
+    prot.writeMapEnd()
+    prot.writeFieldEnd()
+    prot.writeFieldStop()
+    prot.writeStructEnd()
+    prot.writeMessageEnd()
+
+
+async def check_message(test, prot):
+    test.assertEqual(
+        await prot.readMessageBegin(), ("method", TMessageType.CALL, 2**31 - 1)
+    )
+    await prot.readStructBegin()
+    readers = {
+        TType.BOOL: prot.readBool,
+        TType.BYTE: prot.readByte,
+        TType.I16: prot.readI16,
+        TType.I32: prot.readI32,
+        TType.I64: prot.readI64,
+        TType.DOUBLE: prot.readDouble,
+        TType.STRING: prot.readString,
+    }
+    for fid, ftype, value in FIELDS:
+        test.assertEqual(await prot.readFieldBegin(), (None, ftype, fid))
+        test.assertEqual(await readers[ftype](), value)
+        await prot.readFieldEnd()
+    test.assertEqual(await prot.readFieldBegin(), (None, TType.LIST, 401))
+    test.assertEqual(await prot.readListBegin(), (TType.I32, 3))
+    for i in (0, -1, 2**20):
+        test.assertEqual(await prot.readI32(), i)
+    await prot.readListEnd()
+    await prot.readFieldEnd()
+    test.assertEqual(await prot.readFieldBegin(), (None, TType.SET, 402))
+    test.assertEqual(await prot.readSetBegin(), (TType.BOOL, 20))
+    for i in range(20):
+        test.assertEqual(await prot.readBool(), i % 3 == 0)
+    await prot.readSetEnd()
+    await prot.readFieldEnd()
+    test.assertEqual(await prot.readFieldBegin(), (None, TType.MAP, 403))
+    # Empty maps have no types byte.
+    test.assertEqual((await prot.readMapBegin())[2], 0)
+    await prot.readMapEnd()
+    await prot.readFieldEnd()
+    test.assertEqual(await prot.readFieldBegin(), (None, TType.MAP, 404))
+    test.assertEqual(await prot.readMapBegin(), (TType.I16, TType.LIST, 200))
+    for i in range(200):
+        test.assertEqual(await prot.readI16(), i)
+        test.assertEqual(await prot.readListBegin(), (TType.I64, 1))
+        test.assertEqual(await prot.readI64(), -i)
+        await prot.readListEnd()
+    await prot.readMapEnd()
+    await prot.readFieldEnd()
+    test.assertEqual((await prot.readFieldBegin())[1], TType.STOP)
+    await prot.readStructEnd()
+    await prot.readMessageEnd()
+
+
+class TAsyncioCompactProtocolTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        buf = TTransport.TMemoryBuffer()
+        write_message(TCompactProtocol(buf))
+        self.data = buf.getvalue()
+
+    async def test_unbuffered(self):
+        trans = ChunkedTransport(self.data, 3)
+        await check_message(self, TAsyncioCompactProtocol(trans))
+
+    async def test_framed(self):
+        data = len(self.data).to_bytes(4, "big") + self.data
+        trans = TAsyncioFramedTransport(TAsyncioMemoryBuffer(data))
+        await check_message(self, TAsyncioCompactProtocol(trans))
+
+    async def test_values_across_buffer_boundaries(self):
+        # Every varint and header is cut at every possible place.
+        for chunk in range(1, 12):
+            for rbuf_size in (1, 2, 5, 11, 64):
+                with self.subTest(chunk=chunk, rbuf_size=rbuf_size):
+                    inner = ChunkedTransport(self.data, chunk)
+                    trans = TAsyncioBufferedTransport(inner, rbuf_size)
+                    await check_message(self, TAsyncioCompactProtocol(trans))
+
+    async def test_skip(self):
+        trans = TAsyncioBufferedTransport(ChunkedTransport(self.data + b"\x2a", 7), 16)
+        prot = TAsyncioCompactProtocol(trans)
+        await prot.readMessageBegin()
+        await prot.skip(TType.STRUCT)
+        await prot.readMessageEnd()
+        self.assertEqual(await trans.readAll(1), b"\x2a")
+
+    async def test_truncated(self):
+        for end in (1, 5, 20, len(self.data) - 1):
+            inner = ChunkedTransport(self.data[:end], 4)
+            prot = TAsyncioCompactProtocol(TAsyncioBufferedTransport(inner, 8))
+            with self.assertRaises(EOFError):
+                await check_message(self, prot)
+
+    async def test_varint_too_long(self):
+        inner = TAsyncioMemoryBuffer(b"\xff" * 11)
+        prot = TAsyncioCompactProtocol(TAsyncioBufferedTransport(inner))
+        with self.assertRaises(TProtocolException):
+            await prot._readVarint()
+
+
+class TAsyncioJSONProtocolTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.data = b""
+        for i in range(2):
+            buf = TTransport.TMemoryBuffer()
+            write_message(TJSONProtocol(buf))
+            self.data += len(buf.getvalue()).to_bytes(4, "big") + buf.getvalue()
+
+    async def test_frames(self):
+        for chunk in (1, 7, 100000):
+            with self.subTest(chunk=chunk):
+                trans = TAsyncioFramedTransport(ChunkedTransport(self.data, chunk))
+                prot = TAsyncioJSONProtocol(trans)
+                await check_message(self, prot)
+                await check_message(self, prot)
+
+    async def test_write(self):
+        buf = TAsyncioMemoryBuffer()
+        trans = TAsyncioFramedTransport(buf)
+        write_message(TAsyncioJSONProtocol(trans))
+        await trans.flush()
+        self.assertEqual(buf.getvalue(), self.data[: len(self.data) // 2])
+
+    async def test_truncated(self):
+        for end in (2, 10, len(self.data) // 2 - 1):
+            with self.subTest(end=end):
+                trans = TAsyncioFramedTransport(TAsyncioMemoryBuffer(self.data[:end]))
+                with self.assertRaises(EOFError):
+                    await check_message(self, TAsyncioJSONProtocol(trans))
+
+    async def test_message_past_frame(self):
+        # A message must not go on past the end of its frame.
+        data = (len(self.data) // 2 - 6).to_bytes(4, "big") + self.data[4:]
+        trans = TAsyncioFramedTransport(TAsyncioMemoryBuffer(data))
+        with self.assertRaises(EOFError):
+            await check_message(self, TAsyncioJSONProtocol(trans))
+
+    async def test_memory_buffer(self):
+        buf = TTransport.TMemoryBuffer()
+        write_message(TJSONProtocol(buf))
+        trans = TAsyncioMemoryBuffer(buf.getvalue())
+        await check_message(self, TAsyncioJSONProtocol(trans))
+
+    def test_needs_whole_messages(self):
+        with self.assertRaises(TypeError):
+            TAsyncioJSONProtocol(TAsyncioBufferedTransport(TAsyncioMemoryBuffer()))
+
+
+if __name__ == "__main__":
+    unittest.main()
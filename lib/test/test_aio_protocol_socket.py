@@ -0,0 +1,180 @@
+import asyncio
+import unittest
+from struct import pack
+
+from aio_service import Client
+from test_aio_client import ServerTestCase
+from thriftx.aio.transport.TAsyncioProtocolSocket import (
+    TAsyncioProtocolServerSocket,
+    TAsyncioProtocolSocket,
+    _FramingProtocol,
+)
+from thriftx.transport.TTransport import TTransportException, TTransportFactoryBase
+
+
+class FakeTransport(asyncio.Transport):
+    def __init__(self, protocol):
+        super().__init__()
+        self.protocol = protocol
+        self.written = []
+        self.aborted = False
+
+    def writelines(self, data):
+        self.written.extend(bytes(d) for d in data)
+
+    def abort(self):
+        self.aborted = True
+        asyncio.get_event_loop().call_soon(self.protocol.connection_lost, None)
+
+
+def receive(protocol, data, chunk):
+    """Feeds data to protocol through get_buffer(), chunk bytes at a time."""
+    while data:
+        # The loop lets go of the buffer before calling buffer_updated().
+        with protocol.get_buffer(-1) as buf:
+            n = min(chunk, len(buf), len(data))
+            buf[:n] = data[:n]
+        protocol.buffer_updated(n)
+        data = data[n:]
+
+
+def frame(payload):
+    return pack("!i", len(payload)) + payload
+
+
+class FramingProtocolTest(unittest.IsolatedAsyncioTestCase):
+    def make_protocol(self, rbuf_size=16):
+        protocol = _FramingProtocol(rbuf_size)
+        protocol.connection_made(FakeTransport(protocol))
+        return protocol
+
+    async def test_partial_frames(self):
+        payloads = [b"", b"a", b"hello world", bytes(range(256)) * 3, b"end"]
+        data = b"".join(frame(p) for p in payloads)
+        for chunk in (1, 3, 7, 16, 1000):
+            with self.subTest(chunk=chunk):
+                protocol = self.make_protocol()
+                receive(protocol, data, chunk)
+                for payload in payloads:
+                    self.assertEqual(await protocol.readFrame(), payload)
+                self.assertEqual(protocol._end - protocol._start, 0)
+
+    async def test_reader_woken_by_whole_frame(self):
+        protocol = self.make_protocol()
+        reader = asyncio.ensure_future(protocol.readFrame())
+        data = frame(b"x" * 100)
+        receive(protocol, data[:-1], 10)
+        await asyncio.sleep(0)
+        self.assertFalse(reader.done())
+        receive(protocol, data[-1:], 10)
+        self.assertEqual(await reader, b"x" * 100)
+
+    async def test_oversized_frame_buffer_is_released(self):
+        protocol = self.make_protocol()
+        receive(protocol, frame(b"x" * 1000), 100)
+        self.assertEqual(await protocol.readFrame(), b"x" * 1000)
+        with protocol.get_buffer(-1) as buf:
+            self.assertEqual(len(buf), 16)
+
+    async def test_end_of_file(self):
+        protocol = self.make_protocol()
+        receive(protocol, frame(b"abc") + frame(b"truncated")[:-2], 5)
+        protocol.connection_lost(None)
+        # Complete frames are still read before the error.
+        self.assertEqual(await protocol.readFrame(), b"abc")
+        with self.assertRaises(TTransportException) as cm:
+            await protocol.readFrame()
+        self.assertEqual(cm.exception.type, TTransportException.END_OF_FILE)
+
+    async def test_end_of_file_wakes_reader(self):
+        protocol = self.make_protocol()
+        reader = asyncio.ensure_future(protocol.readFrame())
+        await asyncio.sleep(0)
+        protocol.connection_lost(ConnectionResetError())
+        with self.assertRaises(TTransportException) as cm:
+            await reader
+        self.assertEqual(cm.exception.type, TTransportException.END_OF_FILE)
+        self.assertIsInstance(cm.exception.inner, ConnectionResetError)
+
+    async def test_frame_size(self):
+        protocol = self.make_protocol()
+        receive(protocol, pack("!i", -1), 4)
+        self.assertTrue(protocol.transport.aborted)
+        with self.assertRaises(TTransportException) as cm:
+            await protocol.readFrame()
+        self.assertEqual(cm.exception.type, TTransportException.NEGATIVE_SIZE)
+
+        protocol = self.make_protocol()
+        protocol.max_frame_size = 10
+        receive(protocol, pack("!i", 11), 4)
+        self.assertTrue(protocol.transport.aborted)
+        with self.assertRaises(TTransportException) as cm:
+            await protocol.readFrame()
+        self.assertEqual(cm.exception.type, TTransportException.SIZE_LIMIT)
+
+    async def test_drain(self):
+        protocol = self.make_protocol()
+        protocol.pause_writing()
+        drains = [asyncio.ensure_future(protocol.drain()) for i in range(2)]
+        await asyncio.sleep(0)
+        drains[0].cancel()
+        protocol.resume_writing()
+        await drains[1]
+        self.assertTrue(drains[0].cancelled())
+
+    async def test_write_frame(self):
+        protocol = self.make_protocol()
+        protocol.writeFrame(b"hello")
+        self.assertEqual(b"".join(protocol.transport.written), frame(b"hello"))
+
+
+class TAsyncioProtocolSocketTest(ServerTestCase):
+    transport_factory = TTransportFactoryBase
+
+    def serverTransport(self):
+        return TAsyncioProtocolServerSocket("127.0.0.1", 0, rbuf_size=64)
+
+    async def connect(self):
+        trans = TAsyncioProtocolSocket("127.0.0.1", self.port, rbuf_size=64)
+        await trans.open()
+        return trans, Client(self.protocol_class(trans))
+
+    async def test_calls(self):
+        self.assertEqual(await self.client.echo("hello"), "hello")
+        big = "x" * 100000
+        self.assertEqual(await self.client.echo(big), big)
+        values = ["value %d" % i for i in range(100)]
+        results = await asyncio.gather(*[self.client.echo(v) for v in values])
+        self.assertEqual(results, values)
+
+    async def test_read_write(self):
+        trans = self.trans
+        self.assertTrue(trans.isOpen())
+        with self.assertRaises(TTransportException) as cm:
+            await trans.open()
+        self.assertEqual(cm.exception.type, TTransportException.ALREADY_OPEN)
+        await trans.close()
+        self.assertFalse(trans.isOpen())
+        with self.assertRaises(TTransportException) as cm:
+            await trans.flush()
+        self.assertEqual(cm.exception.type, TTransportException.NOT_OPEN)
+
+    async def test_connection_lost(self):
+        call = asyncio.ensure_future(self.client.sleep(5))
+        await asyncio.sleep(0.05)
+        self.server.stop()
+        with self.assertRaises(TTransportException) as cm:
+            await call
+        self.assertEqual(cm.exception.type, TTransportException.END_OF_FILE)
+
+    async def test_connection_refused(self):
+        self.server.stop()
+        await self.serving
+        trans = TAsyncioProtocolSocket("127.0.0.1", self.port)
+        with self.assertRaises(TTransportException) as cm:
+            await trans.open()
+        self.assertEqual(cm.exception.type, TTransportException.NOT_OPEN)
+
+
+if __name__ == "__main__":
+    unittest.main()
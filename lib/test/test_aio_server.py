@@ -0,0 +1,369 @@
+import asyncio
+import contextvars
+import os
+import socket
+import threading
+import time
+import unittest
+
+from aio_service import Client
+from aio_service import Handler as EchoHandler
+from test_aio_client import ServerTestCase
+from thriftx.aio.protocol.TAsyncioBinaryProtocol import (
+    TAsyncioBinaryProtocol,
+    TAsyncioBinaryProtocolFactory,
+)
+from thriftx.aio.server import TAsyncioProcessPoolServer
+from thriftx.aio.server.TAsyncioServer import TAsyncioServer
+from thriftx.aio.server.TAsyncioThreadPoolHandler import TAsyncioThreadPoolHandler
+from thriftx.aio.transport.TAsyncioSocket import TAsyncioServerSocket, TAsyncioSocket
+from thriftx.aio.transport.TAsyncioTransport import (
+    TAsyncioFramedTransport,
+    TAsyncioFramedTransportFactory,
+)
+from thriftx.protocol.TBinaryProtocol import TBinaryProtocol
+from thriftx.Thrift import TMessageType, TType
+from thriftx.transport import TSocket, TTransport
+
+
+class EchoProcessor:
+    """Replies to every message with its string argument and its pid."""
+
+    async def process(self, iprot, oprot):
+        name, type, seqid = await iprot.readMessageBegin()
+        value = await iprot.readString()
+        await iprot.readMessageEnd()
+        oprot.writeMessageBegin(name, TMessageType.REPLY, seqid)
+        oprot.writeString("%s:%d" % (value, os.getpid()))
+        oprot.writeMessageEnd()
+        await oprot.trans.flush()
+
+
+class SlowProcessor(EchoProcessor):
+    """Sleeps for the number of seconds it is sent before replying."""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.cancelled = False
+
+    async def process(self, iprot, oprot):
+        name, type, seqid = await iprot.readMessageBegin()
+        value = await iprot.readString()
+        await iprot.readMessageEnd()
+        self.started.set()
+        try:
+            await asyncio.sleep(float(value))
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        oprot.writeMessageBegin(name, TMessageType.REPLY, seqid)
+        oprot.writeString(value)
+        oprot.writeMessageEnd()
+        await oprot.trans.flush()
+
+
+def echo(port, value):
+    trans = TTransport.TFramedTransport(TSocket.TSocket("127.0.0.1", port))
+    trans.open()
+    try:
+        prot = TBinaryProtocol(trans)
+        prot.writeMessageBegin("echo", TMessageType.CALL, 1)
+        prot.writeString(value)
+        prot.writeMessageEnd()
+        trans.flush()
+        prot.readMessageBegin()
+        return prot.readString()
+    finally:
+        trans.close()
+
+
+def free_port():
+    sock = socket.socket()
+    try:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+    finally:
+        sock.close()
+
+
+class TAsyncioServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.errors = []
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: self.errors.append(context)
+        )
+        self.port = free_port()
+        self.processor = SlowProcessor()
+        self.server = TAsyncioServer(
+            self.processor,
+            TAsyncioServerSocket("127.0.0.1", self.port),
+            TAsyncioFramedTransportFactory(),
+            TAsyncioBinaryProtocolFactory(),
+        )
+        self.serving = asyncio.ensure_future(self.server.serve())
+        await asyncio.sleep(0.05)
+        self.trans = TAsyncioFramedTransport(TAsyncioSocket("127.0.0.1", self.port))
+        await self.trans.open()
+        self.prot = TAsyncioBinaryProtocol(self.trans)
+
+    async def asyncTearDown(self):
+        await self.trans.close()
+        self.assertEqual(self.errors, [])
+
+    async def call(self, value):
+        self.prot.writeMessageBegin("sleep", TMessageType.CALL, 1)
+        self.prot.writeString(value)
+        self.prot.writeMessageEnd()
+        await self.trans.flush()
+
+    async def test_stop_cancels_requests(self):
+        await self.call("60")
+        await self.processor.started.wait()
+        self.server.stop()
+        await asyncio.wait_for(self.serving, 5)
+        self.assertTrue(self.processor.cancelled)
+        self.assertEqual(asyncio.all_tasks(), {asyncio.current_task()})
+
+    async def test_stop_closes_idle_connections(self):
+        self.server.stop()
+        await asyncio.wait_for(self.serving, 5)
+        with self.assertRaises(TTransport.TTransportException):
+            await self.prot.readMessageBegin()
+        self.assertEqual(asyncio.all_tasks(), {asyncio.current_task()})
+
+    async def test_drain_answers_requests(self):
+        await self.call("0.1")
+        await self.processor.started.wait()
+        draining = asyncio.ensure_future(self.server.drain(5000))
+        await self.prot.readMessageBegin()
+        self.assertEqual(await self.prot.readString(), "0.1")
+        await asyncio.wait_for(draining, 5)
+        await asyncio.wait_for(self.serving, 5)
+        self.assertFalse(self.processor.cancelled)
+        self.assertEqual(asyncio.all_tasks(), {asyncio.current_task()})
+
+
+class CountingHandler(EchoHandler):
+    """Counts the sleep() calls running at once."""
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.max_active = 0
+
+    async def sleep(self, secs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            return await super().sleep(secs)
+        finally:
+            self.active -= 1
+
+
+class BackpressureTest(ServerTestCase):
+    handler_class = CountingHandler
+
+    def configure(self, server):
+        server.setMaxInflight(per_connection=2, total=3)
+        server.setMaxFrameSize(200 * 1024)
+
+    async def test_max_inflight_per_connection(self):
+        results = await asyncio.gather(*[self.client.sleep(0.05) for i in range(6)])
+        self.assertEqual(results, [0.05] * 6)
+        self.assertEqual(self.handler.max_active, 2)
+
+    async def test_max_inflight_total(self):
+        clients = [await self.connect() for i in range(3)]
+        for trans, client in clients:
+            self.addAsyncCleanup(trans.close)
+        calls = [client.sleep(0.05) for trans, client in clients for i in range(2)]
+        self.assertEqual(await asyncio.gather(*calls), [0.05] * 6)
+        self.assertEqual(self.handler.max_active, 3)
+
+    async def test_max_frame_size(self):
+        self.assertEqual(await self.client.echo("x" * 100000), "x" * 100000)
+        with self.assertRaises((TTransport.TTransportException, EOFError)):
+            await asyncio.wait_for(self.client.echo("x" * 300000), 5)
+        trans, client = await self.connect()
+        self.addAsyncCleanup(trans.close)
+        self.assertEqual(await client.echo("hello"), "hello")
+
+
+class UnframedMaxFrameSizeTest(ServerTestCase):
+    transport_factory = TTransport.TTransportFactoryBase
+
+    def configure(self, server):
+        server.setMaxFrameSize(200 * 1024)
+
+    async def connect(self):
+        trans = TAsyncioSocket("127.0.0.1", self.port)
+        await trans.open()
+        return trans, Client(self.protocol_class(trans))
+
+    async def test_connections_are_cleaned_up(self):
+        # An unframed transport can't limit frames, so connections fail.
+        with self.assertLogs("thriftx.aio.server.TAsyncioServer") as cm:
+            trans, client = await self.connect()
+            self.addAsyncCleanup(trans.close)
+            with self.assertRaises((TTransport.TTransportException, EOFError)):
+                await asyncio.wait_for(client.echo("hello"), 5)
+            while self.server._handlers:
+                await asyncio.sleep(0.01)
+        self.assertIn("setMaxFrameSize()", cm.output[0])
+        self.assertEqual(self.server._connections, {})
+
+
+class WriteBufferLimitsTest(ServerTestCase):
+    def configure(self, server):
+        server.setWriteBufferLimits(64 * 1024, 16 * 1024)
+
+    async def test_write_buffer_limits(self):
+        # Requests aren't read while the replies are not being read.
+        value = "x" * 100000
+        prot = TAsyncioBinaryProtocol(self.trans)
+
+        async def send(count):
+            for i in range(count):
+                prot.writeMessageBegin("echo", TMessageType.CALL, i)
+                prot.writeStructBegin("echo_args")
+                prot.writeFieldBegin("s", TType.STRING, 1)
+                prot.writeString(value)
+                prot.writeFieldEnd()
+                prot.writeFieldStop()
+                prot.writeStructEnd()
+                prot.writeMessageEnd()
+                await self.trans.flush()
+
+        sending = asyncio.ensure_future(send(300))
+        await asyncio.sleep(0.3)
+        stalled = self.handler.calls
+        await asyncio.sleep(0.2)
+        self.assertEqual(self.handler.calls, stalled)
+        self.assertLess(stalled, 300)
+        for i in range(300):
+            await prot.readMessageBegin()
+            await prot.skip(TType.STRUCT)
+            await prot.readMessageEnd()
+        await asyncio.wait_for(sending, 5)
+        self.assertEqual(self.handler.calls, 300)
+
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class Handler:
+    def __init__(self, loop):
+        self.loop = loop
+
+    def thread(self):
+        return threading.current_thread().name, request_id.get()
+
+    async def loop_thread(self):
+        return threading.current_thread().name
+
+    def scheduled(self, value):
+        async def double():
+            return value * 2
+
+        return asyncio.run_coroutine_threadsafe(double(), self.loop)
+
+    def coroutine(self, value):
+        async def triple():
+            return value * 3
+
+        return triple()
+
+
+class TAsyncioThreadPoolHandlerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.handler = TAsyncioThreadPoolHandler(
+            Handler(asyncio.get_running_loop()), max_workers=2
+        )
+
+    async def asyncTearDown(self):
+        self.handler.executor.shutdown()
+
+    async def test_sync_methods_run_in_threads(self):
+        request_id.set(42)
+        name, value = await self.handler.thread()
+        self.assertTrue(name.startswith("thrift-handler"))
+        self.assertEqual(value, 42)
+
+    async def test_coroutine_methods_run_in_loop(self):
+        name = await self.handler.loop_thread()
+        self.assertEqual(name, threading.current_thread().name)
+
+    async def test_returned_awaitables_are_awaited(self):
+        self.assertEqual(await self.handler.scheduled(2), 4)
+        self.assertEqual(await self.handler.coroutine(2), 6)
+
+
+@unittest.skipUnless(hasattr(socket, "SO_REUSEPORT"), "needs SO_REUSEPORT")
+class TAsyncioProcessPoolServerTest(unittest.TestCase):
+    def make_server(self, port):
+        server = TAsyncioProcessPoolServer.TAsyncioProcessPoolServer(
+            EchoProcessor(),
+            TAsyncioServerSocket("127.0.0.1", port),
+            TAsyncioFramedTransportFactory(),
+            TAsyncioBinaryProtocolFactory(),
+        )
+        server.setNumWorkers(2)
+        server.setDrainTimeout(1000)
+        return server
+
+    def serve(self, server, client):
+        done = threading.Event()
+        results = []
+
+        def run():
+            try:
+                results.append(client())
+            finally:
+                server.stop()
+                done.set()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        started = time.monotonic()
+        server.serve()
+        elapsed = time.monotonic() - started
+        thread.join()
+        self.assertTrue(done.is_set())
+        return results, elapsed
+
+    def test_serve(self):
+        port = free_port()
+        server = self.make_server(port)
+
+        def client():
+            deadline = time.monotonic() + 5
+            while True:
+                try:
+                    return echo(port, "hello")
+                except TTransport.TTransportException:
+                    if time.monotonic() > deadline:
+                        raise
+                    time.sleep(0.05)
+
+        results, _ = self.serve(server, client)
+        value, pid = results[0].split(":")
+        self.assertEqual(value, "hello")
+        self.assertNotEqual(int(pid), os.getpid())
+        self.assertEqual(server.workers, [])
+
+    def test_stop_during_restart_delay(self):
+        server = self.make_server(free_port())
+        # Workers exiting at once are restarted after a delay.
+        server.setPostForkCallback(lambda: os._exit(1))
+        lifetime = TAsyncioProcessPoolServer.MIN_WORKER_LIFETIME
+        self.addCleanup(
+            setattr, TAsyncioProcessPoolServer, "MIN_WORKER_LIFETIME", lifetime
+        )
+        TAsyncioProcessPoolServer.MIN_WORKER_LIFETIME = 30.0
+        _, elapsed = self.serve(server, lambda: time.sleep(0.5))
+        self.assertLess(elapsed, 10.0)
+        self.assertEqual(server.workers, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
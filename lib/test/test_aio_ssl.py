@@ -0,0 +1,203 @@
+import asyncio
+import os
+import ssl
+import unittest
+
+from aio_service import Client
+from test_aio_client import ServerTestCase
+from thriftx.aio.protocol.TAsyncioBinaryProtocol import TAsyncioBinaryProtocol
+from thriftx.aio.transport import TAsyncioSSLSocket as ssl_module
+from thriftx.aio.transport.TAsyncioSocket import TAsyncioSocket
+from thriftx.aio.transport.TAsyncioSSLSocket import (
+    TAsyncioSSLServerSocket,
+    TAsyncioSSLSocket,
+)
+from thriftx.aio.transport.TAsyncioTransport import TAsyncioFramedTransport
+from thriftx.transport.TTransport import TTransportException
+
+KEYS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "keys")
+# A self-signed certificate for localhost and 127.0.0.1.
+CERTFILE = os.path.join(KEYS, "server.crt")
+KEYFILE = os.path.join(KEYS, "server.key")
+# Another self-signed certificate, which the server's is not signed with.
+OTHER_CERTFILE = os.path.join(KEYS, "other.crt")
+
+
+class AnsweringSSLObject:
+    """Has something to send back to the peer after each read."""
+
+    session = None
+
+    def __init__(self, outgoing):
+        self.outgoing = outgoing
+
+    def read(self, sz):
+        self.outgoing.write(b"answer")
+        return b"data"
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+
+class SSLTestCase(ServerTestCase):
+    server_kwargs = {}
+
+    def setUp(self):
+        self.addCleanup(ssl_module._sessions.clear)
+        self.addCleanup(ssl_module.clearContextCache)
+
+    def serverTransport(self):
+        return TAsyncioSSLServerSocket(
+            "127.0.0.1",
+            0,
+            certfile=CERTFILE,
+            keyfile=KEYFILE,
+            **self.server_kwargs
+        )
+
+    def socket(self, host="localhost", **kwargs):
+        kwargs.setdefault("ca_certs", CERTFILE)
+        return TAsyncioSSLSocket(host, self.port, **kwargs)
+
+    async def connect(self, sock=None):
+        if sock is None:
+            sock = self.socket()
+        trans = TAsyncioFramedTransport(sock)
+        await trans.open()
+        return trans, Client(TAsyncioBinaryProtocol(trans))
+
+
+class TAsyncioSSLSocketTest(SSLTestCase):
+    async def test_calls(self):
+        self.assertTrue(self.trans._trans.is_valid)
+        self.assertEqual(await self.client.echo("hello"), "hello")
+        value = "x" * 200000
+        values = [value, "short", value]
+        results = await asyncio.gather(*[self.client.echo(v) for v in values])
+        self.assertEqual(results, values)
+        await self.client.log("message")
+        self.assertEqual(await self.client.echo("hello"), "hello")
+        self.assertEqual(self.handler.logged, ["message"])
+
+    async def test_session_reuse(self):
+        self.assertFalse(self.trans._trans.session_reused)
+        # TLS 1.3 session tickets arrive with the first data.
+        await self.client.echo("hello")
+        # The session is resumed while the first connection is still open.
+        for i in range(2):
+            trans, client = await self.connect()
+            self.addAsyncCleanup(trans.close)
+            self.assertTrue(trans._trans.session_reused)
+            self.assertEqual(await client.echo("hello"), "hello")
+
+    async def test_sessions_by_server(self):
+        await self.client.echo("hello")
+        sock = self.socket("127.0.0.1")
+        trans, client = await self.connect(sock)
+        self.addAsyncCleanup(trans.close)
+        self.assertFalse(sock.session_reused)
+
+    async def test_shared_context(self):
+        self.assertIs(self.socket().ssl_context, self.socket().ssl_context)
+        other = self.socket(ciphers="ECDHE+AESGCM")
+        self.assertIsNot(other.ssl_context, self.socket().ssl_context)
+        context = self.socket().ssl_context
+        ssl_module.clearContextCache()
+        self.assertIsNot(self.socket().ssl_context, context)
+
+    async def test_validation_failure(self):
+        def refuse(cert, hostname):
+            raise ValueError("refused")
+
+        sock = self.socket(validate_callback=refuse)
+        with self.assertRaises(TTransportException):
+            await sock.open()
+        self.assertFalse(sock.isOpen())
+
+    async def test_untrusted_certificate(self):
+        sock = self.socket(ca_certs=OTHER_CERTFILE)
+        with self.assertRaises(TTransportException) as cm:
+            await sock.open()
+        self.assertEqual(cm.exception.type, TTransportException.NOT_OPEN)
+        # The server goes on serving others.
+        trans, client = await self.connect()
+        self.addAsyncCleanup(trans.close)
+        self.assertEqual(await client.echo("hello"), "hello")
+
+    async def test_not_ssl_server(self):
+        self.server.stop()
+        await self.serving
+        plain = await asyncio.start_server(
+            lambda reader, writer: writer.close(), "127.0.0.1", 0
+        )
+        self.addAsyncCleanup(plain.wait_closed)
+        self.addCleanup(plain.close)
+        self.port = plain.sockets[0].getsockname()[1]
+        with self.assertRaises(TTransportException) as cm:
+            await self.socket().open()
+        self.assertEqual(cm.exception.type, TTransportException.NOT_OPEN)
+
+    async def test_read_sends_answers(self):
+        sock = self.socket()
+        sock._outgoing = ssl.MemoryBIO()
+        sock._sslobj = AnsweringSSLObject(sock._outgoing)
+        sock._writer = RecordingWriter()
+        self.assertEqual(await sock.read(10), b"data")
+        self.assertEqual(sock._writer.written, [b"answer"])
+
+    async def test_end_of_file(self):
+        call = asyncio.ensure_future(self.client.sleep(5))
+        await asyncio.sleep(0.05)
+        self.server.stop()
+        with self.assertRaises(TTransportException) as cm:
+            await asyncio.wait_for(call, 5)
+        self.assertEqual(cm.exception.type, TTransportException.END_OF_FILE)
+
+
+class HandshakeTimeoutTest(SSLTestCase):
+    def configure(self, server):
+        server.serverTransport.setHandshakeTimeout(100)
+
+    async def test_handshake_timeout(self):
+        # A client that never shakes hands is disconnected.
+        sock = TAsyncioSocket("127.0.0.1", self.port)
+        await sock.open()
+        self.addAsyncCleanup(sock.close)
+        with self.assertRaises(TTransportException) as cm:
+            await asyncio.wait_for(sock.read(1), 5)
+        self.assertEqual(cm.exception.type, TTransportException.END_OF_FILE)
+        self.assertEqual(await self.client.echo("hello"), "hello")
+
+
+class ClientCertificateTest(SSLTestCase):
+    server_kwargs = {"cert_reqs": ssl.CERT_REQUIRED, "ca_certs": CERTFILE}
+
+    def socket(self, host="localhost", **kwargs):
+        kwargs.setdefault("certfile", CERTFILE)
+        kwargs.setdefault("keyfile", KEYFILE)
+        return super().socket(host, **kwargs)
+
+    async def test_client_certificate(self):
+        self.assertEqual(await self.client.echo("hello"), "hello")
+
+    async def test_missing_client_certificate(self):
+        trans = TAsyncioFramedTransport(self.socket(certfile=None, keyfile=None))
+        client = Client(TAsyncioBinaryProtocol(trans))
+        try:
+            # With TLS 1.3 the server only refuses it after the handshake.
+            await trans.open()
+            with self.assertRaises((TTransportException, EOFError)):
+                await asyncio.wait_for(client.echo("hello"), 5)
+        except TTransportException:
+            pass
+        finally:
+            await trans.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
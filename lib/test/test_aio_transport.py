@@ -0,0 +1,447 @@
+import asyncio
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+import zlib
+from struct import pack
+
+from thriftx.aio.transport.TAsyncioSocket import TAsyncioServerSocket, TAsyncioSocket
+from thriftx.aio.transport.TAsyncioTransport import (
+    TAsyncioBatchingTransport,
+    TAsyncioBufferedTransport,
+    TAsyncioFramedTransport,
+    TAsyncioMemoryBuffer,
+    TAsyncioTransportBase,
+    _oneway,
+)
+from thriftx.aio.transport.TAsyncioZlibTransport import TAsyncioZlibTransport
+from thriftx.transport import TTransport
+from thriftx.transport.TTransport import TTransportException
+from thriftx.transport.TZlibTransport import TZlibTransport
+
+
+class RecordingTransport(TAsyncioTransportBase):
+    """Records what is flushed, and fails the flushes it is told to.
+
+    Flushes wait for the blocked event, when one is set.
+    """
+
+    def __init__(self):
+        self.pending = b""
+        self.flushed = []
+        self.fail = False
+        self.blocked = None
+
+    def write(self, buf):
+        self.pending += buf
+
+    async def flush(self):
+        out, self.pending = self.pending, b""
+        if self.blocked is not None:
+            await self.blocked.wait()
+        if self.fail:
+            raise TTransportException(
+                type=TTransportException.NOT_OPEN, message="broken"
+            )
+        if out:
+            self.flushed.append(out)
+
+
+class ChunkedTransport(TAsyncioTransportBase):
+    """Returns at most chunk bytes per read, and records the reads."""
+
+    def __init__(self, data, chunk):
+        self.data = data
+        self.chunk = chunk
+        self.reads = []
+
+    async def read(self, sz):
+        self.reads.append(sz)
+        ret = self.data[: min(sz, self.chunk)]
+        self.data = self.data[len(ret) :]
+        return ret
+
+
+async def send(trans, message, oneway=False):
+    token = _oneway.set(oneway)
+    try:
+        trans.write(message)
+        await trans.flush()
+    finally:
+        _oneway.reset(token)
+
+
+class ServerMixin:
+    """Runs a TAsyncioServerSocket handing connections to self.accepted()."""
+
+    async def listen(self, unix_socket=None):
+        if unix_socket is None:
+            self.server = TAsyncioServerSocket("127.0.0.1", 0)
+        else:
+            self.server = TAsyncioServerSocket(unix_socket=unix_socket)
+        await self.server.listen(self.accepted)
+        self.addAsyncCleanup(self.server.close)
+        if unix_socket is None:
+            port = self.server.handle.sockets[0].getsockname()[1]
+            return TAsyncioSocket("127.0.0.1", port)
+        return TAsyncioSocket(unix_socket=unix_socket)
+
+    async def accepted(self, client):
+        """Echoes every frame back."""
+        trans = TAsyncioFramedTransport(client)
+        try:
+            while True:
+                await trans.readFrame()
+                trans.write(trans._frame)
+                await trans.flush()
+        except TTransportException:
+            pass
+        finally:
+            await trans.close()
+
+
+class TAsyncioSocketTest(ServerMixin, unittest.IsolatedAsyncioTestCase):
+    async def echo(self, sock):
+        trans = TAsyncioFramedTransport(sock)
+        await trans.open()
+        try:
+            self.assertTrue(trans.isOpen())
+            payload = b"x" * 100000
+            trans.write(b"hello")
+            await trans.flush()
+            trans.write(payload)
+            await trans.flush()
+            self.assertEqual(await trans.readAll(5), b"hello")
+            self.assertEqual(await trans.read(10), b"x" * 10)
+            self.assertEqual(await trans.readAll(len(payload) - 10), payload[10:])
+        finally:
+            await trans.close()
+        self.assertFalse(trans.isOpen())
+
+    async def test_tcp(self):
+        await self.echo(await self.listen())
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix sockets")
+    async def test_unix_socket(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        await self.echo(await self.listen(os.path.join(path, "socket")))
+
+    async def test_end_of_file(self):
+        async def accepted(client):
+            client.write(b"abc")
+            await client.flush()
+            await client.close()
+
+        self.accepted = accepted
+        sock = await self.listen()
+        await sock.open()
+        self.addAsyncCleanup(sock.close)
+        with self.assertRaises(TTransportException) as cm:
+            await sock.readAll(4)
+        self.assertEqual(cm.exception.type, TTransportException.END_OF_FILE)
+        with self.assertRaises(TTransportException) as cm:
+            await sock.read(1)
+        self.assertEqual(cm.exception.type, TTransportException.END_OF_FILE)
+
+    async def test_open(self):
+        sock = await self.listen()
+        await sock.open()
+        self.addAsyncCleanup(sock.close)
+        with self.assertRaises(TTransportException) as cm:
+            await sock.open()
+        self.assertEqual(cm.exception.type, TTransportException.ALREADY_OPEN)
+
+    async def test_connection_refused(self):
+        sock = await self.listen()
+        await self.server.close()
+        with self.assertRaises(TTransportException) as cm:
+            await sock.open()
+        self.assertEqual(cm.exception.type, TTransportException.NOT_OPEN)
+
+    async def test_flush_not_open(self):
+        sock = TAsyncioSocket()
+        sock.write(b"abc")
+        with self.assertRaises(TTransportException) as cm:
+            await sock.flush()
+        self.assertEqual(cm.exception.type, TTransportException.NOT_OPEN)
+
+
+class TAsyncioFramedTransportTest(unittest.IsolatedAsyncioTestCase):
+    async def test_round_trip(self):
+        inner = TAsyncioMemoryBuffer()
+        writer = TAsyncioFramedTransport(inner)
+        writer.write(b"hello")
+        await writer.flush()
+        writer.write(b"world")
+        await writer.flush()
+        self.assertEqual(inner.getvalue(), b"\0\0\0\x05hello\0\0\0\x05world")
+        reader = TAsyncioFramedTransport(TAsyncioMemoryBuffer(inner.getvalue()))
+        self.assertEqual(await reader.read(100), b"hello")
+        self.assertEqual(await reader.readAll(5), b"world")
+
+    async def test_frame_size(self):
+        trans = TAsyncioFramedTransport(TAsyncioMemoryBuffer(pack("!i", -1)))
+        with self.assertRaises(TTransportException) as cm:
+            await trans.read(1)
+        self.assertEqual(cm.exception.type, TTransportException.NEGATIVE_SIZE)
+
+        inner = TAsyncioMemoryBuffer(pack("!i", 11) + b"x" * 11)
+        trans = TAsyncioFramedTransport(inner)
+        trans.set_max_frame_size(10)
+        with self.assertRaises(TTransportException) as cm:
+            await trans.read(1)
+        self.assertEqual(cm.exception.type, TTransportException.SIZE_LIMIT)
+
+    async def test_truncated_frame(self):
+        inner = TAsyncioMemoryBuffer(pack("!i", 10) + b"abc")
+        trans = TAsyncioFramedTransport(inner)
+        with self.assertRaises(EOFError):
+            await trans.read(1)
+
+
+class TAsyncioBufferedTransportTest(unittest.IsolatedAsyncioTestCase):
+    data = bytes(range(256)) * 40
+
+    async def test_reads_across_refills(self):
+        inner = ChunkedTransport(self.data, 100)
+        trans = TAsyncioBufferedTransport(inner, rbuf_size=64)
+        self.assertEqual(await trans.readAll(10), self.data[:10])
+        self.assertEqual(await trans.read(100), self.data[10:64])
+        self.assertEqual(await trans.readAll(300), self.data[64:364])
+        self.assertEqual(await trans.readAll(3), self.data[364:367])
+        rest = len(self.data) - 367
+        self.assertEqual(await trans.readAll(rest), self.data[367:])
+        with self.assertRaises(EOFError):
+            await trans.readAll(1)
+
+    async def test_small_reads_are_buffered(self):
+        inner = ChunkedTransport(self.data, 10000)
+        trans = TAsyncioBufferedTransport(inner, rbuf_size=1024)
+        for i in range(256):
+            self.assertEqual(await trans.readAll(4), self.data[i * 4 : i * 4 + 4])
+        self.assertEqual(inner.reads, [1024])
+
+    async def test_large_reads_bypass_the_buffer(self):
+        inner = ChunkedTransport(self.data, 10000)
+        trans = TAsyncioBufferedTransport(inner, rbuf_size=64)
+        self.assertEqual(await trans.read(1000), self.data[:1000])
+        self.assertEqual(inner.reads, [1000])
+
+    async def test_peek(self):
+        trans = TAsyncioBufferedTransport(ChunkedTransport(b"abcdef", 4), 4)
+        self.assertEqual(trans.peek(2), b"")
+        await trans.fill()
+        self.assertEqual(trans.peek(8), b"abcd")
+        trans.consume(3)
+        self.assertEqual(trans.peek(8), b"d")
+        await trans.fill()
+        self.assertEqual(trans.peek(8), b"def")
+        self.assertEqual(await trans.readAll(3), b"def")
+        with self.assertRaises(EOFError):
+            await trans.fill()
+
+    async def test_write_flush(self):
+        inner = TAsyncioMemoryBuffer()
+        trans = TAsyncioBufferedTransport(inner)
+        trans.write(b"abc")
+        trans.write(b"def")
+        self.assertEqual(inner.getvalue(), b"")
+        await trans.flush()
+        self.assertEqual(inner.getvalue(), b"abcdef")
+
+
+class TAsyncioBatchingTransportTest(unittest.IsolatedAsyncioTestCase):
+    async def test_batches_oneway_messages(self):
+        inner = RecordingTransport()
+        trans = TAsyncioBatchingTransport(inner, max_delay=1000)
+        await send(trans, b"a", oneway=True)
+        await send(trans, b"b", oneway=True)
+        self.assertEqual(inner.flushed, [])
+        await send(trans, b"c")
+        self.assertEqual(inner.flushed, [b"abc"])
+
+    async def test_max_bytes(self):
+        inner = RecordingTransport()
+        trans = TAsyncioBatchingTransport(inner, max_bytes=4, max_delay=1000)
+        await send(trans, b"ab", oneway=True)
+        await send(trans, b"cd", oneway=True)
+        self.assertEqual(inner.flushed, [b"abcd"])
+
+    async def test_max_delay(self):
+        inner = RecordingTransport()
+        trans = TAsyncioBatchingTransport(inner, max_delay=1)
+        await send(trans, b"a", oneway=True)
+        await asyncio.sleep(0.05)
+        self.assertEqual(inner.flushed, [b"a"])
+
+    async def test_background_failure(self):
+        inner = RecordingTransport()
+        trans = TAsyncioBatchingTransport(inner, max_delay=1)
+        inner.fail = True
+        await send(trans, b"a", oneway=True)
+        await send(trans, b"b", oneway=True)
+        await asyncio.sleep(0.05)
+        inner.fail = False
+        with self.assertRaises(TTransportException) as cm:
+            await send(trans, b"lost")
+        self.assertEqual(cm.exception.type, TTransportException.NOT_OPEN)
+        self.assertIn("2 batched oneway messages", cm.exception.message)
+        # The message reported as failed is not sent later.
+        await send(trans, b"next")
+        self.assertEqual(inner.flushed, [b"next"])
+
+    async def test_flush_waits_for_background_write(self):
+        inner = RecordingTransport()
+        inner.blocked = asyncio.Event()
+        trans = TAsyncioBatchingTransport(inner, max_delay=1)
+        await send(trans, b"a", oneway=True)
+        await asyncio.sleep(0.05)
+        self.assertIsNotNone(trans._flushing)
+        flushing = asyncio.ensure_future(send(trans, b"b"))
+        await asyncio.sleep(0.05)
+        self.assertFalse(flushing.done())
+        inner.blocked.set()
+        await asyncio.wait_for(flushing, 5)
+        self.assertEqual(inner.flushed, [b"a", b"b"])
+        self.assertIsNone(trans._flushing)
+
+    async def test_flush_reports_background_failure(self):
+        inner = RecordingTransport()
+        inner.blocked = asyncio.Event()
+        inner.fail = True
+        trans = TAsyncioBatchingTransport(inner, max_delay=1)
+        await send(trans, b"a", oneway=True)
+        await asyncio.sleep(0.05)
+        flushing = asyncio.ensure_future(send(trans, b"lost"))
+        await asyncio.sleep(0.01)
+        inner.blocked.set()
+        with self.assertRaises(TTransportException) as cm:
+            await asyncio.wait_for(flushing, 5)
+        self.assertIn("1 batched oneway messages", cm.exception.message)
+
+    async def test_close_cancels_background_write(self):
+        inner = RecordingTransport()
+        inner.blocked = asyncio.Event()
+        trans = TAsyncioBatchingTransport(inner, max_delay=1)
+        await send(trans, b"a", oneway=True)
+        await asyncio.sleep(0.05)
+        background = trans._flushing
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(trans.close(), 0.05)
+        await asyncio.sleep(0)
+        self.assertTrue(background.cancelled())
+        self.assertIsNone(trans._flushing)
+
+    async def test_close_flushes(self):
+        inner = RecordingTransport()
+        trans = TAsyncioBatchingTransport(inner, max_delay=1000)
+        await send(trans, b"a", oneway=True)
+        await trans.close()
+        self.assertEqual(inner.flushed, [b"a"])
+
+
+class TAsyncioZlibTransportTest(unittest.IsolatedAsyncioTestCase):
+    # Small messages go out as stored blocks, the others compressed.
+    messages = [b"small", bytes(range(256)) * 40, b"", b"tiny", b"y" * 300]
+
+    async def write(self, **kwargs):
+        buf = TAsyncioMemoryBuffer()
+        trans = TAsyncioZlibTransport(buf, **kwargs)
+        for message in self.messages:
+            trans.write(message)
+            await trans.flush()
+        return trans, buf.getvalue()
+
+    async def read(self, data, chunk=100000):
+        trans = TAsyncioZlibTransport(ChunkedTransport(data, chunk))
+        for message in self.messages:
+            self.assertEqual(await trans.readAll(len(message)), message)
+        return trans
+
+    async def test_round_trip(self):
+        writer, data = await self.write()
+        for chunk in (1, 3, 100, 100000):
+            with self.subTest(chunk=chunk):
+                await self.read(data, chunk)
+        self.assertEqual(writer.bytes_out, sum(map(len, self.messages)))
+        self.assertEqual(writer.bytes_out_comp, len(data))
+
+    async def test_stored_blocks(self):
+        # Everything is stored, in blocks of at most 64 KiB.
+        self.messages = [b"x" * 70000, b"abc", b"y" * 65535]
+        writer, data = await self.write(min_size=1 << 20)
+        # The stream header, and the five byte header of each block.
+        self.assertEqual(len(data), 2 + sum(map(len, self.messages)) + 4 * 5)
+        await self.read(data, 1000)
+        self.assertEqual(zlib.decompressobj().decompress(data), b"".join(self.messages))
+
+    async def test_compressed_only(self):
+        writer, data = await self.write(min_size=0)
+        await self.read(data, 7)
+
+    async def test_offload(self):
+        writer, data = await self.write(offload_size=1)
+        trans = TAsyncioZlibTransport(TAsyncioMemoryBuffer(data), offload_size=1)
+        for message in self.messages:
+            self.assertEqual(await trans.readAll(len(message)), message)
+
+    async def test_sync_reader(self):
+        writer, data = await self.write()
+        trans = TZlibTransport(TTransport.TMemoryBuffer(data))
+        for message in self.messages:
+            self.assertEqual(trans.readAll(len(message)), message)
+
+    async def test_sync_writer(self):
+        buf = TTransport.TMemoryBuffer()
+        trans = TZlibTransport(buf)
+        for message in self.messages:
+            trans.write(message)
+            trans.flush()
+        await self.read(buf.getvalue(), 5)
+
+    async def test_concurrent_flushes(self):
+        buf = TAsyncioMemoryBuffer()
+        trans = TAsyncioZlibTransport(buf, offload_size=1000)
+
+        async def send(message):
+            trans.write(message)
+            await trans.flush()
+
+        messages = [bytes([i]) * (i * 100) for i in range(1, 30)]
+        await asyncio.gather(*[send(message) for message in messages])
+        self.assertEqual(
+            zlib.decompressobj().decompress(buf.getvalue()), b"".join(messages)
+        )
+
+    async def test_end_of_file(self):
+        writer, data = await self.write()
+        with self.assertRaises(EOFError):
+            await TAsyncioZlibTransport(TAsyncioMemoryBuffer(b"")).readAll(1)
+        self.messages.append(b"more")
+        with self.assertRaises(EOFError):
+            await self.read(data, 10)
+        # A block cut short leaves its data unreadable.
+        self.messages = [b"x" * 1000]
+        writer, data = await self.write(min_size=1 << 20)
+        with self.assertRaises(EOFError):
+            await self.read(data[:-10], 10)
+
+    async def test_framed(self):
+        buf = TAsyncioMemoryBuffer()
+        writer = TAsyncioFramedTransport(TAsyncioZlibTransport(buf))
+        messages = [message for message in self.messages if message]
+        for message in messages:
+            writer.write(message)
+            await writer.flush()
+        reader = TAsyncioFramedTransport(
+            TAsyncioZlibTransport(ChunkedTransport(buf.getvalue(), 3))
+        )
+        for message in messages:
+            self.assertEqual(await reader.readAll(len(message)), message)
+
+
+if __name__ == "__main__":
+    unittest.main()
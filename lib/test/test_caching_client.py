@@ -0,0 +1,159 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements. See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership. The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License. You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+import traceback
+import unittest
+from unittest import mock
+
+from thriftx import TCachingClient as TCachingClientModule
+from thriftx.protocol.TBase import TBase, TExceptionBase
+from thriftx.TCachingClient import TCachingClient
+from thriftx.Thrift import TApplicationException, TType
+
+
+# The structs the generator writes for:
+#   service Store { string get(1: string key) throws (1: NotFound missing) }
+class NotFound(TExceptionBase):
+    thrift_spec = (None, (1, TType.STRING, 'key', 'UTF8', None))
+
+    def __init__(self, key=None):
+        self.key = key
+
+
+class get_args(TBase):
+    thrift_spec = (None, (1, TType.STRING, 'key', 'UTF8', None))
+
+    def __init__(self, key=None):
+        self.key = key
+
+
+class get_result(TBase):
+    thrift_spec = (
+        (0, TType.STRING, 'success', 'UTF8', None),
+        (1, TType.STRUCT, 'missing', [NotFound, None], None),
+    )
+
+
+class Client(object):
+
+    def __init__(self):
+        self.calls = []
+        self.values = {}
+
+    def get(self, key):
+        self.calls.append(key)
+        if key == 'error':
+            raise TApplicationException(TApplicationException.INTERNAL_ERROR)
+        if key not in self.values:
+            raise NotFound(key)
+        return self.values[key]
+
+    def put(self, key, value):
+        self.values[key] = value
+
+
+class TCachingClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        self.client.values = {'a': 'A', 'b': 'B', 'c': 'C'}
+        self.caching = TCachingClient(self.client, maxsize=2)
+        self.caching.setTTL('get', 1000)
+        self.now = 100.0
+        patcher = mock.patch.object(TCachingClientModule, '_clock',
+                                    lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_hits(self):
+        self.assertEqual(self.caching.get('a'), 'A')
+        self.client.values['a'] = 'changed'
+        self.assertEqual(self.caching.get('a'), 'A')
+        self.assertEqual(self.caching.get(key='a'), 'A')
+        self.assertEqual(self.client.calls, ['a'])
+        self.assertEqual((self.caching.hits, self.caching.misses), (2, 1))
+
+    def test_ttl(self):
+        self.caching.get('a')
+        self.now += 0.999
+        self.caching.get('a')
+        self.now += 0.001
+        self.caching.get('a')
+        self.assertEqual(self.client.calls, ['a', 'a'])
+
+    def test_lru_eviction(self):
+        self.caching.get('a')
+        self.caching.get('b')
+        self.caching.get('a')
+        # b is the least recently used, so it is evicted first.
+        self.caching.get('c')
+        self.caching.get('a')
+        self.caching.get('b')
+        self.assertEqual(self.client.calls, ['a', 'b', 'c', 'b'])
+
+    def test_declared_exceptions_are_cached(self):
+        for i in range(2):
+            with self.assertRaises(NotFound):
+                self.caching.get('missing')
+        self.assertEqual(self.client.calls, ['missing'])
+
+    def test_cached_exceptions_keep_no_traceback(self):
+        raised = []
+        for i in range(5):
+            try:
+                self.caching.get('missing')
+            except NotFound as e:
+                raised.append(e)
+        self.assertEqual([e.key for e in raised], ['missing'] * 5)
+        for e in raised:
+            self.assertLessEqual(len(traceback.extract_tb(e.__traceback__)), 3)
+        entry, = self.caching._entries.values()
+        self.assertIsNone(entry[2].__traceback__)
+
+    def test_other_exceptions_are_not_cached(self):
+        for i in range(2):
+            with self.assertRaises(TApplicationException):
+                self.caching.get('error')
+        self.assertEqual(self.client.calls, ['error', 'error'])
+
+    def test_uncached_methods(self):
+        self.caching.put('d', 'D')
+        self.assertEqual(self.client.values['d'], 'D')
+        self.assertEqual(self.caching.calls, self.client.calls)
+
+    def test_stop_caching(self):
+        self.caching.get('a')
+        self.caching.setTTL('get', None)
+        self.caching.get('a')
+        self.caching.get('a')
+        self.assertEqual(self.client.calls, ['a', 'a', 'a'])
+
+    def test_clear(self):
+        self.caching.get('a')
+        self.caching.clear()
+        self.caching.get('a')
+        self.assertEqual(self.client.calls, ['a', 'a'])
+
+    def test_unknown_method(self):
+        with self.assertRaises(AttributeError):
+            self.caching.setTTL('missing', 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements. See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership. The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License. You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+import unittest
+
+from thriftx.compat import BufferIO
+from thriftx.protocol.TJSONProtocol import (
+    BulkReader,
+    LookaheadReader,
+    TJSONProtocol,
+)
+from thriftx.Thrift import TMessageType, TType
+from thriftx.transport import TTransport
+
+# The fields of the struct written by write_message(), as (id, type, value).
+FIELDS = [
+    (1, TType.BOOL, True),
+    (2, TType.BYTE, -7),
+    (3, TType.I16, -300),
+    (4, TType.I32, 2 ** 31 - 1),
+    (5, TType.I64, -2 ** 63),
+    (6, TType.DOUBLE, -2.5e-10),
+    (7, TType.DOUBLE, 1e300),
+    (8, TType.STRING, ''),
+    (9, TType.STRING, 'plain ' * 100),
+    (10, TType.STRING, 'quote " backslash \\ slash / tab \t nul \x00'),
+    (11, TType.STRING, 'non-ascii é € \U0001f600'),
+]
+
+
+def write_message(prot, seqid):
+    prot.writeMessageBegin('method', TMessageType.CALL, seqid)
+    prot.writeStructBegin('args')
+    writers = {
+        TType.BOOL: prot.writeBool,
+        TType.BYTE: prot.writeByte,
+        TType.I16: prot.writeI16,
+        TType.I32: prot.writeI32,
+        TType.I64: prot.writeI64,
+        TType.DOUBLE: prot.writeDouble,
+        TType.STRING: prot.writeString,
+    }
+    for fid, ftype, value in FIELDS:
+        prot.writeFieldBegin('field', ftype, fid)
+        writers[ftype](value)
+        prot.writeFieldEnd()
+    prot.writeFieldBegin('binary', TType.STRING, 20)
+    prot.writeBinary(bytes(range(256)))
+    prot.writeFieldEnd()
+    prot.writeFieldBegin('list', TType.LIST, 21)
+    prot.writeListBegin(TType.I64, 100)
+    for i in range(100):
+        prot.writeI64(i * 123456789)
+    prot.writeListEnd()
+    prot.writeFieldEnd()
+    prot.writeFieldStop()
+    prot.writeStructEnd()
+    prot.writeMessageEnd()
+
+
+def read_message(prot):
+    message = [prot.readMessageBegin()]
+    prot.readStructBegin()
+    readers = {
+        TType.BOOL: prot.readBool,
+        TType.BYTE: prot.readByte,
+        TType.I16: prot.readI16,
+        TType.I32: prot.readI32,
+        TType.I64: prot.readI64,
+        TType.DOUBLE: prot.readDouble,
+        TType.STRING: prot.readString,
+    }
+    for fid, ftype, value in FIELDS:
+        message.append(prot.readFieldBegin())
+        message.append(readers[ftype]())
+        prot.readFieldEnd()
+    message.append(prot.readFieldBegin())
+    message.append(prot.readBinary())
+    prot.readFieldEnd()
+    message.append(prot.readFieldBegin())
+    size = prot.readListBegin()[1]
+    message.append([prot.readI64() for i in range(size)])
+    prot.readListEnd()
+    prot.readFieldEnd()
+    message.append(prot.readFieldBegin())
+    prot.readStructEnd()
+    prot.readMessageEnd()
+    return message
+
+
+def expected_message(seqid):
+    message = [('method', TMessageType.CALL, seqid)]
+    for fid, ftype, value in FIELDS:
+        message.extend([(None, ftype, fid), value])
+    message.extend([(None, TType.STRING, 20), bytes(range(256))])
+    message.extend([(None, TType.LIST, 21), [i * 123456789 for i in range(100)]])
+    message.append((None, TType.STOP, 0))
+    return message
+
+
+class StreamTransport(TTransport.TTransportBase):
+    """Reads from memory without being a CReadableTransport."""
+
+    def __init__(self, data):
+        self.buf = BufferIO(data)
+
+    def read(self, sz):
+        return self.buf.read(sz)
+
+
+class BulkReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        buf = TTransport.TMemoryBuffer()
+        prot = TJSONProtocol(buf)
+        for seqid in (1, 2):
+            write_message(prot, seqid)
+        self.data = buf.getvalue()
+
+    def check(self, trans, reader_class):
+        prot = TJSONProtocol(trans)
+        self.assertIsInstance(prot.reader, reader_class)
+        for seqid in (1, 2):
+            self.assertEqual(read_message(prot), expected_message(seqid))
+
+    def test_memory_buffer(self):
+        self.check(TTransport.TMemoryBuffer(self.data), BulkReader)
+
+    def test_refills(self):
+        # Strings and numbers straddle the buffer boundaries.
+        for rbuf_size in (1, 2, 3, 7, 64, 1000):
+            with self.subTest(rbuf_size=rbuf_size):
+                trans = TTransport.TBufferedTransport(
+                    StreamTransport(self.data), rbuf_size)
+                self.check(trans, BulkReader)
+
+    def test_same_as_lookahead_reader(self):
+        self.check(StreamTransport(self.data), LookaheadReader)
+
+    def test_truncated(self):
+        for end in (len(self.data) // 4, len(self.data) // 2 - 1):
+            with self.subTest(end=end):
+                trans = TTransport.TBufferedTransport(
+                    StreamTransport(self.data[:end]), 16)
+                with self.assertRaises(EOFError):
+                    read_message(TJSONProtocol(trans))
+
+    def test_number_at_end_of_data(self):
+        buf = TTransport.TMemoryBuffer()
+        TJSONProtocol(buf).writeI64(-1234567890123)
+        trans = TTransport.TBufferedTransport(StreamTransport(buf.getvalue()), 4)
+        self.assertEqual(TJSONProtocol(trans).readI64(), -1234567890123)
+
+    def test_release(self):
+        # The transport is positioned after each message once it is read.
+        trans = TTransport.TMemoryBuffer(self.data)
+        read_message(TJSONProtocol(trans))
+        self.assertEqual(trans.cstringio_buf.tell(), len(self.data) // 2)
+        self.assertEqual(read_message(TJSONProtocol(trans)), expected_message(2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,244 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements. See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership. The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License. You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+import socket
+import threading
+import unittest
+
+from thriftx.transport import TSocket, TTransport
+from thriftx.transport.THeaderTransport import (
+    THeaderClientType,
+    THeaderTransport,
+    THeaderTransformID,
+)
+from thriftx.transport.TTransport import TTransportException
+
+
+class WriteOnlyTransport(object):
+    """A duck-typed transport, with neither writev() nor a base class."""
+
+    def __init__(self):
+        self.value = b''
+
+    def write(self, buf):
+        self.value += buf
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        return self.value
+
+
+class PartialSocket(object):
+    """A socket handle sending at most limit bytes per call."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.sent = b''
+        self.calls = []
+
+    def sendmsg(self, buffs):
+        self.calls.append(len(buffs))
+        data = b''.join(buffs)[:self.limit]
+        self.sent += data
+        return len(data)
+
+    def send(self, buff):
+        data = bytes(buff[:self.limit])
+        self.sent += data
+        return len(data)
+
+
+class TPreallocatedBufferedTransportTest(unittest.TestCase):
+
+    def test_read_across_refills(self):
+        data = bytes(bytearray(range(256))) * 100
+        trans = TTransport.TPreallocatedBufferedTransport(
+            TTransport.TMemoryBuffer(data), rbuf_size=64)
+        self.assertEqual(trans.readAll(10), data[:10])
+        self.assertEqual(trans.readAll(1000), data[10:1010])
+        self.assertEqual(trans.read(5), data[1010:1015])
+        self.assertEqual(trans.readAll(len(data) - 1015), data[1015:])
+
+    def test_eof_without_read_into(self):
+        trans = TTransport.TPreallocatedBufferedTransport(
+            TTransport.TMemoryBuffer(b'ab'))
+        with self.assertRaises(TTransportException) as cm:
+            trans.readAll(4)
+        self.assertEqual(cm.exception.type, TTransportException.END_OF_FILE)
+
+    def test_eof_after_data(self):
+        trans = TTransport.TPreallocatedBufferedTransport(
+            TTransport.TMemoryBuffer(b'abc'))
+        self.assertEqual(trans.read(10), b'abc')
+        with self.assertRaises(TTransportException) as cm:
+            trans.read(1)
+        self.assertEqual(cm.exception.type, TTransportException.END_OF_FILE)
+
+    def test_eof_larger_than_buffer(self):
+        trans = TTransport.TPreallocatedBufferedTransport(
+            TTransport.TMemoryBuffer(b'x' * 100), rbuf_size=16)
+        with self.assertRaises(TTransportException):
+            trans.readAll(200)
+
+    def test_write_flush(self):
+        inner = TTransport.TMemoryBuffer()
+        trans = TTransport.TPreallocatedBufferedTransport(inner)
+        payload = b'y' * 10000
+        trans.write(b'head')
+        trans.write(payload)
+        trans.flush()
+        self.assertEqual(inner.getvalue(), b'head' + payload)
+
+    def test_writes_are_copied_for_other_transports(self):
+        class KeepingTransport(TTransport.TTransportBase):
+            def __init__(self):
+                self.writes = []
+
+            def write(self, buf):
+                self.writes.append(buf)
+
+        inner = KeepingTransport()
+        trans = TTransport.TPreallocatedBufferedTransport(inner)
+        trans.write(b'first')
+        trans.flush()
+        trans.write(b'other')
+        trans.flush()
+        self.assertEqual(inner.writes, [b'first', b'other'])
+
+    def test_socket(self):
+        left, right = socket.socketpair()
+        sender, receiver = TSocket.TSocket(), TSocket.TSocket()
+        sender.setHandle(left)
+        receiver.setHandle(right)
+        writer = TTransport.TPreallocatedBufferedTransport(sender)
+        reader = TTransport.TPreallocatedBufferedTransport(receiver, rbuf_size=64)
+        payload = b'z' * 1000
+        writer.write(payload)
+        writer.flush()
+        self.assertEqual(reader.readAll(10), payload[:10])
+        self.assertEqual(reader.readAll(990), payload[10:])
+        sender.close()
+        with self.assertRaises(TTransportException) as cm:
+            reader.read(1)
+        self.assertEqual(cm.exception.type, TTransportException.END_OF_FILE)
+        receiver.close()
+
+    def test_factory(self):
+        factory = TTransport.TPreallocatedBufferedTransportFactory()
+        self.assertIsInstance(factory, TTransport.TTransportFactoryBase)
+        self.assertIsInstance(factory.getTransport(TTransport.TMemoryBuffer()),
+                              TTransport.TPreallocatedBufferedTransport)
+
+
+class TFramedTransportTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        inner = TTransport.TMemoryBuffer()
+        writer = TTransport.TFramedTransport(inner)
+        writer.write(b'hello')
+        writer.flush()
+        writer.write(b'world!')
+        writer.flush()
+        reader = TTransport.TFramedTransport(
+            TTransport.TMemoryBuffer(inner.getvalue()))
+        self.assertEqual(reader.read(100), b'hello')
+        self.assertEqual(reader.readAll(6), b'world!')
+
+    def test_transport_without_writev(self):
+        inner = WriteOnlyTransport()
+        trans = TTransport.TFramedTransport(inner)
+        trans.write(b'hello')
+        trans.flush()
+        self.assertEqual(inner.value, b'\x00\x00\x00\x05hello')
+
+
+class THeaderTransportTest(unittest.TestCase):
+
+    def round_trip(self, inner):
+        writer = THeaderTransport(inner, [THeaderClientType.HEADERS])
+        writer.set_header(b'key', b'value')
+        writer.add_transform(THeaderTransformID.ZLIB)
+        writer.write(b'payload' * 100)
+        writer.flush()
+        reader = THeaderTransport(TTransport.TMemoryBuffer(inner.getvalue()),
+                                  [THeaderClientType.HEADERS])
+        self.assertEqual(reader.readAll(700), b'payload' * 100)
+        self.assertEqual(reader.get_headers(), {b'key': b'value'})
+
+    def test_round_trip(self):
+        self.round_trip(TTransport.TMemoryBuffer())
+
+    def test_transport_without_writev(self):
+        self.round_trip(WriteOnlyTransport())
+
+
+class TSocketWritevTest(unittest.TestCase):
+
+    def socket(self, handle):
+        sock = TSocket.TSocket()
+        sock.setHandle(handle)
+        return sock
+
+    def test_partial_sends(self):
+        handle = PartialSocket(3)
+        buffs = [b'abcde', b'', b'f', b'ghijklm']
+        self.socket(handle).writev(buffs)
+        self.assertEqual(handle.sent, b''.join(buffs))
+
+    def test_many_buffers(self):
+        handle = PartialSocket(1000)
+        buffs = [b'%d,' % i for i in range(TSocket.IOV_MAX * 2 + 1)]
+        self.socket(handle).writev(buffs)
+        self.assertEqual(handle.sent, b''.join(buffs))
+        self.assertEqual(handle.calls, [TSocket.IOV_MAX, TSocket.IOV_MAX, 1])
+
+    def test_sendmsg_not_implemented(self):
+        class SSLLikeSocket(PartialSocket):
+            def sendmsg(self, buffs):
+                raise NotImplementedError()
+
+        handle = SSLLikeSocket(2)
+        self.socket(handle).writev([b'abc', b'def'])
+        self.assertEqual(handle.sent, b'abcdef')
+
+    def test_nothing_sent(self):
+        with self.assertRaises(TTransportException) as cm:
+            self.socket(PartialSocket(0)).writev([b'abc'])
+        self.assertEqual(cm.exception.type, TTransportException.END_OF_FILE)
+
+    def test_socketpair(self):
+        left, right = socket.socketpair()
+        try:
+            buffs = [b'x' * 100000, b'y' * 10, b'z' * 100000]
+            thread = threading.Thread(target=self.socket(left).writev, args=(buffs,))
+            thread.start()
+            received = b''
+            while len(received) < 200010:
+                received += right.recv(65536)
+            thread.join()
+            self.assertEqual(received, b''.join(buffs))
+        finally:
+            left.close()
+            right.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
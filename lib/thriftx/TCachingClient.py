@@ -0,0 +1,142 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements. See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership. The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License. You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations
+# under the License.
+#
+
+import copy
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from .TSerialization import serialize
+from .Thrift import TType
+from .protocol.TBinaryProtocol import TBinaryProtocolAcceleratedFactory
+
+_clock = getattr(time, 'monotonic', time.time)
+
+_key_factory = TBinaryProtocolAcceleratedFactory()
+
+
+def _service_struct(client_class, name):
+    """Find a generated service struct, such as <fn>_args, of a client."""
+    for klass in client_class.__mro__:
+        struct = getattr(sys.modules.get(klass.__module__), name, None)
+        if struct is not None:
+            return struct
+    raise AttributeError('%s has no struct %s' % (client_class.__name__, name))
+
+
+class TCachingClient(object):
+    """Caches the results of a generated service client.
+
+    usage:
+        client = TCachingClient(MyService.Client(protocol))
+        client.setTTL('getConfig', 30000)
+        config = client.getConfig('key')
+
+    Results of the methods given a TTL with setTTL() are kept for that many
+    milliseconds, keyed by the method name and its serialized <fn>_args.
+    Exceptions declared by the method are cached too; transport and
+    application errors never are. At most maxsize results are kept, and
+    the least recently used one is evicted first. Every other attribute is
+    the one of the wrapped client. Cached results are shared by all
+    callers, so they must not be modified.
+    """
+
+    def __init__(self, client, maxsize=1024):
+        self.client = client
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._ttls = {}
+        self._structs = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def setTTL(self, fname, ms):
+        """Cache the results of fname for ms milliseconds, or stop if None."""
+        if ms is None:
+            self._ttls.pop(fname, None)
+            return
+        if fname not in self._structs:
+            client_class = type(self.client)
+            args = _service_struct(client_class, fname + '_args')
+            result = _service_struct(client_class, fname + '_result')
+            # Field 0 is the result, the others are the declared exceptions.
+            exceptions = tuple(
+                field[3][0] for field in result.thrift_spec[1:]
+                if field is not None and field[1] == TType.STRUCT)
+            self._structs[fname] = (args, exceptions)
+        self._ttls[fname] = ms / 1000.0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+        if name not in self._ttls:
+            return method
+        return functools.partial(self._call, name, method)
+
+    def _call(self, fname, method, *args, **kwargs):
+        key, entry = self._lookup(fname, args, kwargs)
+        if entry is not None:
+            return self._unpack(entry)
+        try:
+            result = method(*args, **kwargs)
+        except self._structs[fname][1] as e:
+            self._store(fname, key, (True, copy.copy(e)))
+            raise
+        self._store(fname, key, (False, result))
+        return result
+
+    def _lookup(self, fname, args, kwargs):
+        args_struct = self._structs[fname][0](*args, **kwargs)
+        key = (fname, serialize(args_struct, _key_factory))
+        now = _clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                # Move it to the end, as the most recently used.
+                del self._entries[key]
+                self._entries[key] = entry
+                self.hits += 1
+                return key, entry
+            self.misses += 1
+        return key, None
+
+    def _store(self, fname, key, value):
+        ttl = self._ttls.get(fname)
+        if ttl is None:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (_clock() + ttl,) + value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _unpack(entry):
+        expires, is_exception, value = entry
+        if is_exception:
+            # A copy, so the cached exception doesn't collect the frames
+            # of every raise in its traceback.
+            raise copy.copy(value)
+        return value
@@ -0,0 +1,28 @@
+import copy
+
+from thriftx.TCachingClient import TCachingClient
+
+
+class TAsyncioCachingClient(TCachingClient):
+    """Asyncio version of TCachingClient.
+
+    usage:
+        client = TAsyncioCachingClient(MyService.Client(protocol))
+        client.setTTL("getConfig", 30000)
+        config = await client.getConfig("key")
+
+    Combine it with TAsyncioClient.setCoalescing() on the wrapped client,
+    so that concurrent misses of the same call share one request.
+    """
+
+    async def _call(self, fname, method, *args, **kwargs):
+        key, entry = self._lookup(fname, args, kwargs)
+        if entry is not None:
+            return self._unpack(entry)
+        try:
+            result = await method(*args, **kwargs)
+        except self._structs[fname][1] as e:
+            self._store(fname, key, (True, copy.copy(e)))
+            raise
+        self._store(fname, key, (False, result))
+        return result
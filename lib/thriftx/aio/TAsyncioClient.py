@@ -0,0 +1,212 @@
+import asyncio
+import contextvars
+import logging
+
+from thriftx.TCachingClient import _key_factory, _service_struct
+from thriftx.Thrift import TApplicationException, TType
+from thriftx.TSerialization import serialize
+from thriftx.protocol.TProtocol import TProtocolException
+from thriftx.transport.TTransport import TTransportException
+
+from .transport.TAsyncioTransport import _oneway
+
+logger = logging.getLogger(__name__)
+
+MAX_SEQID = 0x7FFFFFFF
+
+# Loop time by which calls made in the current context must complete.
+_deadline = contextvars.ContextVar("thrift_deadline", default=None)
+
+
+class deadline:
+    """Context manager setting a deadline for the calls made in its block.
+
+    usage:
+        with deadline(250):
+            item = await client.getItem(1)
+            await other_client.ping()
+
+    Every call made by any TAsyncioClient within the block, including from
+    tasks created in it, must complete within ms milliseconds of entering
+    it, or it raises TTransportException(TIMED_OUT). Nested deadlines can
+    only shorten the enclosing one.
+    """
+
+    def __init__(self, ms):
+        self._ms = ms
+        self._token = None
+
+    def __enter__(self):
+        when = asyncio.get_event_loop().time() + self._ms / 1000.0
+        current = _deadline.get()
+        if current is not None:
+            when = min(when, current)
+        self._token = _deadline.set(when)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _deadline.reset(self._token)
+
+
+class TAsyncioClient:
+    """Base class for generated asyncio service clients.
+
+    Calls are pipelined over a single connection: every request gets its
+    own seqid and future, and one reader task matches replies to pending
+    futures by seqid, so any number of coroutines may share one client.
+
+    A call that is cancelled or times out leaves the connection usable:
+    its reply is still read when it arrives, and discarded. Calls time out
+    after the timeout set with setTimeout(), or at the deadline set with
+    deadline() if that comes first. Oneway calls may be batched by a
+    TAsyncioBatchingTransport.
+
+    Concurrent calls of the methods set with setCoalescing() that have
+    equal arguments share a single request and its result.
+    """
+
+    def __init__(self, iprot, oprot=None):
+        self._iprot = self._oprot = iprot
+        if oprot is not None:
+            self._oprot = oprot
+        self._seqid = 0
+        self._reqs = {}
+        self._reader = None
+        self._timeout = None
+        self._coalesced = frozenset()
+        self._inflight = {}
+
+    def setCoalescing(self, *methods):
+        """Coalesce concurrent identical calls of the given methods.
+
+        Only use it for methods without side effects, as a call made while
+        an equal one is pending is never sent: it gets the result or
+        exception of the pending call instead. Each caller still has its
+        own timeout and may be cancelled without affecting the others.
+        """
+        for fname in methods:
+            _service_struct(type(self), fname + "_args")
+        self._coalesced = frozenset(methods)
+
+    def setTimeout(self, ms):
+        """Set the timeout of every call in milliseconds."""
+        if ms is None:
+            self._timeout = None
+        else:
+            self._timeout = ms / 1000.0
+
+    def _remaining(self):
+        timeout = self._timeout
+        when = _deadline.get()
+        if when is not None:
+            remaining = when - asyncio.get_event_loop().time()
+            if timeout is None or remaining < timeout:
+                timeout = remaining
+        return timeout
+
+    async def _with_timeout(self, coro):
+        timeout = self._remaining()
+        if timeout is None:
+            return await coro
+        try:
+            return await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError as e:
+            raise TTransportException(
+                type=TTransportException.TIMED_OUT,
+                message="Call timed out",
+                inner=e,
+            )
+
+    def _next_seqid(self):
+        if self._seqid >= MAX_SEQID:
+            self._seqid = 0
+        self._seqid += 1
+        return self._seqid
+
+    async def _call(self, send, *args):
+        fname = send.__name__[5:]
+        if fname in self._coalesced:
+            return await self._with_timeout(self._coalesce(fname, send, args))
+        return await self._with_timeout(self._request(send, *args))
+
+    async def _coalesce(self, fname, send, args):
+        args_struct = _service_struct(type(self), fname + "_args")(*args)
+        key = (fname, serialize(args_struct, _key_factory))
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(
+                self._request(send, *args)
+            )
+            task.add_done_callback(lambda t: self._coalesced_done(key, t))
+        # The request is shared, so it must outlive any single caller.
+        return await asyncio.shield(task)
+
+    def _coalesced_done(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Retrieved here in case every caller has gone away.
+            task.exception()
+
+    async def _request(self, send, *args):
+        seqid = self._next_seqid()
+        future = self._reqs[seqid] = asyncio.get_event_loop().create_future()
+        try:
+            # send_<fn> takes self._seqid before its first await, so the
+            # message always goes out under the seqid reserved above.
+            await send(*args)
+        except BaseException:
+            self._reqs.pop(seqid, None)
+            raise
+        if self._reader is None:
+            self._reader = asyncio.ensure_future(self._receive())
+        return await future
+
+    async def _call_oneway(self, send, *args):
+        await self._with_timeout(self._send_oneway(send, *args))
+
+    async def _send_oneway(self, send, *args):
+        self._next_seqid()
+        token = _oneway.set(True)
+        try:
+            await send(*args)
+        finally:
+            _oneway.reset(token)
+
+    async def _receive(self):
+        iprot = self._iprot
+        try:
+            while self._reqs:
+                (fname, mtype, rseqid) = await iprot.readMessageBegin()
+                future = self._reqs.pop(rseqid, None)
+                method = getattr(self, "recv_" + fname, None)
+                if future is None or future.done() or method is None:
+                    # The caller has gone away or the reply is unknown,
+                    # drop the message to keep the stream in sync.
+                    await iprot.skip(TType.STRUCT)
+                    await iprot.readMessageEnd()
+                    if future is not None and not future.done():
+                        future.set_exception(
+                            TApplicationException(
+                                TApplicationException.WRONG_METHOD_NAME,
+                                "Unexpected reply %s" % fname,
+                            )
+                        )
+                    continue
+                try:
+                    result = await method(iprot, mtype, rseqid)
+                except (TTransportException, TProtocolException, EOFError):
+                    self._reqs[rseqid] = future
+                    raise
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            logger.debug("asyncio client reader stopped", exc_info=True)
+            reqs, self._reqs = self._reqs, {}
+            for future in reqs.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._reader = None
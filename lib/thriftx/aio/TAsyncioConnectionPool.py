@@ -0,0 +1,313 @@
+import asyncio
+import collections
+import logging
+
+from thriftx.protocol.TProtocol import TProtocolException
+from thriftx.transport.TTransport import TTransportException
+
+from .protocol.TAsyncioBinaryProtocol import TAsyncioBinaryProtocolFactory
+
+logger = logging.getLogger(__name__)
+
+# Errors after which the state of a connection is unknown, so it is closed
+# instead of being handed out again.
+_BROKEN = (
+    TTransportException,
+    TProtocolException,
+    EOFError,
+    OSError,
+    asyncio.CancelledError,
+    asyncio.TimeoutError,
+)
+
+
+def _recoverable(exc):
+    # A TAsyncioClient discards the reply of a call that was cancelled or
+    # timed out, so its connection can be reused.
+    if isinstance(exc, (asyncio.CancelledError, asyncio.TimeoutError)):
+        return True
+    return (
+        isinstance(exc, TTransportException)
+        and exc.type == TTransportException.TIMED_OUT
+    )
+
+
+class TAsyncioPooledConnection:
+    """An open transport and its protocol, owned by a connection pool."""
+
+    def __init__(self, trans, protocol, now):
+        self.trans = trans
+        self.protocol = protocol
+        self.created = now
+        self.last_used = now
+        self._clients = {}
+
+    def client(self, client_class):
+        """Returns a client of the given generated class on this connection.
+
+        Clients are cached per connection, so the pipelined reader of a
+        TAsyncioClient is shared by everyone using the connection.
+        """
+        client = self._clients.get(client_class)
+        if client is None:
+            client = self._clients[client_class] = client_class(self.protocol)
+        return client
+
+
+class _Checkout:
+    def __init__(self, pool, client_class=None):
+        self._pool = pool
+        self._client_class = client_class
+        self._conn = None
+
+    async def __aenter__(self):
+        self._conn = await self._pool.acquire()
+        if self._client_class is None:
+            return self._conn
+        return self._conn.client(self._client_class)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        discard = exc_type is not None and issubclass(exc_type, _BROKEN)
+        if discard and self._client_class is not None and _recoverable(exc):
+            discard = False
+        await self._pool.release(self._conn, discard)
+
+
+class TAsyncioConnectionPool:
+    """Pool of open asyncio connections to a single endpoint.
+
+    usage:
+        pool = TAsyncioConnectionPool(
+            lambda: TAsyncioFramedTransport(TAsyncioSocket(host, port)),
+            TAsyncioCompactProtocolFactory(),
+            max_size=32,
+        )
+        async with pool.client(Demo.Client) as client:
+            await client.ping()
+
+    transport_factory is called without arguments and returns a new,
+    unopened transport. Up to max_size connections are open at once, and
+    checkouts beyond that wait for a connection to be released. The pool
+    keeps at least min_size connections open, closes idle ones after
+    max_idle seconds and recycles any connection older than max_lifetime
+    seconds. health_check, if given, is awaited with a connection that has
+    been idle for more than health_check_interval seconds before handing
+    it out; the connection is dropped if it returns false or raises.
+
+    A connection is closed instead of being returned to the pool when the
+    checkout block raises a transport, protocol or cancellation error.
+    Connections checked out with client() are kept after a cancellation or
+    timeout though, as the client discards the late reply.
+    """
+
+    def __init__(
+        self,
+        transport_factory,
+        protocol_factory=None,
+        min_size=0,
+        max_size=10,
+        max_idle=60.0,
+        max_lifetime=None,
+        health_check=None,
+        health_check_interval=30.0,
+    ):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("Pool size must satisfy 0 <= min_size <= max_size")
+        self._transport_factory = transport_factory
+        if protocol_factory is None:
+            protocol_factory = TAsyncioBinaryProtocolFactory()
+        self._protocol_factory = protocol_factory
+        self._min_size = min_size
+        self._max_size = max_size
+        self._max_idle = max_idle
+        self._max_lifetime = max_lifetime
+        self._health_check = health_check
+        self._health_check_interval = health_check_interval
+        self._size = 0
+        self._idle = collections.deque()
+        self._waiters = collections.deque()
+        self._reaper = None
+        self._closed = False
+
+    @property
+    def size(self):
+        """Number of connections open or being opened."""
+        return self._size
+
+    @property
+    def idle(self):
+        """Number of connections waiting in the pool."""
+        return len(self._idle)
+
+    async def open(self):
+        """Opens min_size connections ahead of the first checkout."""
+        await self._fill()
+        self._start_reaper()
+
+    async def close(self):
+        """Closes idle connections and any connection released from now on."""
+        self._closed = True
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        idle, self._idle = self._idle, collections.deque()
+        for conn in idle:
+            await self._discard(conn)
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_exception(
+                    TTransportException(
+                        type=TTransportException.NOT_OPEN, message="Pool is closed"
+                    )
+                )
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def connection(self):
+        """Checks out a TAsyncioPooledConnection for an async with block."""
+        return _Checkout(self)
+
+    def client(self, client_class):
+        """Checks out a connection for an async with block.
+
+        The block is given a client_class client on the connection.
+        """
+        return _Checkout(self, client_class)
+
+    async def acquire(self):
+        """Returns an open connection, waiting if max_size are checked out.
+
+        Every connection acquired must be given back with release().
+        """
+        self._start_reaper()
+        loop = asyncio.get_event_loop()
+        while True:
+            if self._closed:
+                raise TTransportException(
+                    type=TTransportException.NOT_OPEN, message="Pool is closed"
+                )
+            while self._idle:
+                # Most recently used first, so that surplus connections
+                # stay idle long enough to be evicted.
+                conn = self._idle.pop()
+                if await self._usable(conn, loop.time()):
+                    return conn
+                await self._discard(conn)
+            if self._size < self._max_size:
+                return await self._connect()
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except BaseException:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif not waiter.cancelled() and waiter.exception() is None:
+                    # Pass on the wakeup this waiter was sent.
+                    self._wakeup()
+                raise
+
+    async def release(self, conn, discard=False):
+        """Gives a connection back to the pool, closing it if discard is set."""
+        now = asyncio.get_event_loop().time()
+        if discard or self._closed or self._expired(conn, now):
+            await self._discard(conn)
+        else:
+            conn.last_used = now
+            self._idle.append(conn)
+            self._wakeup()
+
+    async def _connect(self):
+        self._size += 1
+        try:
+            trans = self._transport_factory()
+            await trans.open()
+        except BaseException:
+            self._size -= 1
+            self._wakeup()
+            raise
+        protocol = self._protocol_factory.getProtocol(trans)
+        return TAsyncioPooledConnection(
+            trans, protocol, asyncio.get_event_loop().time()
+        )
+
+    async def _discard(self, conn):
+        self._size -= 1
+        self._wakeup()
+        try:
+            await conn.trans.close()
+        except Exception:
+            logger.debug("error closing pooled connection", exc_info=True)
+
+    def _wakeup(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def _expired(self, conn, now):
+        return (
+            self._max_lifetime is not None
+            and now - conn.created >= self._max_lifetime
+        )
+
+    async def _usable(self, conn, now):
+        if self._expired(conn, now) or not conn.trans.isOpen():
+            return False
+        if (
+            self._health_check is None
+            or now - conn.last_used < self._health_check_interval
+        ):
+            return True
+        try:
+            return bool(await self._health_check(conn))
+        except Exception:
+            logger.info("pooled connection failed health check", exc_info=True)
+            return False
+
+    def _start_reaper(self):
+        if self._reaper is None and not self._closed:
+            self._reaper = asyncio.ensure_future(self._reap())
+
+    async def _reap(self):
+        interval = min(
+            t
+            for t in (self._max_idle, self._max_lifetime, 1.0)
+            if t is not None and t > 0
+        )
+        loop = asyncio.get_event_loop()
+        while True:
+            now = loop.time()
+            surplus = self._size - self._min_size
+            stale = []
+            # The least recently used connections sit at the left end.
+            for conn in self._idle:
+                if self._expired(conn, now):
+                    stale.append(conn)
+                elif (
+                    self._max_idle is not None
+                    and now - conn.last_used >= self._max_idle
+                    and surplus > 0
+                ):
+                    stale.append(conn)
+                    surplus -= 1
+            for conn in stale:
+                self._idle.remove(conn)
+            for conn in stale:
+                await self._discard(conn)
+            try:
+                await self._fill()
+            except Exception:
+                logger.warning("could not refill connection pool", exc_info=True)
+            await asyncio.sleep(interval)
+
+    async def _fill(self):
+        while not self._closed and self._size < self._min_size:
+            conn = await self._connect()
+            await self.release(conn)
@@ -0,0 +1,126 @@
+from thriftx.Thrift import TApplicationException, TMessageType, TProcessor, TType
+from thriftx.protocol.TMultiplexedProtocol import SEPARATOR
+from thriftx.protocol.TProtocol import TProtocolException
+
+
+class TAsyncioMultiplexedProcessor(TProcessor):
+    """Asyncio version of TMultiplexedProcessor.
+
+    usage:
+        processor = TAsyncioMultiplexedProcessor()
+        processor.registerProcessor("Calculator", Calculator.Processor(handler))
+        server = TAsyncioServer(processor, transport)
+
+    The process functions of generated processors are looked up by their
+    full "<service>:<method>" name in a single table, so messages are
+    dispatched with one dict lookup, without wrapping the input protocol.
+    Other processors get the message through their process() method.
+    Unlike TMultiplexedProcessor, messages for unknown services are
+    answered with an UNKNOWN_METHOD exception instead of failing the
+    connection.
+    """
+
+    def __init__(self):
+        self.defaultProcessor = None
+        self.services = {}
+        # Maps message names to (processor, process function, method name).
+        self._dispatch = {}
+
+    def registerDefault(self, processor):
+        """
+        If a non-multiplexed processor connects to the server and wants to
+        communicate, use the given processor to handle it.  This mechanism
+        allows servers to upgrade from non-multiplexed to multiplexed in a
+        backwards-compatible way and still handle old clients.
+        """
+        if self.defaultProcessor is not None:
+            self._unregister(self.defaultProcessor, "")
+        self.defaultProcessor = processor
+        self._register(processor, "")
+
+    def registerProcessor(self, serviceName, processor):
+        if serviceName in self.services:
+            self._unregister(self.services[serviceName], serviceName + SEPARATOR)
+        self.services[serviceName] = processor
+        self._register(processor, serviceName + SEPARATOR)
+
+    def _register(self, processor, prefix):
+        for call, func in getattr(processor, "_processMap", {}).items():
+            self._dispatch[prefix + call] = (processor, func, call)
+
+    def _unregister(self, processor, prefix):
+        for call in getattr(processor, "_processMap", ()):
+            self._dispatch.pop(prefix + call, None)
+
+    def on_message_begin(self, func):
+        for key in self.services.keys():
+            self.services[key].on_message_begin(func)
+
+    async def process(self, iprot, oprot):
+        (name, type, seqid) = await iprot.readMessageBegin()
+        if type != TMessageType.CALL and type != TMessageType.ONEWAY:
+            raise TProtocolException(
+                TProtocolException.NOT_IMPLEMENTED,
+                "TMultiplexedProtocol only supports CALL & ONEWAY",
+            )
+
+        entry = self._dispatch.get(name)
+        if entry is not None:
+            processor, func, call = entry
+            # What the process() method of the processor would do.
+            if processor._on_message_begin:
+                processor._on_message_begin(call, type, seqid)
+            await func(processor, seqid, iprot, oprot)
+            return True
+
+        serviceName, separator, call = name.partition(SEPARATOR)
+        if not separator:
+            call = name
+            processor = self.defaultProcessor
+            message = (
+                "Service name not found in message name: %s.  "
+                "Did you forget to use TMultiplexedProtocol in your client?" % name
+            )
+        else:
+            processor = self.services.get(serviceName)
+            message = (
+                "Service name not found: %s.  "
+                "Did you forget to call registerProcessor()?" % serviceName
+            )
+        if processor is not None:
+            if not hasattr(processor, "_processMap"):
+                return await processor.process(
+                    _StoredMessageProtocol(iprot, (call, type, seqid)), oprot
+                )
+            # A method the generated processor doesn't have.
+            if processor._on_message_begin:
+                processor._on_message_begin(call, type, seqid)
+            message = "Unknown function %s" % call
+
+        await iprot.skip(TType.STRUCT)
+        await iprot.readMessageEnd()
+        # Clients expect the reply under the name they sent, unprefixed.
+        x = TApplicationException(TApplicationException.UNKNOWN_METHOD, message)
+        oprot.writeMessageBegin(call, TMessageType.EXCEPTION, seqid)
+        x.write(oprot)
+        oprot.writeMessageEnd()
+        await oprot.trans.flush()
+
+
+class _StoredMessageProtocol:
+    """Returns the message header already read, and delegates the rest.
+
+    Cheaper than a TProtocolDecorator, which builds a class per instance.
+    """
+
+    __slots__ = ("_protocol", "_messageBegin")
+
+    def __init__(self, protocol, messageBegin):
+        self._protocol = protocol
+        self._messageBegin = messageBegin
+
+    async def readMessageBegin(self):
+        return self._messageBegin
+
+    def __getattr__(self, name):
+        return getattr(self._protocol, name)
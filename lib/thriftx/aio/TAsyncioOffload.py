@@ -0,0 +1,81 @@
+import asyncio
+import weakref
+
+DEFAULT_THRESHOLD = 1 << 20
+
+
+class TAsyncioOffload:
+    """Runs fastbinary decoding and encoding of large structs in an executor.
+
+    usage:
+        offload = TAsyncioOffload(ThreadPoolExecutor(4), threshold=256 * 1024)
+        pfactory = TAsyncioBinaryProtocolAcceleratedFactory(offload=offload)
+
+    A struct is decoded in the executor when at least threshold bytes of
+    the message are left in the transport buffer, and encoded there when
+    the last message of its type was at least threshold bytes long.
+    Smaller structs are still (de)serialized inline, which is cheaper than
+    the handoff. executor is a concurrent.futures.ThreadPoolExecutor, or
+    None for the default executor of the event loop. Decoded objects can't
+    be sent back from another process, so process pools aren't supported.
+    """
+
+    def __init__(self, executor=None, threshold=DEFAULT_THRESHOLD):
+        self.executor = executor
+        self.threshold = threshold
+        self._sizes = weakref.WeakKeyDictionary()
+
+    async def decode(self, obj, iprot, typeargs):
+        buf = iprot.trans.cstringio_buf
+        pos = buf.tell()
+        remaining = buf.seek(0, 2) - pos
+        buf.seek(pos)
+        if remaining < self.threshold:
+            return iprot._fast_decode(obj, iprot, typeargs)
+        return await asyncio.get_event_loop().run_in_executor(
+            self.executor, iprot._fast_decode, obj, iprot, typeargs
+        )
+
+    async def encode(self, oprot, obj):
+        cls = obj.__class__
+        typeargs = [cls, obj.thrift_spec]
+        if self._sizes.get(cls, 0) < self.threshold:
+            data = oprot._fast_encode(obj, typeargs)
+        else:
+            data = await asyncio.get_event_loop().run_in_executor(
+                self.executor, oprot._fast_encode, obj, typeargs
+            )
+        self._sizes[cls] = len(data)
+        return data
+
+
+async def fastDecode(obj, iprot, typeargs):
+    """Decode a struct with fastbinary, in the executor if it is large."""
+    offload = getattr(iprot, "_offload", None)
+    if offload is None:
+        return iprot._fast_decode(obj, iprot, typeargs)
+    return await offload.decode(obj, iprot, typeargs)
+
+
+async def writeMessage(oprot, name, type, seqid, obj):
+    """Write and flush a whole message with obj as its body.
+
+    The body is encoded first, possibly in the executor, and the message
+    is then written without awaiting, so concurrent writers never
+    interleave their messages.
+    """
+    offload = getattr(oprot, "_offload", None)
+    if (
+        offload is not None
+        and oprot._fast_encode is not None
+        and getattr(obj, "thrift_spec", None) is not None
+    ):
+        data = await offload.encode(oprot, obj)
+        oprot.writeMessageBegin(name, type, seqid)
+        oprot.trans.write(data)
+        oprot.writeMessageEnd()
+    else:
+        oprot.writeMessageBegin(name, type, seqid)
+        obj.write(oprot)
+        oprot.writeMessageEnd()
+    await oprot.trans.flush()
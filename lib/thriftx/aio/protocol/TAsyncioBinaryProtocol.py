@@ -1,5 +1,6 @@
 from struct import unpack
 
+from thriftx.compat import binary_to_str
 from thriftx.protocol.TBinaryProtocol import TBinaryProtocol, TBinaryProtocolFactory
 from thriftx.protocol.TProtocol import TProtocolException
 from thriftx.Thrift import TType
@@ -115,6 +116,9 @@ class TAsyncioBinaryProtocol(TBinaryProtocol):
         s = await self.trans.readAll(size)
         return s
 
+    async def readString(self):
+        return binary_to_str(await self.readBinary())
+
     async def skip(self, ttype):
         if ttype == TType.BOOL:
             await self.readBool()
@@ -169,3 +173,54 @@ class TAsyncioBinaryProtocolFactory(TBinaryProtocolFactory):
             container_length_limit=self.container_length_limit,
         )
         return prot
+
+
+class TAsyncioBinaryProtocolAccelerated(TAsyncioBinaryProtocol):
+    """C-Accelerated version of TAsyncioBinaryProtocol.
+
+    When the transport keeps a whole message in memory, such as
+    TAsyncioFramedTransport, the generated code decodes structs with
+    fastbinary in a single synchronous call instead of awaiting every
+    field. Other transports fall back to the asyncio implementation.
+    To disable this behavior, pass fallback=False constructor argument.
+    Pass a TAsyncioOffload as offload to (de)serialize large structs in
+    an executor instead of blocking the event loop.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fallback = kwargs.pop("fallback", True)
+        self._offload = kwargs.pop("offload", None)
+        super().__init__(*args, **kwargs)
+        try:
+            from thriftx.protocol import fastbinary
+        except ImportError:
+            if not fallback:
+                raise
+        else:
+            self._fast_decode = fastbinary.decode_binary
+            self._fast_encode = fastbinary.encode_binary
+
+
+class TAsyncioBinaryProtocolAcceleratedFactory(TBinaryProtocolFactory):
+    def __init__(
+        self,
+        string_length_limit=None,
+        container_length_limit=None,
+        fallback=True,
+        offload=None,
+    ):
+        super().__init__(
+            string_length_limit=string_length_limit,
+            container_length_limit=container_length_limit,
+        )
+        self._fallback = fallback
+        self._offload = offload
+
+    def getProtocol(self, trans):
+        return TAsyncioBinaryProtocolAccelerated(
+            trans,
+            string_length_limit=self.string_length_limit,
+            container_length_limit=self.container_length_limit,
+            fallback=self._fallback,
+            offload=self._offload,
+        )
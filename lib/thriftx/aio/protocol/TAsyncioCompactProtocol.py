@@ -1,21 +1,60 @@
 from struct import unpack
 
+from thriftx.compat import binary_to_str
+from thriftx.aio.transport.TAsyncioTransport import TAsyncioPeekableTransport
 from thriftx.protocol.TProtocol import TType, TProtocolException
 from thriftx.protocol.TCompactProtocol import (
     CompactType,
     TCompactProtocol,
+    TCompactProtocolFactory,
     reader,
     BOOL_READ,
     CLEAR,
     CONTAINER_READ,
     FIELD_READ,
     VALUE_READ,
+    fromZigZag,
 )
 
+# A varint encodes at most 64 bits, 7 bits per byte.
+MAX_VARINT_BYTES = 10
+
+
+def decodeVarint(buf, pos):
+    """Decodes the varint at buf[pos:].
+
+    Returns (value, end) or None if buf ends before the varint does.
+    """
+    result = 0
+    shift = 0
+    for end in range(pos, min(len(buf), pos + MAX_VARINT_BYTES)):
+        byte = buf[end]
+        result |= (byte & 0x7F) << shift
+        if byte >> 7 == 0:
+            return result, end + 1
+        shift += 7
+    return None
+
 
 class TAsyncioCompactProtocol(TCompactProtocol):
+    """Asyncio version of TCompactProtocol.
+
+    On transports implementing TAsyncioPeekableTransport, such as
+    TAsyncioBufferedTransport and TAsyncioFramedTransport, varints and
+    field, list, set and map headers are decoded straight from the
+    transport's buffer, and the protocol awaits only when it runs dry.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._peekable = isinstance(self.trans, TAsyncioPeekableTransport)
+
     async def readFieldBegin(self):
         assert self.state == FIELD_READ, self.state
+        if self._peekable:
+            field = self._peekFieldBegin()
+            if field is not None:
+                return field
         type = await self._readUByte()
         if type & 0x0F == TType.STOP:
             return (None, 0, 0)
@@ -24,6 +63,29 @@ class TAsyncioCompactProtocol(TCompactProtocol):
             fid = await self._readI16()
         else:
             fid = self._last_fid + delta
+        return self._fieldBegin(type, fid)
+
+    def _peekFieldBegin(self):
+        # One type byte, then an i16 field id of up to three bytes.
+        buf = self.trans.peek(4)
+        if not buf:
+            return None
+        type = buf[0]
+        if type & 0x0F == TType.STOP:
+            self.trans.consume(1)
+            return (None, 0, 0)
+        delta = type >> 4
+        if delta == 0:
+            varint = decodeVarint(buf, 1)
+            if varint is None:
+                return None
+            fid, end = fromZigZag(varint[0]), varint[1]
+        else:
+            fid, end = self._last_fid + delta, 1
+        self.trans.consume(end)
+        return self._fieldBegin(type, fid)
+
+    def _fieldBegin(self, type, fid):
         self._last_fid = fid
         type = type & 0x0F
         if type == CompactType.TRUE:
@@ -50,6 +112,22 @@ class TAsyncioCompactProtocol(TCompactProtocol):
         return result
 
     async def _readVarint(self):
+        if self._peekable:
+            trans = self.trans
+            while True:
+                buf = trans.peek(MAX_VARINT_BYTES)
+                if buf and buf[0] < 0x80:
+                    trans.consume(1)
+                    return buf[0]
+                varint = decodeVarint(buf, 0)
+                if varint is not None:
+                    trans.consume(varint[1])
+                    return varint[0]
+                if len(buf) >= MAX_VARINT_BYTES:
+                    raise TProtocolException(
+                        TProtocolException.INVALID_DATA, "Varint is too long"
+                    )
+                await trans.fill()
         # This function is supposed to call readVarint, but I don't
         # understand the reasoning, why would you put a function
         # outside a class and make one and only one function inside
@@ -96,25 +174,41 @@ class TAsyncioCompactProtocol(TCompactProtocol):
         # however the sequence is actually signed...
         if seqid > 2147483647:
             seqid = -2147483648 - (2147483648 - seqid)
-        name = await self._readBinary().decode()
+        name = binary_to_str(await self._readBinary())
         return (name, type, seqid)
 
     async def readMessageEnd(self):
         super().readMessageEnd()
 
     async def readStructBegin(self):
-        super().readMessageBegin()
+        super().readStructBegin()
 
     async def readStructEnd(self):
         super().readStructEnd()
 
     async def readCollectionBegin(self):
         assert self.state in (VALUE_READ, CONTAINER_READ), self.state
+        if self._peekable:
+            # One size and type byte, then an optional size of up to
+            # five bytes.
+            buf = self.trans.peek(6)
+            if buf:
+                size, end = buf[0] >> 4, 1
+                if size == 15:
+                    varint = decodeVarint(buf, 1)
+                else:
+                    varint = (size, end)
+                if varint is not None:
+                    self.trans.consume(varint[1])
+                    return self._collectionBegin(buf[0], varint[0])
         size_type = await self._readUByte()
         size = size_type >> 4
-        type = await self._getTType(size_type)
         if size == 15:
             size = await self._readSize()
+        return self._collectionBegin(size_type, size)
+
+    def _collectionBegin(self, size_type, size):
+        type = self._getTType(size_type)
         self._check_container_length(size)
         self._containers.append(self.state)
         self.state = CONTAINER_READ
@@ -125,11 +219,26 @@ class TAsyncioCompactProtocol(TCompactProtocol):
 
     async def readMapBegin(self):
         assert self.state in (VALUE_READ, CONTAINER_READ), self.state
+        if self._peekable:
+            # A size of up to five bytes, then a types byte unless empty.
+            buf = self.trans.peek(6)
+            varint = decodeVarint(buf, 0)
+            if varint is not None:
+                size, end = varint
+                if size == 0:
+                    self.trans.consume(end)
+                    return self._mapBegin(size, 0)
+                if end < len(buf):
+                    self.trans.consume(end + 1)
+                    return self._mapBegin(size, buf[end])
         size = await self._readSize()
-        self._check_container_length(size)
         types = 0
         if size > 0:
             types = await self._readUByte()
+        return self._mapBegin(size, types)
+
+    def _mapBegin(self, size, types):
+        self._check_container_length(size)
         vtype = self._getTType(types)
         ktype = self._getTType(types >> 4)
         self._containers.append(self.state)
@@ -170,6 +279,9 @@ class TAsyncioCompactProtocol(TCompactProtocol):
 
     readBinary = reader(_readBinary)
 
+    async def readString(self):
+        return binary_to_str(await self.readBinary())
+
     async def skip(self, ttype):  # noqa
         if ttype == TType.BOOL:
             await self.readBool()
@@ -212,3 +324,52 @@ class TAsyncioCompactProtocol(TCompactProtocol):
             await self.readListEnd()
         else:
             raise TProtocolException(TProtocolException.INVALID_DATA, "invalid TType")
+
+
+class TAsyncioCompactProtocolFactory(TCompactProtocolFactory):
+    def getProtocol(self, trans):
+        return TAsyncioCompactProtocol(
+            trans, self.string_length_limit, self.container_length_limit
+        )
+
+
+class TAsyncioCompactProtocolAccelerated(TAsyncioCompactProtocol):
+    """C-Accelerated version of TAsyncioCompactProtocol.
+
+    See TAsyncioBinaryProtocolAccelerated.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fallback = kwargs.pop("fallback", True)
+        self._offload = kwargs.pop("offload", None)
+        super().__init__(*args, **kwargs)
+        try:
+            from thriftx.protocol import fastbinary
+        except ImportError:
+            if not fallback:
+                raise
+        else:
+            self._fast_decode = fastbinary.decode_compact
+            self._fast_encode = fastbinary.encode_compact
+
+
+class TAsyncioCompactProtocolAcceleratedFactory(TCompactProtocolFactory):
+    def __init__(
+        self,
+        string_length_limit=None,
+        container_length_limit=None,
+        fallback=True,
+        offload=None,
+    ):
+        super().__init__(string_length_limit, container_length_limit)
+        self._fallback = fallback
+        self._offload = offload
+
+    def getProtocol(self, trans):
+        return TAsyncioCompactProtocolAccelerated(
+            trans,
+            string_length_limit=self.string_length_limit,
+            container_length_limit=self.container_length_limit,
+            fallback=self._fallback,
+            offload=self._offload,
+        )
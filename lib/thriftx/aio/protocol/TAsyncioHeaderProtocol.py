@@ -0,0 +1,101 @@
+from thriftx.protocol.THeaderProtocol import THeaderProtocol, THeaderProtocolFactory
+from thriftx.Thrift import TApplicationException, TMessageType
+from thriftx.transport.THeaderTransport import THeaderClientType
+
+from ..transport.TAsyncioHeaderTransport import TAsyncioHeaderTransport
+
+
+class TAsyncioHeaderProtocol(THeaderProtocol):
+    """Asyncio version of THeaderProtocol.
+
+    readMessageBegin() awaits the whole frame, and the rest of the message
+    is then read synchronously from memory by the binary or compact
+    subprotocol, which decodes structs with fastbinary when it is
+    available. The read methods stay coroutines for the generated code.
+    Writes are synchronous until the transport is flushed.
+    """
+
+    def __init__(self, transport, allowed_client_types):
+        if not isinstance(transport, TAsyncioHeaderTransport):
+            transport = TAsyncioHeaderTransport(transport, allowed_client_types)
+        super(TAsyncioHeaderProtocol, self).__init__(transport, allowed_client_types)
+
+    async def readMessageBegin(self):
+        try:
+            await self.trans.readFrame(0)
+            self._set_protocol()
+        except TApplicationException as exc:
+            self._protocol.writeMessageBegin(b"", TMessageType.EXCEPTION, 0)
+            exc.write(self._protocol)
+            self._protocol.writeMessageEnd()
+            await self.trans.flush()
+
+        return self._protocol.readMessageBegin()
+
+    async def readMessageEnd(self):
+        return self._protocol.readMessageEnd()
+
+    async def readStructBegin(self):
+        return self._protocol.readStructBegin()
+
+    async def readStructEnd(self):
+        return self._protocol.readStructEnd()
+
+    async def readFieldBegin(self):
+        return self._protocol.readFieldBegin()
+
+    async def readFieldEnd(self):
+        return self._protocol.readFieldEnd()
+
+    async def readMapBegin(self):
+        return self._protocol.readMapBegin()
+
+    async def readMapEnd(self):
+        return self._protocol.readMapEnd()
+
+    async def readListBegin(self):
+        return self._protocol.readListBegin()
+
+    async def readListEnd(self):
+        return self._protocol.readListEnd()
+
+    async def readSetBegin(self):
+        return self._protocol.readSetBegin()
+
+    async def readSetEnd(self):
+        return self._protocol.readSetEnd()
+
+    async def readBool(self):
+        return self._protocol.readBool()
+
+    async def readByte(self):
+        return self._protocol.readByte()
+
+    async def readI16(self):
+        return self._protocol.readI16()
+
+    async def readI32(self):
+        return self._protocol.readI32()
+
+    async def readI64(self):
+        return self._protocol.readI64()
+
+    async def readDouble(self):
+        return self._protocol.readDouble()
+
+    async def readBinary(self):
+        return self._protocol.readBinary()
+
+    async def readString(self):
+        return self._protocol.readString()
+
+    async def skip(self, ttype):
+        self._protocol.skip(ttype)
+
+
+class TAsyncioHeaderProtocolFactory(THeaderProtocolFactory):
+    def __init__(self, allowed_client_types=(THeaderClientType.HEADERS,)):
+        super(TAsyncioHeaderProtocolFactory, self).__init__(allowed_client_types)
+
+    def getProtocol(self, trans):
+        return TAsyncioHeaderProtocol(trans, self.allowed_client_types)
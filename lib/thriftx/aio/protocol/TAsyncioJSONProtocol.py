@@ -0,0 +1,98 @@
+from thriftx.protocol.TJSONProtocol import TJSONProtocol, TJSONProtocolFactory
+from thriftx.transport.TTransport import CReadableTransport
+
+from ..transport.TAsyncioTransport import TAsyncioPeekableTransport
+
+
+class TAsyncioJSONProtocol(TJSONProtocol):
+    """Asyncio version of TJSONProtocol.
+
+    readMessageBegin() awaits the whole message, a frame or an HTTP body,
+    which is then parsed from memory in a single pass by a TJSONProtocol
+    reading through the bulk reader. The read methods stay coroutines for
+    the generated code. The transport must keep whole messages in memory,
+    by implementing both TAsyncioPeekableTransport and CReadableTransport
+    as TAsyncioFramedTransport does.
+    """
+
+    def __init__(self, trans):
+        if not (
+            isinstance(trans, TAsyncioPeekableTransport)
+            and isinstance(trans, CReadableTransport)
+        ):
+            raise TypeError(
+                "TAsyncioJSONProtocol needs a transport which reads whole "
+                "messages, such as TAsyncioFramedTransport"
+            )
+        super().__init__(trans)
+        self._protocol = TJSONProtocol(trans)
+
+    async def readMessageBegin(self):
+        if not self.trans.peek(1):
+            await self.trans.fill()
+        return self._protocol.readMessageBegin()
+
+    async def readMessageEnd(self):
+        return self._protocol.readMessageEnd()
+
+    async def readStructBegin(self):
+        return self._protocol.readStructBegin()
+
+    async def readStructEnd(self):
+        return self._protocol.readStructEnd()
+
+    async def readFieldBegin(self):
+        return self._protocol.readFieldBegin()
+
+    async def readFieldEnd(self):
+        return self._protocol.readFieldEnd()
+
+    async def readMapBegin(self):
+        return self._protocol.readMapBegin()
+
+    async def readMapEnd(self):
+        return self._protocol.readMapEnd()
+
+    async def readListBegin(self):
+        return self._protocol.readListBegin()
+
+    async def readListEnd(self):
+        return self._protocol.readListEnd()
+
+    async def readSetBegin(self):
+        return self._protocol.readSetBegin()
+
+    async def readSetEnd(self):
+        return self._protocol.readSetEnd()
+
+    async def readBool(self):
+        return self._protocol.readBool()
+
+    async def readByte(self):
+        return self._protocol.readByte()
+
+    async def readI16(self):
+        return self._protocol.readI16()
+
+    async def readI32(self):
+        return self._protocol.readI32()
+
+    async def readI64(self):
+        return self._protocol.readI64()
+
+    async def readDouble(self):
+        return self._protocol.readDouble()
+
+    async def readBinary(self):
+        return self._protocol.readBinary()
+
+    async def readString(self):
+        return self._protocol.readString()
+
+    async def skip(self, ttype):
+        self._protocol.skip(ttype)
+
+
+class TAsyncioJSONProtocolFactory(TJSONProtocolFactory):
+    def getProtocol(self, trans):
+        return TAsyncioJSONProtocol(trans)
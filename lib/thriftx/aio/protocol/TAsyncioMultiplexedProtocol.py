@@ -0,0 +1,21 @@
+from thriftx.protocol.TMultiplexedProtocol import SEPARATOR, TMultiplexedProtocol
+from thriftx.Thrift import TMessageType
+
+
+class TAsyncioMultiplexedProtocol(TMultiplexedProtocol):
+    """Asyncio version of TMultiplexedProtocol.
+
+    Wraps any asyncio protocol, prefixing the calls made through it with
+    the service name for TAsyncioMultiplexedProcessor. Writes are
+    synchronous, so only writeMessageBegin() is decorated.
+    """
+
+    def __init__(self, protocol, serviceName):
+        super(TAsyncioMultiplexedProtocol, self).__init__(protocol, serviceName)
+        self._prefix = serviceName + SEPARATOR
+
+    def writeMessageBegin(self, name, type, seqid):
+        if type == TMessageType.CALL or type == TMessageType.ONEWAY:
+            name = self._prefix + name
+        # Skip TMultiplexedProtocol, which would prefix the name again.
+        super(TMultiplexedProtocol, self).writeMessageBegin(name, type, seqid)
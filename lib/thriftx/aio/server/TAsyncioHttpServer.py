@@ -0,0 +1,162 @@
+import asyncio
+import logging
+
+from thriftx.Thrift import TMessageType
+from thriftx.protocol.TProtocol import TProtocolException
+from thriftx.server import TServer
+from thriftx.transport.TTransport import TTransportException
+
+from ..protocol.TAsyncioBinaryProtocol import TAsyncioBinaryProtocolFactory
+from ..transport.TAsyncioHttpClient import _missing_dep
+from ..transport.TAsyncioTransport import TAsyncioMemoryBuffer
+from .TAsyncioServer import _MessageEndProtocol, _log_process_error
+
+logger = logging.getLogger(__name__)
+
+
+try:
+    from aiohttp import web
+
+    class TAsyncioAiohttpHandler:
+        """aiohttp request handler running a Thrift processor per request.
+
+        usage:
+            app = web.Application()
+            app.router.add_post("/thrift", TAsyncioAiohttpHandler(processor).handle)
+
+        The server side of TAsyncioAiohttpClient. Every request body is
+        read at once and processed from memory, so requests are decoded
+        with fastbinary by accelerated protocols, and any number of
+        requests are processed concurrently. Oneway calls are answered as
+        soon as they have been read, without waiting for the handler.
+        Compressed request bodies are decompressed by aiohttp; with
+        compress set, responses of at least compress_min_size bytes are
+        gzip or deflate encoded for clients accepting it.
+        """
+
+        def __init__(
+            self,
+            processor,
+            inputProtocolFactory=None,
+            outputProtocolFactory=None,
+            compress=False,
+            compress_min_size=1024,
+        ):
+            if inputProtocolFactory is None:
+                inputProtocolFactory = TAsyncioBinaryProtocolFactory()
+            if outputProtocolFactory is None:
+                outputProtocolFactory = inputProtocolFactory
+            self.processor = processor
+            self.inputProtocolFactory = inputProtocolFactory
+            self.outputProtocolFactory = outputProtocolFactory
+            self.compress = compress
+            self.compress_min_size = compress_min_size
+
+        async def handle(self, request):
+            itrans = TAsyncioMemoryBuffer(await request.read())
+            otrans = TAsyncioMemoryBuffer()
+            iprot = _MessageEndProtocol(self.inputProtocolFactory.getProtocol(itrans))
+            oprot = self.outputProtocolFactory.getProtocol(otrans)
+
+            iprot.message_end = asyncio.get_event_loop().create_future()
+            task = asyncio.ensure_future(self.processor.process(iprot, oprot))
+            try:
+                await asyncio.wait(
+                    (iprot.message_end, task), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not task.done() and iprot.message_type == TMessageType.ONEWAY:
+                    # Nothing is sent back for a oneway call, so don't keep
+                    # the client waiting for the handler.
+                    task.add_done_callback(_log_process_error)
+                    return self._response(b"")
+                await task
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            except (TTransportException, TProtocolException, EOFError):
+                logger.debug("bad request", exc_info=True)
+                raise web.HTTPBadRequest()
+            return self._response(otrans.getvalue())
+
+        def _response(self, data):
+            response = web.Response(body=data, content_type="application/x-thrift")
+            if self.compress and len(data) >= self.compress_min_size:
+                response.enable_compression()
+            return response
+
+        # Register handle() with aiohttp, which warns about handlers that
+        # aren't coroutine functions.
+        __call__ = handle
+
+    class TAsyncioAiohttpServer(TServer.TServer):
+        """Asyncio HTTP server built on aiohttp.
+
+        Serves TAsyncioAiohttpHandler at path. Connections are kept alive
+        for keepalive_timeout seconds between requests. The
+        aiohttp.web.Application is available as ``app``, for adding
+        routes or middlewares before serving.
+        """
+
+        def __init__(
+            self,
+            processor,
+            server_address,
+            inputProtocolFactory=None,
+            outputProtocolFactory=None,
+            path="/",
+            compress=False,
+            compress_min_size=1024,
+            keepalive_timeout=75.0,
+            ssl_context=None,
+        ):
+            """Set up the handler and the aiohttp application.
+
+            server_address is a (host, port) tuple. To make a secure server,
+            provide an ssl.SSLContext as ssl_context.
+            """
+            handler = TAsyncioAiohttpHandler(
+                processor,
+                inputProtocolFactory,
+                outputProtocolFactory,
+                compress,
+                compress_min_size,
+            )
+            TServer.TServer.__init__(
+                self,
+                processor,
+                None,
+                None,
+                None,
+                handler.inputProtocolFactory,
+                handler.outputProtocolFactory,
+            )
+            self.server_address = server_address
+            self.app = web.Application()
+            self.app.router.add_post(path, handler.handle)
+            self._keepalive_timeout = keepalive_timeout
+            self._ssl_context = ssl_context
+            self._stopped = None
+
+        async def serve(self):
+            """Listen and serve requests until ``stop()`` is called."""
+            self._stopped = asyncio.get_event_loop().create_future()
+            runner = web.AppRunner(
+                self.app, keepalive_timeout=self._keepalive_timeout
+            )
+            await runner.setup()
+            try:
+                host, port = self.server_address
+                site = web.TCPSite(runner, host, port, ssl_context=self._ssl_context)
+                await site.start()
+                await self._stopped
+            finally:
+                await runner.cleanup()
+
+        def stop(self):
+            if self._stopped is not None and not self._stopped.done():
+                self._stopped.set_result(None)
+
+
+except ImportError:
+    TAsyncioAiohttpHandler = _missing_dep("Please install `aiohttp`")
+    TAsyncioAiohttpServer = TAsyncioAiohttpHandler
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from multiprocessing.connection import wait
+
+from .TAsyncioServer import TAsyncioServer
+
+logger = logging.getLogger(__name__)
+
+# Workers exiting sooner than this after being started are restarted with
+# a delay, so that a worker failing at startup doesn't fork in a loop.
+MIN_WORKER_LIFETIME = 1.0
+
+
+class TAsyncioProcessPoolServer(TAsyncioServer):
+    """Prefork server running a TAsyncioServer in every worker process.
+
+    usage:
+        transport = TAsyncioServerSocket(port=9090)
+        server = TAsyncioProcessPoolServer(processor, transport)
+        server.setNumWorkers(4)
+        server.serve()
+
+    Every worker has its own event loop and its own listening socket,
+    bound with SO_REUSEPORT, so the kernel spreads connections over the
+    workers. Workers that exit are restarted. On SIGTERM or SIGINT, or
+    when ``stop()`` is called, workers stop accepting connections and
+    exit once their requests have been answered, or after the drain
+    timeout. Unlike TAsyncioServer, ``serve()`` blocks and must be called
+    outside of an event loop. The server transport must listen on a fixed
+    TCP port.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.numWorkers = os.cpu_count() or 1
+        self.drainTimeout = None
+        self.workers = []
+        self.postForkCallback = None
+        self._wakeup = None
+
+    def setPostForkCallback(self, callback):
+        if not callable(callback):
+            raise TypeError("This is not a callback!")
+        self.postForkCallback = callback
+
+    def setNumWorkers(self, num):
+        """Set the number of worker processes that should be created"""
+        self.numWorkers = num
+
+    def setDrainTimeout(self, ms):
+        """Set how long workers may take to answer requests when stopping."""
+        self.drainTimeout = ms
+
+    def workerProcess(self):
+        """Serve connections until SIGTERM, then drain and exit."""
+        # The parent's handlers were inherited, and SIGINT is sent to the
+        # whole process group while the parent stops workers with SIGTERM.
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        for fd in self._wakeup:
+            os.close(fd)
+        self._wakeup = None
+        if self.postForkCallback:
+            self.postForkCallback()
+        try:
+            asyncio.run(self._serveWorker())
+        except Exception as x:
+            logger.exception(x)
+            sys.exit(1)
+
+    async def _serveWorker(self):
+        loop = asyncio.get_event_loop()
+        terminated = loop.create_future()
+
+        def terminate():
+            if not terminated.done():
+                terminated.set_result(None)
+
+        loop.add_signal_handler(signal.SIGTERM, terminate)
+        serving = asyncio.ensure_future(TAsyncioServer.serve(self))
+        await asyncio.wait((serving, terminated), return_when=asyncio.FIRST_COMPLETED)
+        if terminated.done():
+            await self.drain(self.drainTimeout)
+        await serving
+
+    def serve(self):
+        """Start the workers and restart them until stop() is called."""
+        self.serverTransport.reuse_port = True
+        self._wakeup = os.pipe()
+        handlers = {
+            signum: signal.signal(signum, lambda signum, frame: self.stop())
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            started = [self._startWorker() for i in range(self.numWorkers)]
+            # When to restart the workers that exited, by index.
+            restarts = {}
+            while True:
+                now = time.monotonic()
+                for i, when in list(restarts.items()):
+                    if when <= now:
+                        del restarts[i]
+                        self.workers[i].close()
+                        started[i] = self._startWorker(i)
+                timeout = None
+                if restarts:
+                    timeout = min(restarts.values()) - now
+                sentinels = [
+                    w.sentinel
+                    for i, w in enumerate(self.workers)
+                    if i not in restarts
+                ]
+                # stop() must not wait for the delayed restarts.
+                ready = wait([self._wakeup[0]] + sentinels, timeout)
+                if self._wakeup[0] in ready:
+                    break
+                for i, w in enumerate(self.workers):
+                    if i in restarts or w.is_alive():
+                        continue
+                    logger.warning(
+                        "worker %d exited with %s, restarting it", w.pid, w.exitcode
+                    )
+                    restarts[i] = started[i] + MIN_WORKER_LIFETIME
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+            self._stopWorkers()
+            for fd in self._wakeup:
+                os.close(fd)
+            self._wakeup = None
+
+    def _startWorker(self, index=None):
+        # Workers inherit the wakeup pipe and the state of the server, which
+        # other start methods, the default one since Python 3.14, don't do.
+        w = multiprocessing.get_context("fork").Process(target=self.workerProcess)
+        w.daemon = True
+        w.start()
+        if index is None:
+            self.workers.append(w)
+        else:
+            self.workers[index] = w
+        return time.monotonic()
+
+    def _stopWorkers(self):
+        for w in self.workers:
+            if w.is_alive():
+                os.kill(w.pid, signal.SIGTERM)
+        deadline = None
+        if self.drainTimeout is not None:
+            # Leave the workers some time to close their connections.
+            deadline = time.monotonic() + self.drainTimeout / 1000.0 + 5.0
+        for w in self.workers:
+            w.join(None if deadline is None else max(0, deadline - time.monotonic()))
+            if w.is_alive():
+                logger.warning("worker %d did not stop, killing it", w.pid)
+                w.kill()
+                w.join()
+        self.workers = []
+
+    def stop(self):
+        if self._wakeup is not None:
+            os.write(self._wakeup[1], b"x")
+        else:
+            # Called by drain() in a worker.
+            super().stop()
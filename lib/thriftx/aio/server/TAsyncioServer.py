@@ -0,0 +1,268 @@
+import asyncio
+import functools
+import logging
+
+from thriftx.protocol import TProtocolDecorator
+from thriftx.protocol.THeaderProtocol import THeaderProtocolFactory
+from thriftx.server import TServer
+from thriftx.transport import TTransport
+
+from ..protocol.TAsyncioBinaryProtocol import TAsyncioBinaryProtocolFactory
+
+logger = logging.getLogger(__name__)
+
+
+class _MessageEndProtocol(TProtocolDecorator.TProtocolDecorator):
+    """Resolves ``message_end`` once the processor has read a request.
+
+    With ``slots`` set, a slot is taken from that semaphore before the
+    handler runs, and ``message_end`` is only resolved once it is.
+    """
+
+    def __init__(self, protocol):
+        self.message_end = None
+        self.message_type = None
+        self.slots = None
+
+    async def readMessageBegin(self):
+        name, type, seqid = await super(_MessageEndProtocol, self).readMessageBegin()
+        self.message_type = type
+        return name, type, seqid
+
+    async def readMessageEnd(self):
+        await super(_MessageEndProtocol, self).readMessageEnd()
+        if self.slots is not None:
+            await self.slots.acquire()
+        if not self.message_end.done():
+            self.message_end.set_result(None)
+
+
+def _log_process_error(task):
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if isinstance(exc, TTransport.TTransportException):
+        logger.debug("client went away while processing", exc_info=exc)
+    elif exc is not None:
+        logger.error("thrift exception while processing", exc_info=exc)
+
+
+class TAsyncioServer(TServer.TServer):
+    """Asyncio server that awaits coroutine handlers.
+
+    Takes the same constructor forms as ``TServer``, with asyncio
+    transports and protocols in place of the sync ones; use
+    ``TAsyncioFramedTransportFactory`` for framed connections. As soon as
+    a request has been read off a connection, the next one is read while
+    the handler of the previous one is still running, so requests from a
+    single connection are processed concurrently and may be answered out
+    of order (replies carry the seqid of their request).
+
+    Resource use can be bounded with setMaxInflight(),
+    setWriteBufferLimits() and setMaxFrameSize(). A connection is not
+    read from while it has as many requests in flight as allowed, while
+    the server is at its total limit, or while more replies are waiting
+    to be written to it than the high water mark.
+
+    ``drain()`` stops the server gracefully, closing connections once the
+    requests read from them have been answered. Otherwise, the requests
+    still being handled when the server stops are cancelled.
+    """
+
+    def __init__(self, *args):
+        if len(args) == 2:
+            args += (
+                TTransport.TTransportFactoryBase(),
+                TAsyncioBinaryProtocolFactory(),
+            )
+        TServer.TServer.__init__(self, *args)
+        self._stopped = None
+        self._max_inflight = None
+        self._max_conn_inflight = None
+        self._write_buffer_limits = None
+        self._max_frame_size = None
+        self._slots = None
+        # The requests read from every connection and not yet answered.
+        self._connections = {}
+        # The tasks handling the connections.
+        self._handlers = set()
+        self._draining = False
+
+    def setMaxInflight(self, per_connection=None, total=None):
+        """Limit the number of requests being handled at once.
+
+        per_connection limits the requests of every connection, and total
+        those of the whole server. None means no limit.
+        """
+        self._max_conn_inflight = per_connection
+        self._max_inflight = total
+
+    def setWriteBufferLimits(self, high=None, low=None):
+        """Set the write buffer high and low water marks of connections.
+
+        Reading from a connection pauses while its write buffer holds more
+        than high bytes, until it has been written down to low bytes.
+        """
+        self._write_buffer_limits = (high, low)
+
+    def setMaxFrameSize(self, size):
+        """Refuse frames larger than size bytes, closing the connection.
+
+        The input transport must be framed, or THeaderProtocol be used.
+        """
+        self._max_frame_size = size
+
+    async def serve(self):
+        """Listen and serve connections until ``stop()`` is called.
+
+        Returns once every connection has been closed.
+        """
+        self._stopped = asyncio.get_event_loop().create_future()
+        self._draining = False
+        if self._max_inflight is not None:
+            self._slots = asyncio.Semaphore(self._max_inflight)
+        await self.serverTransport.listen(self.handle)
+        try:
+            await self._stopped
+        finally:
+            # Since Python 3.12, closing waits for the connections to close.
+            closing = asyncio.ensure_future(self.serverTransport.close())
+            try:
+                await self._closeConnections()
+            finally:
+                await closing
+
+    async def _closeConnections(self):
+        handlers = set(self._handlers)
+        if not handlers:
+            return
+        # drain() closes the connections itself.
+        if not self._draining:
+            for client, busy in list(self._connections.items()):
+                for task in busy:
+                    task.cancel()
+                # The connection's reader then stops on the closed transport.
+                await client.close()
+        await asyncio.wait(handlers)
+
+    def stop(self):
+        """Stop serving, cancelling the requests being handled."""
+        if self._stopped is not None and not self._stopped.done():
+            self._stopped.set_result(None)
+
+    async def drain(self, timeout=None):
+        """Stop serving, once the requests being handled are answered.
+
+        No more connections are accepted, and every connection is closed
+        as soon as the requests read from it have been answered. Requests
+        still being handled after timeout milliseconds are cancelled.
+        """
+        self._draining = True
+        self.stop()
+        connections = list(self._connections.items())
+        closing = [
+            asyncio.ensure_future(self._closeWhenIdle(client, busy))
+            for client, busy in connections
+        ]
+        if not closing:
+            return
+        _, late = await asyncio.wait(
+            closing, timeout=None if timeout is None else timeout / 1000.0
+        )
+        if late:
+            for _, busy in connections:
+                for task in busy:
+                    task.cancel()
+            await asyncio.wait(closing)
+
+    @staticmethod
+    async def _closeWhenIdle(client, busy):
+        while busy:
+            await asyncio.wait(set(busy))
+        # The connection's reader then stops on the closed transport.
+        await client.close()
+
+    async def handle(self, client):
+        if self._stopped is not None and self._stopped.done():
+            # Accepted while the server transport was closing.
+            await client.close()
+            return
+        loop = asyncio.get_event_loop()
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        itrans = self.inputTransportFactory.getTransport(client)
+        iprot = _MessageEndProtocol(self.inputProtocolFactory.getProtocol(itrans))
+
+        # for THeaderProtocol, we must use the same protocol instance for input
+        # and output so that the response is in the same dialect that the
+        # server detected the request was in.
+        if isinstance(self.inputProtocolFactory, THeaderProtocolFactory):
+            otrans = None
+            oprot = iprot
+        else:
+            otrans = self.outputTransportFactory.getTransport(client)
+            oprot = self.outputProtocolFactory.getProtocol(otrans)
+        pending = set()
+        iprot.slots = self._slots
+        conn_slots = None
+        if self._max_conn_inflight is not None:
+            conn_slots = asyncio.Semaphore(self._max_conn_inflight)
+
+        def release(message_end, task):
+            pending.discard(task)
+            busy.discard(task)
+            if conn_slots is not None:
+                conn_slots.release()
+            # The server slot is only taken once the request has been read.
+            if self._slots is not None and message_end.done():
+                self._slots.release()
+
+        busy = self._connections[client] = set()
+        try:
+            if self._max_frame_size is not None:
+                if not hasattr(iprot.trans, "set_max_frame_size"):
+                    raise TypeError(
+                        "setMaxFrameSize() needs a framed input transport, not %s"
+                        % type(iprot.trans).__name__
+                    )
+                iprot.trans.set_max_frame_size(self._max_frame_size)
+            if self._write_buffer_limits is not None:
+                client.setWriteBufferLimits(*self._write_buffer_limits)
+            while True:
+                if conn_slots is not None:
+                    await conn_slots.acquire()
+                if self._write_buffer_limits is not None:
+                    await client.drain()
+                iprot.message_end = loop.create_future()
+                task = asyncio.ensure_future(self.processor.process(iprot, oprot))
+                pending.add(task)
+                task.add_done_callback(functools.partial(release, iprot.message_end))
+                await asyncio.wait(
+                    (iprot.message_end, task), return_when=asyncio.FIRST_COMPLETED
+                )
+                if iprot.message_end.done():
+                    if not task.done():
+                        busy.add(task)
+                    task.add_done_callback(_log_process_error)
+                else:
+                    # The request could not be read, most likely because
+                    # the client has closed the connection.
+                    task.result()
+        except TTransport.TTransportException:
+            pass
+        except asyncio.CancelledError:
+            for task in pending:
+                task.cancel()
+            raise
+        except Exception as x:
+            logger.exception(x)
+        finally:
+            if pending:
+                await asyncio.wait(pending)
+            del self._connections[client]
+            try:
+                await itrans.close()
+                if otrans:
+                    await otrans.close()
+            finally:
+                self._handlers.discard(handler)
@@ -0,0 +1,63 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TAsyncioThreadPoolHandler:
+    """Runs the synchronous methods of a handler in thread pools.
+
+    usage:
+        handler = TAsyncioThreadPoolHandler(SyncHandler(), max_workers=16)
+        handler.setExecutor("report", ThreadPoolExecutor(2))
+        server = TAsyncioServer(MyService.Processor(handler), transport)
+
+    Coroutine methods of the handler are awaited in the event loop as
+    usual. Other methods are called in the executor set for them with
+    setExecutor(), or else in a pool of max_workers threads, so that a
+    synchronous handler doesn't block the loop and the connections it
+    serves. Calls see the context variables of the request, such as its
+    deadline. Awaitables and futures returned by the calls made in threads,
+    such as those of run_coroutine_threadsafe(), are awaited in the loop.
+    """
+
+    def __init__(self, handler, max_workers=None, executor=None):
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers, thread_name_prefix="thrift-handler"
+            )
+        self.handler = handler
+        self.executor = executor
+        self._executors = {}
+        self._methods = {}
+
+    def setExecutor(self, name, executor):
+        """Run the handler method name in executor."""
+        self._executors[name] = executor
+        self._methods.pop(name, None)
+
+    def __getattr__(self, name):
+        method = self._methods.get(name)
+        if method is None:
+            method = getattr(self.handler, name)
+            if callable(method) and not asyncio.iscoroutinefunction(method):
+                method = self._bridge(method, self._executors.get(name, self.executor))
+            self._methods[name] = method
+        return method
+
+    @staticmethod
+    def _bridge(method, executor):
+        async def call(*args):
+            context = contextvars.copy_context()
+            result = await asyncio.get_event_loop().run_in_executor(
+                executor, functools.partial(context.run, method, *args)
+            )
+            if isinstance(result, concurrent.futures.Future):
+                result = asyncio.wrap_future(result)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+        return call
@@ -0,0 +1,47 @@
+from thriftx.compat import BufferIO
+from thriftx.transport.THeaderTransport import I32, THeaderTransport
+from thriftx.transport.TTransport import TTransportException
+
+
+class TAsyncioHeaderTransport(THeaderTransport):
+    """Asyncio version of THeaderTransport.
+
+    A whole frame is read with a single await in readFrame(), after which
+    the message is read synchronously from memory, by TAsyncioHeaderProtocol
+    or by fastbinary through the CReadableTransport interface. Headers,
+    transforms and the framed binary/compact client types work as in
+    THeaderTransport. Unframed client types are not supported, as their
+    messages can't be read ahead of decoding them.
+    """
+
+    async def open(self):
+        return await self._transport.open()
+
+    async def close(self):
+        return await self._transport.close()
+
+    def read(self, sz):
+        # A message never spans frames, so this only reads from memory.
+        return self._read_buffer.read(sz)
+
+    async def readFrame(self, req_sz):
+        first_word = await self._transport.readAll(I32.size)
+        if self._detect_unframed(first_word):
+            raise TTransportException(
+                TTransportException.INVALID_CLIENT_TYPE,
+                "Unframed clients are not supported by TAsyncioHeaderTransport.",
+            )
+        frame_size = self._check_frame_size(first_word)
+        self._read_frame(BufferIO(await self._transport.readAll(frame_size)))
+
+    async def flush(self):
+        # The frame is built before the first await, so concurrent writers
+        # can't interleave their messages.
+        frame_bytes = self._frame_bytes()
+        self._transport.write(frame_bytes)
+        await self._transport.flush()
+
+    def cstringio_refill(self, partialread, reqlen):
+        # The next frame can't be awaited from C, and a message never spans
+        # frames, so running out of buffer means bad data.
+        raise EOFError()
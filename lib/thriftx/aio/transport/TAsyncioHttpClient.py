@@ -1,6 +1,14 @@
+import asyncio
 from io import BytesIO
 
-from .TAsyncioTransport import TAsyncioTransportBase
+from thriftx.compat import BufferIO
+from thriftx.transport.TTransport import CReadableTransport
+
+from .TAsyncioTransport import (
+    TAsyncioPeekableTransport,
+    TAsyncioTransportBase,
+    _oneway,
+)
 
 
 def _missing_dep(msg):
@@ -16,9 +24,21 @@ try:
     from aiohttp.resolver import AsyncResolver
 
     class TAsyncioAiohttpClient(TAsyncioTransportBase):
-        """Aiohttp implementation of asyncio http client."""
-
-        def __init__(self, url, session=None):
+        """Aiohttp implementation of asyncio http client.
+
+        limit, limit_per_host and keepalive_timeout configure the
+        connection pool of the session created by the client, and are
+        ignored if a session is given.
+        """
+
+        def __init__(
+            self,
+            url,
+            session=None,
+            limit=100,
+            limit_per_host=0,
+            keepalive_timeout=15.0,
+        ):
             self.url = url
             if session is None:
                 # Explicitly use async resolver to keep aiohttp from using
@@ -28,18 +48,28 @@ try:
                 # AsyncResolver has problems related to domains with IPv6.
                 # If you can't connect or network is unreachable try this
                 # solution: https://stackoverflow.com/a/48008873
-                tcp = TCPConnector(resolver=async_dns)
+                tcp = TCPConnector(
+                    resolver=async_dns,
+                    limit=limit,
+                    limit_per_host=limit_per_host,
+                    keepalive_timeout=keepalive_timeout,
+                )
                 self._session = ClientSession(connector=tcp)
             else:
                 self._session = session
 
             self._wbuf = BytesIO()
             self._http_response = None
+            # Responses are queued as they arrive so that concurrent calls
+            # from TAsyncioClient can be read one by one and matched back
+            # to their callers by seqid. Responses to oneway calls, which
+            # are never read, are dropped instead.
+            self._responses = asyncio.Queue()
             self._default_headers = {
                 "Content-Type": "application/x-thrift",
                 "User-Agent": "Python/TAsyncioAiohttpClient",
             }
-            self._custom_headers = self._headers
+            self._custom_headers = self._default_headers
 
         def setCustomHeaders(self, headers):
             self._custom_headers = {**self._default_headers, **headers}
@@ -48,24 +78,115 @@ try:
             self._wbuf.write(buf)
 
         async def read(self, sz):
-            return await self._http_response.content.read(sz)
+            while True:
+                if self._http_response is None:
+                    self._http_response = await self._responses.get()
+                data = await self._http_response.content.read(sz)
+                if data:
+                    return data
+                self._http_response.release()
+                self._http_response = None
 
         async def flush(self):
+            response = await self._post()
+            if _oneway.get():
+                # Nothing reads the responses to oneway calls.
+                try:
+                    await response.read()
+                finally:
+                    response.release()
+                return
+            self._responses.put_nowait(response)
+
+        async def _post(self):
             data = self._wbuf.getvalue()
             self._wbuf = BytesIO()
 
-            self._http_response = await self._session.post(
+            response = await self._session.post(
                 self.url, data=data, headers=self._custom_headers
             )
-            self.code = self._http_response.status
-            self.message = self._http_response.reason
-            self.headers = self._http_response.headers
+            self.code = response.status
+            self.message = response.reason
+            self.headers = response.headers
+            return response
 
         async def close(self):
             await self._session.close()
 
+    class TAsyncioAiohttpBufferedClient(
+        TAsyncioAiohttpClient, TAsyncioPeekableTransport, CReadableTransport
+    ):
+        """TAsyncioAiohttpClient reading each response body at once.
+
+        The whole body is read as soon as the response arrives, and the
+        connection goes straight back to the session's pool instead of
+        waiting for the protocol to read the last byte. Responses are then
+        read from memory, so accelerated protocols decode them with
+        fastbinary through the CReadableTransport interface.
+        """
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._body = b""
+            self._rbuf = BufferIO(self._body)
+
+        async def read(self, sz):
+            while True:
+                ret = self._rbuf.read(sz)
+                if len(ret) != 0:
+                    return ret
+                await self._readBody()
+
+        async def readAll(self, sz):
+            ret = self._rbuf.read(sz)
+            if len(ret) == sz:
+                return ret
+            return ret + await super().readAll(sz - len(ret))
+
+        async def _readBody(self):
+            self._body = await self._responses.get()
+            self._rbuf = BufferIO(self._body)
+
+        async def flush(self):
+            response = await self._post()
+            try:
+                body = await response.read()
+            finally:
+                response.release()
+            if not _oneway.get():
+                self._responses.put_nowait(body)
+
+        # Implement the TAsyncioPeekableTransport interface.
+        def peek(self, sz):
+            pos = self._rbuf.tell()
+            return self._body[pos : pos + sz]
+
+        def consume(self, sz):
+            self._rbuf.seek(sz, 1)
+
+        async def fill(self):
+            # A message never spans responses, so only an exhausted body
+            # can be followed by more data. Empty bodies, as sent back
+            # for oneway calls, are skipped.
+            if self._rbuf.read(1):
+                raise EOFError()
+            while self._rbuf.tell() == len(self._body):
+                await self._readBody()
+
+        # Implement the CReadableTransport interface.
+        @property
+        def cstringio_buf(self):
+            return self._rbuf
+
+        def cstringio_refill(self, partialread, reqlen):
+            # The next response can't be awaited from C, and a message
+            # never spans responses, so running out of buffer means bad
+            # data.
+            raise EOFError()
+
 
 except ImportError:
     TAsyncioAiohttpClient = _missing_dep(
         "Please install `aiohttp` and `aiodns` or `aiohttp[speedups]`"
     )
+    TAsyncioAiohttpBufferedClient = TAsyncioAiohttpClient
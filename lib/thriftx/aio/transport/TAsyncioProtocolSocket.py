@@ -0,0 +1,348 @@
+import asyncio
+import collections
+import logging
+import socket
+from struct import pack, unpack_from
+
+from thriftx.compat import BufferIO
+from thriftx.transport.THeaderTransport import HARD_MAX_FRAME_SIZE
+from thriftx.transport.TTransport import TTransportException
+
+from .TAsyncioSocket import TAsyncioServerSocket
+from .TAsyncioTransport import TAsyncioFramedTransport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER = 65536
+
+
+class _FramingProtocol(asyncio.BufferedProtocol):
+    """Receives straight into a bytearray and cuts it into frames.
+
+    Frames are split off in buffer_updated(), and the waiting reader is
+    only woken up once a whole frame has arrived.
+    """
+
+    def __init__(self, rbuf_size=DEFAULT_BUFFER, on_connect=None):
+        self.transport = None
+        self._rbuf_size = rbuf_size
+        self._rbuf = bytearray(rbuf_size)
+        # Unread bytes are self._rbuf[self._start:self._end].
+        self._start = 0
+        self._end = 0
+        # Bytes needed at self._start to complete the next frame.
+        self._need = 4
+        self.max_frame_size = HARD_MAX_FRAME_SIZE
+        self._frames = collections.deque()
+        self._waiter = None
+        self._exc = None
+        self._paused = False
+        self._drain_waiter = None
+        self._closed = asyncio.get_event_loop().create_future()
+        self._on_connect = on_connect
+        self._task = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        if self._on_connect is not None:
+            self._task = asyncio.ensure_future(self._on_connect(self))
+            self._task.add_done_callback(self._log_task_error)
+
+    def connection_lost(self, exc):
+        # Keep the error the connection was aborted for, if any.
+        if self._exc is None:
+            self._exc = TTransportException(
+                type=TTransportException.END_OF_FILE,
+                message="Connection closed",
+                inner=exc,
+            )
+        self._wake(self._waiter)
+        self._wake(self._drain_waiter)
+        if not self._closed.done():
+            self._closed.set_result(None)
+
+    def pause_writing(self):
+        self._paused = True
+
+    def resume_writing(self):
+        self._paused = False
+        self._wake(self._drain_waiter)
+        self._drain_waiter = None
+
+    def get_buffer(self, sizehint):
+        size = self._end - self._start
+        if self._start:
+            if size == 0 and len(self._rbuf) > self._rbuf_size:
+                # Let go of the memory taken by an oversized frame.
+                self._rbuf = bytearray(self._rbuf_size)
+            else:
+                # Move the partial frame to the front.
+                self._rbuf[:size] = self._rbuf[self._start : self._end]
+            self._start, self._end = 0, size
+        if len(self._rbuf) < self._need:
+            # Make room for the whole frame, so it is received in place.
+            self._rbuf.extend(bytes(self._need - len(self._rbuf)))
+        return memoryview(self._rbuf)[self._end :]
+
+    def buffer_updated(self, nbytes):
+        self._end += nbytes
+        start = self._start
+        end = self._end
+        with memoryview(self._rbuf) as view:
+            while end - start >= 4:
+                (sz,) = unpack_from("!i", view, start)
+                if sz < 0:
+                    self._abort(
+                        TTransportException(
+                            type=TTransportException.NEGATIVE_SIZE,
+                            message="Negative frame size",
+                        )
+                    )
+                    return
+                if sz > self.max_frame_size:
+                    # Refuse it before making room for it.
+                    self._abort(
+                        TTransportException(
+                            type=TTransportException.SIZE_LIMIT,
+                            message="Frame was too large.",
+                        )
+                    )
+                    return
+                if end - start - 4 < sz:
+                    self._need = sz + 4
+                    break
+                self._frames.append(view[start + 4 : start + 4 + sz].tobytes())
+                start += 4 + sz
+            else:
+                self._need = 4
+        self._start = start
+        if self._frames:
+            self._wake(self._waiter)
+
+    def eof_received(self):
+        # Have the transport closed, which ends in connection_lost().
+        return False
+
+    async def readFrame(self):
+        while not self._frames:
+            if self._exc is not None:
+                raise self._exc
+            self._waiter = asyncio.get_event_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._frames.popleft()
+
+    def writeFrame(self, buf):
+        self.transport.writelines((pack("!i", len(buf)), buf))
+
+    async def drain(self):
+        while self._paused:
+            if self._exc is not None:
+                raise self._exc
+            # Any number of writers may wait at once, so they share a
+            # future, shielded from the cancellation of any one of them.
+            if self._drain_waiter is None:
+                self._drain_waiter = asyncio.get_event_loop().create_future()
+            await asyncio.shield(self._drain_waiter)
+
+    async def close(self):
+        if self.transport is not None:
+            self.transport.close()
+            await asyncio.shield(self._closed)
+
+    def _abort(self, exc):
+        self._exc = exc
+        self.transport.abort()
+
+    @staticmethod
+    def _wake(waiter):
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    @staticmethod
+    def _log_task_error(task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("error handling connection", exc_info=task.exception())
+
+
+class TAsyncioProtocolSocket(TAsyncioFramedTransport):
+    """Framed socket transport built directly on asyncio.BufferedProtocol.
+
+    Speaks the same wire format as TAsyncioFramedTransport over a
+    TAsyncioSocket, so it must not be wrapped in another framed transport.
+    Data is received straight into a bytearray without StreamReader, frames
+    are split off as they arrive, and a reader is only woken up once its
+    frame is complete. It only uses the public event loop API, so it runs
+    unchanged under uvloop.
+    """
+
+    def __init__(
+        self,
+        host="localhost",
+        port=9090,
+        unix_socket=None,
+        socket_keepalive=False,
+        rbuf_size=DEFAULT_BUFFER,
+    ):
+        """Initialize a TAsyncioProtocolSocket
+
+        @param host(str)  The host to connect to.
+        @param port(int)  The (TCP) port to connect to.
+        @param unix_socket(str)  The filename of a unix socket to connect to.
+                                 (host and port will be ignored.)
+        @param socket_keepalive(bool) enable TCP keepalive, default off.
+        @param rbuf_size(int)  The initial size of the receive buffer.
+        """
+        # Frames come from the connection itself instead of a transport.
+        super().__init__(None)
+        self.host = host
+        self.port = port
+        self._unix_socket = unix_socket
+        self._socket_keepalive = socket_keepalive
+        self._rbuf_size = rbuf_size
+        self._timeout = None
+        self._protocol = None
+
+    def setConnection(self, protocol):
+        self._protocol = protocol
+        protocol.max_frame_size = self._max_frame_size
+
+    def set_max_frame_size(self, size):
+        super().set_max_frame_size(size)
+        if self._protocol is not None:
+            self._protocol.max_frame_size = size
+
+    def setWriteBufferLimits(self, high=None, low=None):
+        """Set the write buffer high and low water marks in bytes.
+
+        flush() and drain() wait while the write buffer holds more than
+        high bytes, until it has been written down to low bytes.
+        """
+        self._protocol.transport.set_write_buffer_limits(high, low)
+
+    async def drain(self):
+        """Wait until the write buffer is below its low water mark."""
+        await self._protocol.drain()
+
+    def setTimeout(self, ms):
+        """Set the connect timeout in milliseconds."""
+        if ms is None:
+            self._timeout = None
+        else:
+            self._timeout = ms / 1000.0
+
+    @property
+    def _address(self):
+        if self._unix_socket:
+            return self._unix_socket
+        return "%s:%d" % (self.host, self.port)
+
+    def isOpen(self):
+        return (
+            self._protocol is not None
+            and self._protocol.transport is not None
+            and not self._protocol.transport.is_closing()
+        )
+
+    async def open(self):
+        if self._protocol is not None:
+            raise TTransportException(
+                type=TTransportException.ALREADY_OPEN, message="already open"
+            )
+        loop = asyncio.get_event_loop()
+
+        def protocol_factory():
+            return _FramingProtocol(self._rbuf_size)
+
+        if self._unix_socket:
+            connect = loop.create_unix_connection(protocol_factory, self._unix_socket)
+        else:
+            connect = loop.create_connection(protocol_factory, self.host, self.port)
+        try:
+            transport, protocol = await asyncio.wait_for(connect, self._timeout)
+        except asyncio.TimeoutError as e:
+            msg = "Timed out connecting to %s" % self._address
+            raise TTransportException(
+                type=TTransportException.TIMED_OUT, message=msg, inner=e
+            )
+        except OSError as e:
+            msg = "Could not connect to %s" % self._address
+            logger.info(msg, exc_info=True)
+            raise TTransportException(
+                type=TTransportException.NOT_OPEN, message=msg, inner=e
+            )
+        self.setConnection(protocol)
+
+        if self._socket_keepalive and not self._unix_socket:
+            sock = transport.get_extra_info("socket")
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+    async def close(self):
+        if self._protocol is None:
+            return
+        protocol = self._protocol
+        self._protocol = None
+        await protocol.close()
+
+    async def readFrame(self):
+        if self._protocol is None:
+            raise TTransportException(
+                type=TTransportException.NOT_OPEN, message="Transport not open"
+            )
+        self._frame = await self._protocol.readFrame()
+        self._rbuf = BufferIO(self._frame)
+
+    async def flush(self):
+        if self._protocol is None:
+            raise TTransportException(
+                type=TTransportException.NOT_OPEN, message="Transport not open"
+            )
+        wout = self._wbuf.getvalue()
+        # reset wbuf before write/flush to preserve state on underlying failure
+        self._wbuf = BufferIO()
+        self._protocol.writeFrame(wout)
+        await self._protocol.drain()
+
+
+class TAsyncioProtocolServerSocket(TAsyncioServerSocket):
+    """Server transport handing out TAsyncioProtocolSocket connections.
+
+    Use it with TAsyncioServer and the default (non-framing) transport
+    factory, since connections are framed already.
+    """
+
+    def __init__(
+        self,
+        host=None,
+        port=9090,
+        unix_socket=None,
+        backlog=128,
+        rbuf_size=DEFAULT_BUFFER,
+    ):
+        super().__init__(host, port, unix_socket, backlog)
+        self._rbuf_size = rbuf_size
+
+    async def _start_server(self, on_accept):
+        loop = asyncio.get_event_loop()
+
+        async def accepted(protocol):
+            client = TAsyncioProtocolSocket(rbuf_size=self._rbuf_size)
+            client.setConnection(protocol)
+            await on_accept(client)
+
+        def protocol_factory():
+            return _FramingProtocol(self._rbuf_size, accepted)
+
+        if self._unix_socket:
+            return await loop.create_unix_server(
+                protocol_factory, self._unix_socket, backlog=self._backlog
+            )
+        return await loop.create_server(
+            protocol_factory,
+            self.host,
+            self.port,
+            backlog=self._backlog,
+            reuse_port=self.reuse_port or None,
+        )
@@ -0,0 +1,338 @@
+import asyncio
+import logging
+import ssl
+import threading
+import weakref
+from io import BytesIO
+
+from thriftx.transport.sslcompat import _match_hostname
+from thriftx.transport.TSSLSocket import TSSLBase
+from thriftx.transport.TTransport import TTransportException
+
+from .TAsyncioSocket import TAsyncioServerSocket, TAsyncioSocket
+from .TAsyncioTransport import TAsyncioTransportBase
+
+logger = logging.getLogger(__name__)
+
+# Contexts shared by all the transports with the same SSL options.
+_contexts = {}
+_contexts_lock = threading.Lock()
+
+# The sessions to resume, by context and server address.
+_sessions = weakref.WeakKeyDictionary()
+
+DEFAULT_HANDSHAKE_TIMEOUT = 60000
+
+
+def _shared_context(server_side, ssl_version, cert_reqs, *files):
+    """Return the SSLContext configured with the given options.
+
+    Loading certificates is costly, and sessions can only be resumed with
+    the context that created them, so it is done once per configuration.
+    """
+    key = (server_side, ssl_version, cert_reqs) + files
+    with _contexts_lock:
+        context = _contexts.get(key)
+        if context is None:
+            ca_certs, certfile, keyfile, ciphers = files
+            context = ssl.SSLContext(ssl_version)
+            if context.protocol == ssl.PROTOCOL_SSLv23:
+                context.options |= ssl.OP_NO_SSLv2
+                context.options |= ssl.OP_NO_SSLv3
+            context.verify_mode = cert_reqs
+            if certfile:
+                context.load_cert_chain(certfile, keyfile)
+            if ciphers:
+                context.set_ciphers(ciphers)
+            if ca_certs:
+                context.load_verify_locations(ca_certs)
+            _contexts[key] = context
+        return context
+
+
+def clearContextCache():
+    """Forget the shared contexts, to reload changed certificate files."""
+    with _contexts_lock:
+        _contexts.clear()
+
+
+class TAsyncioSSLBase(TSSLBase):
+    """TSSLBase using shared contexts, for asyncio transports."""
+
+    def __init__(self, server_side, host, ssl_opts):
+        self.executor = ssl_opts.pop("executor", None)
+        TSSLBase.__init__(self, server_side, host, ssl_opts)
+        if not self._custom_context:
+            self._context = _shared_context(
+                self._server_side,
+                self._ssl_version,
+                self.cert_reqs,
+                self.ca_certs,
+                self.certfile,
+                self.keyfile,
+                self.ciphers,
+            )
+
+    def _init_context(self, ssl_version):
+        # The context is looked up once all the options are known.
+        self._context = None
+        self._ssl_version = ssl_version
+
+    @property
+    def _should_verify(self):
+        if self._context is None:
+            return self.cert_reqs != ssl.CERT_NONE
+        return self._context.verify_mode != ssl.CERT_NONE
+
+
+class TAsyncioSSLSocket(TAsyncioSocket, TAsyncioSSLBase):
+    """SSL implementation of TAsyncioSocket.
+
+    usage:
+        transport = TAsyncioSSLSocket("example.com", 9090, ca_certs="ca.pem")
+        await transport.open()
+
+    Takes the keyword arguments of TSSLSocket, and executor, in which the
+    CPU heavy steps of handshakes are run, None being the default executor
+    of the event loop. Sockets with the same SSL options share one
+    SSLContext, and resume the last session established with the same
+    server when they connect, which saves the full handshake.
+    """
+
+    DEFAULT_BUFFSIZE = 65536
+
+    def __init__(self, host="localhost", port=9090, unix_socket=None, **kwargs):
+        socket_keepalive = kwargs.pop("socket_keepalive", False)
+        self._validate_callback = kwargs.pop("validate_callback", _match_hostname)
+        self.is_valid = False
+        self.peercert = None
+        TAsyncioSSLBase.__init__(self, False, host, kwargs)
+        TAsyncioSocket.__init__(self, host, port, unix_socket, socket_keepalive)
+        self._sslobj = None
+        self._session_saved = False
+
+    @property
+    def session_reused(self):
+        """Whether the session of the current connection was resumed."""
+        return self._sslobj is not None and self._sslobj.session_reused
+
+    @property
+    def _session_key(self):
+        return (self._server_hostname, self._address)
+
+    async def open(self):
+        await TAsyncioSocket.open(self)
+        sessions = _sessions.get(self.ssl_context, {})
+        try:
+            await asyncio.wait_for(
+                self.handshake(sessions.get(self._session_key)), self._timeout
+            )
+        except asyncio.TimeoutError as e:
+            await self._abort()
+            msg = "Timed out in SSL handshake with %s" % self._address
+            raise TTransportException(
+                type=TTransportException.TIMED_OUT, message=msg, inner=e
+            )
+        except Exception:
+            await self._abort()
+            raise
+        if self._should_verify:
+            self.peercert = self._sslobj.getpeercert()
+            try:
+                self._validate_callback(self.peercert, self._server_hostname)
+                self.is_valid = True
+            except Exception as ex:
+                await self._abort()
+                if isinstance(ex, TTransportException):
+                    raise
+                raise TTransportException(message=str(ex), inner=ex)
+
+    async def handshake(self, session=None):
+        """Establish the SSL connection over the open socket."""
+        self._incoming = ssl.MemoryBIO()
+        self._outgoing = ssl.MemoryBIO()
+        self._session_saved = False
+        self._sslobj = self.ssl_context.wrap_bio(
+            self._incoming,
+            self._outgoing,
+            server_side=self._server_side,
+            server_hostname=self._server_hostname,
+            session=session,
+        )
+        loop = asyncio.get_event_loop()
+        try:
+            while True:
+                try:
+                    # The ssl module releases the GIL while computing.
+                    await loop.run_in_executor(
+                        self.executor, self._sslobj.do_handshake
+                    )
+                    break
+                except ssl.SSLWantReadError:
+                    self._writeOutgoing()
+                    await self._readIncoming()
+            self._writeOutgoing()
+            await self._writer.drain()
+        except (ssl.SSLError, OSError, TTransportException) as e:
+            # Including the peer closing the connection in the middle.
+            msg = "SSL handshake with %s failed" % self._peer
+            raise TTransportException(
+                type=TTransportException.NOT_OPEN, message=msg, inner=e
+            )
+        self._saveSession()
+
+    @property
+    def _peer(self):
+        if self._server_side:
+            return self._writer.get_extra_info("peername")
+        return self._address
+
+    def _saveSession(self):
+        if self._server_side or self._session_saved:
+            return
+        # TLS 1.3 tickets arrive after the handshake, with the first reply.
+        session = self._sslobj.session
+        if session is not None and session.has_ticket:
+            _sessions.setdefault(self.ssl_context, {})[self._session_key] = session
+            self._session_saved = True
+
+    def _writeOutgoing(self):
+        if self._outgoing.pending:
+            self._writer.write(self._outgoing.read())
+
+    async def _readIncoming(self):
+        buff = await TAsyncioSocket.read(self, self.DEFAULT_BUFFSIZE)
+        self._incoming.write(buff)
+
+    async def _abort(self):
+        self._sslobj = None
+        await TAsyncioSocket.close(self)
+
+    async def close(self):
+        if self._sslobj is not None:
+            self._saveSession()
+            try:
+                self._sslobj.unwrap()
+            except ssl.SSLError:
+                # Don't wait for the close_notify of the peer.
+                pass
+            try:
+                self._writeOutgoing()
+            except (RuntimeError, OSError):
+                pass
+            self._sslobj = None
+        await TAsyncioSocket.close(self)
+
+    async def read(self, sz):
+        while True:
+            try:
+                buff = self._sslobj.read(sz)
+            except ssl.SSLWantReadError:
+                self._writeOutgoing()
+                await self._readIncoming()
+                continue
+            except ssl.SSLZeroReturnError:
+                buff = b""
+            except ssl.SSLError as e:
+                raise TTransportException(message="unexpected exception", inner=e)
+            # Reading can have to answer the peer, as to a TLS 1.3
+            # KeyUpdate, which must not wait for the next flush.
+            self._writeOutgoing()
+            if len(buff) == 0:
+                raise TTransportException(
+                    type=TTransportException.END_OF_FILE,
+                    message="TAsyncioSSLSocket read 0 bytes",
+                )
+            # Other connections can resume the session once it has a ticket.
+            self._saveSession()
+            return buff
+
+    readAll = TAsyncioTransportBase.readAll
+
+    async def flush(self):
+        if self._sslobj is None:
+            raise TTransportException(
+                type=TTransportException.NOT_OPEN, message="Transport not open"
+            )
+        data = self._wbuf.getvalue()
+        self._wbuf = BytesIO()
+        try:
+            self._sslobj.write(data)
+            self._writeOutgoing()
+            await self._writer.drain()
+        except (ssl.SSLError, OSError) as e:
+            raise TTransportException(message="unexpected exception", inner=e)
+
+
+class TAsyncioSSLServerSocket(TAsyncioServerSocket, TAsyncioSSLBase):
+    """SSL implementation of TAsyncioServerSocket.
+
+    usage:
+        transport = TAsyncioSSLServerSocket(port=9090, certfile="server.pem")
+        server = TAsyncioServer(processor, transport)
+
+    Takes the keyword arguments of TSSLServerSocket, and executor, in which
+    the CPU heavy steps of handshakes are run. Every connection shakes
+    hands in its own task, so a burst of new connections doesn't stall
+    the event loop nor the connections being accepted. Connections whose
+    handshake fails or doesn't complete in time are closed without being
+    handed to the server. All the connections share the context of the
+    server, and with it the keys of session tickets, so clients can resume
+    their sessions, including with the workers of a prefork server.
+    """
+
+    def __init__(self, host=None, port=9090, unix_socket=None, **kwargs):
+        if "ssl_context" not in kwargs:
+            # The same defaults as TSSLServerSocket.
+            kwargs.setdefault("cert_reqs", ssl.CERT_NONE)
+            kwargs.setdefault("certfile", "cert.pem")
+        backlog = kwargs.pop("backlog", 128)
+        self._validate_callback = kwargs.pop("validate_callback", _match_hostname)
+        TAsyncioSSLBase.__init__(self, True, None, kwargs)
+        TAsyncioServerSocket.__init__(self, host, port, unix_socket, backlog)
+        self._handshake_timeout = DEFAULT_HANDSHAKE_TIMEOUT / 1000.0
+
+    def setHandshakeTimeout(self, ms):
+        """Set how long clients may take to complete their handshake."""
+        if ms is None:
+            self._handshake_timeout = None
+        else:
+            self._handshake_timeout = ms / 1000.0
+
+    async def _start_server(self, on_accept):
+        async def accepted(client):
+            ssl_client = TAsyncioSSLSocket(
+                ssl_context=self.ssl_context, executor=self.executor
+            )
+            ssl_client._server_side = True
+            ssl_client._server_hostname = None
+            ssl_client.setStreams(client._reader, client._writer)
+            if not await self._handshake(ssl_client):
+                return
+            await on_accept(ssl_client)
+
+        return await super()._start_server(accepted)
+
+    async def _handshake(self, client):
+        peer = client._peer
+        try:
+            await asyncio.wait_for(client.handshake(), self._handshake_timeout)
+        except (asyncio.TimeoutError, TTransportException):
+            logger.info("SSL handshake with %s failed", peer, exc_info=True)
+            await client._abort()
+            return False
+        if self._should_verify:
+            client.peercert = client._sslobj.getpeercert()
+            try:
+                # Unix socket peers have no address to check.
+                self._validate_callback(client.peercert, peer and peer[0])
+                client.is_valid = True
+            except Exception:
+                logger.warning(
+                    "Failed to validate client certificate address: %s",
+                    peer,
+                    exc_info=True,
+                )
+                await client._abort()
+                return False
+        return True
@@ -0,0 +1,225 @@
+import asyncio
+import errno
+import logging
+import os
+import socket
+from io import BytesIO
+
+from thriftx.transport.TTransport import TTransportException
+
+from .TAsyncioTransport import TAsyncioTransportBase
+
+logger = logging.getLogger(__name__)
+
+
+class TAsyncioSocket(TAsyncioTransportBase):
+    """Socket implementation of asyncio transport layer.
+
+    Talks plain (unframed) Thrift over a TCP or Unix domain socket, so it
+    can be used against ``TSocket`` based servers directly, or wrapped in
+    ``TAsyncioFramedTransport`` for framed servers such as
+    ``TNonblockingServer``.
+    """
+
+    def __init__(
+        self, host="localhost", port=9090, unix_socket=None, socket_keepalive=False
+    ):
+        """Initialize a TAsyncioSocket
+
+        @param host(str)  The host to connect to.
+        @param port(int)  The (TCP) port to connect to.
+        @param unix_socket(str)  The filename of a unix socket to connect to.
+                                 (host and port will be ignored.)
+        @param socket_keepalive(bool) enable TCP keepalive, default off.
+        """
+        self.host = host
+        self.port = port
+        self._unix_socket = unix_socket
+        self._socket_keepalive = socket_keepalive
+        self._timeout = None
+        self._reader = None
+        self._writer = None
+        self._wbuf = BytesIO()
+
+    def setStreams(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+
+    def setTimeout(self, ms):
+        """Set the connect timeout in milliseconds."""
+        if ms is None:
+            self._timeout = None
+        else:
+            self._timeout = ms / 1000.0
+
+    def setWriteBufferLimits(self, high=None, low=None):
+        """Set the write buffer high and low water marks in bytes.
+
+        flush() and drain() wait while the write buffer holds more than
+        high bytes, until it has been written down to low bytes.
+        """
+        self._writer.transport.set_write_buffer_limits(high, low)
+
+    async def drain(self):
+        """Wait until the write buffer is below its low water mark."""
+        try:
+            await self._writer.drain()
+        except OSError as e:
+            raise TTransportException(message="unexpected exception", inner=e)
+
+    @property
+    def _address(self):
+        if self._unix_socket:
+            return self._unix_socket
+        return "%s:%d" % (self.host, self.port)
+
+    def isOpen(self):
+        return self._writer is not None and not self._writer.transport.is_closing()
+
+    async def open(self):
+        if self._writer is not None:
+            raise TTransportException(
+                type=TTransportException.ALREADY_OPEN, message="already open"
+            )
+        if self._unix_socket:
+            connect = asyncio.open_unix_connection(self._unix_socket)
+        else:
+            connect = asyncio.open_connection(self.host, self.port)
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                connect, self._timeout
+            )
+        except asyncio.TimeoutError as e:
+            msg = "Timed out connecting to %s" % self._address
+            raise TTransportException(
+                type=TTransportException.TIMED_OUT, message=msg, inner=e
+            )
+        except OSError as e:
+            msg = "Could not connect to %s" % self._address
+            logger.info(msg, exc_info=True)
+            raise TTransportException(
+                type=TTransportException.NOT_OPEN, message=msg, inner=e
+            )
+
+        if self._socket_keepalive and not self._unix_socket:
+            sock = self._writer.get_extra_info("socket")
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+    async def close(self):
+        if self._writer is None:
+            return
+        writer = self._writer
+        self._reader = self._writer = None
+        writer.close()
+        if hasattr(writer, "wait_closed"):
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def read(self, sz):
+        try:
+            buff = await self._reader.read(sz)
+        except OSError as e:
+            raise TTransportException(message="unexpected exception", inner=e)
+        if len(buff) == 0:
+            raise TTransportException(
+                type=TTransportException.END_OF_FILE,
+                message="TAsyncioSocket read 0 bytes",
+            )
+        return buff
+
+    async def readAll(self, sz):
+        # StreamReader already buffers, so let it assemble the bytes
+        # instead of looping over partial reads.
+        try:
+            return await self._reader.readexactly(sz)
+        except asyncio.IncompleteReadError as e:
+            raise TTransportException(
+                type=TTransportException.END_OF_FILE,
+                message="TAsyncioSocket read %d of %d bytes" % (len(e.partial), sz),
+            )
+        except OSError as e:
+            raise TTransportException(message="unexpected exception", inner=e)
+
+    def write(self, buf):
+        self._wbuf.write(buf)
+
+    async def flush(self):
+        if self._writer is None:
+            raise TTransportException(
+                type=TTransportException.NOT_OPEN, message="Transport not open"
+            )
+        data = self._wbuf.getvalue()
+        # reset wbuf before write/flush to preserve state on underlying failure
+        self._wbuf = BytesIO()
+        try:
+            self._writer.write(data)
+            await self._writer.drain()
+        except OSError as e:
+            raise TTransportException(message="unexpected exception", inner=e)
+
+
+class TAsyncioServerSocket:
+    """Socket implementation of asyncio server transport.
+
+    Unlike ``TServerSocket`` there is no blocking ``accept()``: the event
+    loop hands every accepted connection, wrapped in a ``TAsyncioSocket``,
+    to the callback given to ``listen()``. With ``reuse_port`` set, the
+    TCP port is bound with SO_REUSEPORT, so that several processes can
+    listen on it.
+    """
+
+    def __init__(self, host=None, port=9090, unix_socket=None, backlog=128):
+        self.host = host
+        self.port = port
+        self._unix_socket = unix_socket
+        self._backlog = backlog
+        self.reuse_port = False
+        self.handle = None
+
+    def setBacklog(self, backlog=None):
+        if not self.handle:
+            self._backlog = backlog
+        else:
+            # We cann't update backlog when it is already listening, since the
+            # handle has been created.
+            logger.warning("You have to set backlog before listen.")
+
+    async def listen(self, on_accept):
+        if self._unix_socket:
+            # We need remove the old unix socket if the file exists and
+            # nobody is listening on it.
+            tmp = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                tmp.connect(self._unix_socket)
+            except socket.error as err:
+                if err.errno == errno.ECONNREFUSED:
+                    os.unlink(self._unix_socket)
+            finally:
+                tmp.close()
+        self.handle = await self._start_server(on_accept)
+
+    async def _start_server(self, on_accept):
+        async def accepted(reader, writer):
+            client = TAsyncioSocket()
+            client.setStreams(reader, writer)
+            await on_accept(client)
+
+        if self._unix_socket:
+            return await asyncio.start_unix_server(
+                accepted, self._unix_socket, backlog=self._backlog
+            )
+        return await asyncio.start_server(
+            accepted,
+            self.host,
+            self.port,
+            backlog=self._backlog,
+            reuse_port=self.reuse_port or None,
+        )
+
+    async def close(self):
+        if self.handle:
+            self.handle.close()
+            await self.handle.wait_closed()
+            self.handle = None
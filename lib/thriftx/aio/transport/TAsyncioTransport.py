@@ -1,4 +1,13 @@
+import asyncio
+import contextvars
+from struct import pack, unpack
+
+from thriftx.compat import BufferIO
 from thriftx.transport import TTransport
+from thriftx.transport.THeaderTransport import HARD_MAX_FRAME_SIZE
+
+# Set while a oneway call is being sent, for TAsyncioBatchingTransport.
+_oneway = contextvars.ContextVar("thrift_oneway", default=False)
 
 
 class TAsyncioTransportBase(TTransport.TTransportBase):
@@ -17,21 +26,445 @@ class TAsyncioTransportBase(TTransport.TTransportBase):
         pass
 
     async def readAll(self, sz):
-        buff = b""
+        chunks = []
         have = 0
         while have < sz:
             chunk = await self.read(sz - have)
             chunkLen = len(chunk)
             have += chunkLen
-            buff += chunk
+            chunks.append(chunk)
 
             if chunkLen == 0:
                 raise EOFError()
 
-        return buff
+        return b"".join(chunks)
 
     def write(self, buf):
         pass
 
     async def flush(self):
         pass
+
+
+# This class should be thought of as an interface.
+class TAsyncioPeekableTransport:
+    """base class for asyncio transports that keep read data in memory
+
+    Protocols can decode small values straight out of the buffer with
+    peek() and consume(), and await fill() only when it runs dry.
+    """
+
+    def peek(self, sz):
+        """Returns up to sz buffered bytes without consuming them."""
+        pass
+
+    def consume(self, sz):
+        """Drops sz bytes previously returned by peek()."""
+        pass
+
+    async def fill(self):
+        """Reads more data into the buffer.
+
+        Raises EOFError if no more data can be buffered.
+        """
+        pass
+
+
+class TAsyncioMemoryBuffer(
+    TAsyncioTransportBase, TAsyncioPeekableTransport, TTransport.CReadableTransport
+):
+    """Asyncio version of TMemoryBuffer.
+
+    Reads never wait, and accelerated protocols decode the buffer with
+    fastbinary through the CReadableTransport interface.
+    """
+
+    def __init__(self, value=None, offset=0):
+        """value -- a value to read from for stringio
+
+        If value is set, this will be a transport for reading,
+        otherwise, it is for writing"""
+        if value is not None:
+            self._buffer = BufferIO(value)
+        else:
+            self._buffer = BufferIO()
+        if offset:
+            self._buffer.seek(offset)
+
+    def isOpen(self):
+        return not self._buffer.closed
+
+    async def close(self):
+        self._buffer.close()
+
+    async def read(self, sz):
+        return self._buffer.read(sz)
+
+    async def readAll(self, sz):
+        ret = self._buffer.read(sz)
+        if len(ret) != sz:
+            raise EOFError()
+        return ret
+
+    def write(self, buf):
+        self._buffer.write(buf)
+
+    def getvalue(self):
+        return self._buffer.getvalue()
+
+    # Implement the TAsyncioPeekableTransport interface.
+    def peek(self, sz):
+        pos = self._buffer.tell()
+        ret = self._buffer.read(sz)
+        self._buffer.seek(pos)
+        return ret
+
+    def consume(self, sz):
+        self._buffer.seek(sz, 1)
+
+    async def fill(self):
+        raise EOFError()
+
+    # Implement the CReadableTransport interface.
+    @property
+    def cstringio_buf(self):
+        return self._buffer
+
+    def cstringio_refill(self, partialread, reqlen):
+        # only one shot at reading...
+        raise EOFError()
+
+
+class TAsyncioBufferedTransportFactory(TTransport.TTransportFactoryBase):
+    """Factory transport that builds asyncio buffered transports."""
+
+    def getTransport(self, trans):
+        return TAsyncioBufferedTransport(trans)
+
+
+class TAsyncioBufferedTransport(TAsyncioTransportBase, TAsyncioPeekableTransport):
+    """Class that wraps another asyncio transport and buffers its I/O.
+
+    Reads ahead into a bytearray, so the small reads a protocol makes for
+    every primitive are served from memory without awaiting the underlying
+    transport. Reads larger than the buffer go straight to the underlying
+    transport and are joined once.
+    """
+
+    DEFAULT_BUFFER = 65536
+
+    def __init__(self, trans, rbuf_size=DEFAULT_BUFFER):
+        self._trans = trans
+        self._rbuf = bytearray()
+        self._rpos = 0
+        self._rbuf_size = rbuf_size
+        self._wbuf = BufferIO()
+
+    def isOpen(self):
+        return self._trans.isOpen()
+
+    async def open(self):
+        return await self._trans.open()
+
+    async def close(self):
+        return await self._trans.close()
+
+    async def read(self, sz):
+        if self._rpos == len(self._rbuf):
+            if sz >= self._rbuf_size:
+                return await self._trans.read(sz)
+            await self.fill()
+        return self._take(sz)
+
+    async def readAll(self, sz):
+        pos = self._rpos
+        end = pos + sz
+        if end <= len(self._rbuf):
+            self._rpos = end
+            return bytes(self._rbuf[pos:end])
+
+        chunks = [self._take(sz)]
+        have = len(chunks[0])
+        while have < sz:
+            need = sz - have
+            if need >= self._rbuf_size:
+                chunk = await self._trans.readAll(need)
+            else:
+                await self.fill()
+                chunk = self._take(need)
+            have += len(chunk)
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _take(self, sz):
+        pos = self._rpos
+        with memoryview(self._rbuf) as view:
+            ret = view[pos : pos + sz].tobytes()
+        self._rpos = pos + len(ret)
+        return ret
+
+    # Implement the TAsyncioPeekableTransport interface.
+    def peek(self, sz):
+        pos = self._rpos
+        return self._rbuf[pos : pos + sz]
+
+    def consume(self, sz):
+        self._rpos += sz
+
+    async def fill(self):
+        # Drop what has been consumed before reading ahead.
+        if self._rpos:
+            del self._rbuf[: self._rpos]
+            self._rpos = 0
+        chunk = await self._trans.read(self._rbuf_size)
+        if len(chunk) == 0:
+            raise EOFError()
+        self._rbuf += chunk
+
+    def write(self, buf):
+        try:
+            self._wbuf.write(buf)
+        except Exception as e:
+            # on exception reset wbuf so it doesn't contain a partial function call
+            self._wbuf = BufferIO()
+            raise e
+
+    async def flush(self):
+        out = self._wbuf.getvalue()
+        # reset wbuf before write/flush to preserve state on underlying failure
+        self._wbuf = BufferIO()
+        self._trans.write(out)
+        await self._trans.flush()
+
+
+class TAsyncioFramedTransportFactory(TTransport.TTransportFactoryBase):
+    """Factory transport that builds asyncio framed transports."""
+
+    def getTransport(self, trans):
+        return TAsyncioFramedTransport(trans)
+
+
+class TAsyncioFramedTransport(
+    TAsyncioTransportBase, TAsyncioPeekableTransport, TTransport.CReadableTransport
+):
+    """Class that wraps another asyncio transport and frames its I/O.
+
+    A whole frame is awaited at once and kept in memory, so accelerated
+    protocols can decode it synchronously through the CReadableTransport
+    interface. Frames larger than set_max_frame_size() are refused before
+    they are read.
+    """
+
+    def __init__(self, trans):
+        self._trans = trans
+        self._frame = b""
+        self._rbuf = BufferIO(self._frame)
+        self._wbuf = BufferIO()
+        self._max_frame_size = HARD_MAX_FRAME_SIZE
+
+    def set_max_frame_size(self, size):
+        if not 0 < size < HARD_MAX_FRAME_SIZE:
+            raise ValueError(
+                "maximum frame size should be < %d and > 0" % HARD_MAX_FRAME_SIZE
+            )
+        self._max_frame_size = size
+
+    def isOpen(self):
+        return self._trans.isOpen()
+
+    async def open(self):
+        return await self._trans.open()
+
+    async def close(self):
+        return await self._trans.close()
+
+    async def read(self, sz):
+        ret = self._rbuf.read(sz)
+        if len(ret) != 0:
+            return ret
+
+        await self.readFrame()
+        return self._rbuf.read(sz)
+
+    async def readAll(self, sz):
+        ret = self._rbuf.read(sz)
+        if len(ret) == sz:
+            return ret
+        return ret + await super().readAll(sz - len(ret))
+
+    async def readFrame(self):
+        buff = await self._trans.readAll(4)
+        (sz,) = unpack("!i", buff)
+        self._check_frame_size(sz)
+        self._frame = await self._trans.readAll(sz)
+        self._rbuf = BufferIO(self._frame)
+
+    def _check_frame_size(self, sz):
+        if sz < 0:
+            raise TTransport.TTransportException(
+                TTransport.TTransportException.NEGATIVE_SIZE, "Negative frame size"
+            )
+        if sz > self._max_frame_size:
+            raise TTransport.TTransportException(
+                TTransport.TTransportException.SIZE_LIMIT, "Frame was too large."
+            )
+
+    def write(self, buf):
+        self._wbuf.write(buf)
+
+    async def flush(self):
+        wout = self._wbuf.getvalue()
+        # reset wbuf before write/flush to preserve state on underlying failure
+        self._wbuf = BufferIO()
+        self._trans.write(pack("!i", len(wout)) + wout)
+        await self._trans.flush()
+
+    # Implement the TAsyncioPeekableTransport interface.
+    def peek(self, sz):
+        pos = self._rbuf.tell()
+        return self._frame[pos : pos + sz]
+
+    def consume(self, sz):
+        self._rbuf.seek(sz, 1)
+
+    async def fill(self):
+        # Values never span frames, so only an exhausted frame can be
+        # followed by more data.
+        if self._rbuf.read(1):
+            raise EOFError()
+        await self.readFrame()
+
+    # Implement the CReadableTransport interface.
+    @property
+    def cstringio_buf(self):
+        return self._rbuf
+
+    def cstringio_refill(self, partialread, reqlen):
+        # A message never spans frames and the next frame can't be
+        # awaited from C, so running out of buffer means bad data.
+        raise EOFError()
+
+
+class TAsyncioBatchingTransport(TAsyncioTransportBase):
+    """Class that wraps another asyncio transport and batches oneway calls.
+
+    usage:
+        socket = TAsyncioBatchingTransport(TAsyncioSocket(host, port))
+        client = MyService.Client(TAsyncioBinaryProtocol(
+            TAsyncioFramedTransport(socket)))
+
+    Flushing a oneway call only queues its message. Queued messages are
+    written together once max_bytes are queued, max_delay milliseconds
+    after the first one, right before any other message, or when
+    flushBatch() is awaited. Messages are simply concatenated, so it must
+    wrap a stream transport such as TAsyncioSocket, under the framing.
+
+    The callers of oneway calls have returned by the time their batch is
+    written in the background, so if that fails, the next flush raises a
+    TTransportException telling how many messages were lost, without
+    queuing or sending its own message. Writing flushes first wait for
+    the batch being written in the background.
+    """
+
+    def __init__(self, trans, max_bytes=65536, max_delay=5):
+        self._trans = trans
+        self._max_bytes = max_bytes
+        self._max_delay = max_delay / 1000.0
+        self._wbuf = BufferIO()
+        self._batch = []
+        self._batch_size = 0
+        self._timer = None
+        # The task writing the last expired batch.
+        self._flushing = None
+        self._error = None
+
+    def isOpen(self):
+        return self._trans.isOpen()
+
+    async def open(self):
+        return await self._trans.open()
+
+    async def close(self):
+        try:
+            await self.flushBatch()
+        finally:
+            if self._flushing is not None:
+                self._flushing.cancel()
+                self._flushing = None
+            await self._trans.close()
+
+    async def read(self, sz):
+        return await self._trans.read(sz)
+
+    async def readAll(self, sz):
+        return await self._trans.readAll(sz)
+
+    def write(self, buf):
+        self._wbuf.write(buf)
+
+    async def flush(self):
+        out = self._wbuf.getvalue()
+        self._wbuf = BufferIO()
+        # Fail before queuing, so that a message reported as failed is
+        # never sent by a later flush.
+        self._raiseError()
+        if out:
+            self._batch.append(out)
+            self._batch_size += len(out)
+        if _oneway.get() and self._batch_size < self._max_bytes:
+            if self._timer is None:
+                self._timer = asyncio.get_event_loop().call_later(
+                    self._max_delay, self._expired
+                )
+            return
+        await self.flushBatch()
+
+    async def flushBatch(self):
+        """Write every queued message now."""
+        await self._waitForBackground()
+        self._raiseError()
+        await self._writeBatch()
+
+    async def _waitForBackground(self):
+        # Without cancelling the write when the caller is cancelled.
+        while self._flushing is not None:
+            flushing = self._flushing
+            await asyncio.wait((flushing,))
+            if self._flushing is flushing:
+                self._flushing = None
+
+    def _raiseError(self):
+        # A failed background write is reported to the next writer.
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    async def _writeBatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._batch:
+            out = b"".join(self._batch)
+            self._batch = []
+            self._batch_size = 0
+            self._trans.write(out)
+        await self._trans.flush()
+
+    def _expired(self):
+        self._timer = None
+        # Kept, as the event loop only holds weak references to tasks.
+        self._flushing = asyncio.ensure_future(
+            self._writeInBackground(self._flushing, len(self._batch))
+        )
+
+    async def _writeInBackground(self, previous, count):
+        if previous is not None:
+            await asyncio.wait((previous,))
+        try:
+            await self._writeBatch()
+        except Exception as e:
+            self._error = TTransport.TTransportException(
+                type=getattr(e, "type", TTransport.TTransportException.UNKNOWN),
+                message="%d batched oneway messages could not be written" % count,
+                inner=e,
+            )
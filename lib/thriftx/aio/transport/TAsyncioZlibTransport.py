@@ -0,0 +1,167 @@
+import asyncio
+import zlib
+from struct import pack
+
+from thriftx.compat import BufferIO
+from thriftx.transport import TTransport
+from thriftx.transport.TZlibTransport import TZlibTransport
+
+from .TAsyncioTransport import TAsyncioTransportBase
+
+# The zlib stream header written before the first raw deflate block.
+ZLIB_HEADER = b"\x78\x9c"
+
+# The largest amount of data a stored deflate block can hold.
+MAX_STORED_BLOCK = 0xFFFF
+
+
+class TAsyncioZlibTransportFactory(TTransport.TTransportFactoryBase):
+    """Factory transport that builds asyncio zlib transports."""
+
+    def __init__(self, compresslevel=zlib.Z_DEFAULT_COMPRESSION, **kwargs):
+        self.compresslevel = compresslevel
+        self.kwargs = kwargs
+
+    def getTransport(self, trans):
+        return TAsyncioZlibTransport(trans, self.compresslevel, **self.kwargs)
+
+
+class TAsyncioZlibTransport(TAsyncioTransportBase):
+    """Asyncio version of TZlibTransport.
+
+    Speaks the same zlib stream as TZlibTransport, so either end may use
+    the sync or the asyncio version. Every flush is compressed as one
+    block, unless it is smaller than min_size bytes, in which case it is
+    written uncompressed, as a stored deflate block. Blocks of at least
+    offload_size bytes, or received chunks of at least offload_size
+    compressed bytes, are (de)compressed in executor, None being the
+    default executor of the event loop; zlib releases the GIL while it
+    works on them. Wrap it in TAsyncioFramedTransport to use accelerated
+    protocols.
+
+    The compression level defaults to the zlib default, which is much
+    faster than the level 9 of TZlibTransport for a similar ratio.
+    """
+
+    DEFAULT_BUFFSIZE = 65536
+
+    def __init__(
+        self,
+        trans,
+        compresslevel=zlib.Z_DEFAULT_COMPRESSION,
+        min_size=256,
+        offload_size=256 * 1024,
+        executor=None,
+    ):
+        self._trans = trans
+        self.compresslevel = compresslevel
+        self.min_size = min_size
+        self.offload_size = offload_size
+        self.executor = executor
+        self._rbuf = BufferIO()
+        self._wbuf = BufferIO()
+        self._write_lock = None
+        self._init_zlib()
+        self._init_stats()
+
+    def _init_zlib(self):
+        self._zcomp_read = zlib.decompressobj()
+        # Raw deflate, as the stream header is written once by hand.
+        self._zcomp_write = None
+        self._header_sent = False
+
+    def _init_stats(self):
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.bytes_in_comp = 0
+        self.bytes_out_comp = 0
+
+    getCompRatio = TZlibTransport.getCompRatio
+    getCompSavings = TZlibTransport.getCompSavings
+
+    def isOpen(self):
+        return self._trans.isOpen()
+
+    async def open(self):
+        self._init_stats()
+        return await self._trans.open()
+
+    async def close(self):
+        self._rbuf = BufferIO()
+        self._wbuf = BufferIO()
+        self._init_zlib()
+        return await self._trans.close()
+
+    async def read(self, sz):
+        ret = self._rbuf.read(sz)
+        # A chunk may only complete a block, without any data to return.
+        while not ret:
+            if not await self._readComp(sz):
+                # End of file, which readAll() turns into EOFError.
+                break
+            ret = self._rbuf.read(sz)
+        return ret
+
+    async def _readComp(self, sz):
+        zbuf = await self._trans.read(max(sz, self.DEFAULT_BUFFSIZE))
+        if not zbuf:
+            return False
+        if len(zbuf) >= self.offload_size:
+            buf = await asyncio.get_event_loop().run_in_executor(
+                self.executor, self._zcomp_read.decompress, zbuf
+            )
+        else:
+            buf = self._zcomp_read.decompress(zbuf)
+        self.bytes_in += len(zbuf)
+        self.bytes_in_comp += len(buf)
+        self._rbuf = BufferIO(self._rbuf.read() + buf)
+        return True
+
+    def write(self, buf):
+        self._wbuf.write(buf)
+
+    async def flush(self):
+        wout = self._wbuf.getvalue()
+        self._wbuf = BufferIO()
+        if wout:
+            # The compressor is shared by all writers and the blocks must
+            # be written in the order they are compressed.
+            if self._write_lock is None:
+                self._write_lock = asyncio.Lock()
+            async with self._write_lock:
+                zbuf = await self._compress(wout)
+                if not self._header_sent:
+                    zbuf = ZLIB_HEADER + zbuf
+                    self._header_sent = True
+                self.bytes_out += len(wout)
+                self.bytes_out_comp += len(zbuf)
+                self._trans.write(zbuf)
+        await self._trans.flush()
+
+    async def _compress(self, wout):
+        if len(wout) < self.min_size:
+            # Stored blocks start on the byte boundary left by the last
+            # sync flush. The compressor doesn't know about them, so its
+            # back references would be off: start a new one afterwards.
+            self._zcomp_write = None
+            with memoryview(wout) as view:
+                return b"".join(
+                    pack("<BHH", 0, len(chunk), len(chunk) ^ 0xFFFF) + chunk
+                    for chunk in (
+                        view[i : i + MAX_STORED_BLOCK].tobytes()
+                        for i in range(0, len(wout), MAX_STORED_BLOCK)
+                    )
+                )
+        if self._zcomp_write is None:
+            self._zcomp_write = zlib.compressobj(
+                self.compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS
+            )
+        if len(wout) >= self.offload_size:
+            return await asyncio.get_event_loop().run_in_executor(
+                self.executor, self._deflate, self._zcomp_write, wout
+            )
+        return self._deflate(self._zcomp_write, wout)
+
+    @staticmethod
+    def _deflate(zcomp, wout):
+        return zcomp.compress(wout) + zcomp.flush(zlib.Z_SYNC_FLUSH)
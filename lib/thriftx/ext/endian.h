@@ -20,6 +20,7 @@
 #ifndef THRIFT_PY_ENDIAN_H
 #define THRIFT_PY_ENDIAN_H
 
+#define PY_SSIZE_T_CLEAN
 #include <Python.h>
 
 #ifndef _WIN32
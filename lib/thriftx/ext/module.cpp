@@ -17,6 +17,7 @@
  * under the License.
  */
 
+#define PY_SSIZE_T_CLEAN
 #include <Python.h>
 #include "types.h"
 #include "binary.h"
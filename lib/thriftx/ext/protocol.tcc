@@ -277,7 +277,8 @@ bool ProtocolBase<Impl>::readBytes(char** output, int len) {
   } else {
     // using building functions as this is a rare codepath
     ScopedPyObject newiobuf(PyObject_CallFunction(input_.refill_callable.get(), refill_signature,
-                                                  *output, rlen, len, NULL));
+                                                  *output, static_cast<Py_ssize_t>(rlen), len,
+                                                  NULL));
     if (!newiobuf) {
       return false;
     }
@@ -20,6 +20,7 @@
 #ifndef THRIFT_PY_TYPES_H
 #define THRIFT_PY_TYPES_H
 
+#define PY_SSIZE_T_CLEAN
 #include <Python.h>
 
 #ifdef _MSC_VER
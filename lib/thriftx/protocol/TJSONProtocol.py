@@ -21,9 +21,11 @@ from .TProtocol import (TType, TProtocolBase, TProtocolException,
                         TProtocolFactory, checkIntegerLimits)
 import base64
 import math
+import re
 import sys
 
 from ..compat import str_to_binary
+from ..transport.TTransport import CReadableTransport
 
 
 __all__ = ['TJSONProtocol',
@@ -66,6 +68,9 @@ ESCAPE_CHARS = {
     b'/': '/',
 }
 NUMERIC_CHAR = b'+-.0123456789Ee'
+NUMERIC_CHARS = re.compile(b'[-+.0-9Ee]*')
+# The end of a string, or a character that needs the slow path.
+STRING_SPECIAL = re.compile(b'["\\\\\x00-\x1f]')
 
 CTYPES = {
     TType.BOOL: 'tf',
@@ -170,6 +175,94 @@ class LookaheadReader():
         self.hasData = True
         return self.data
 
+    def release(self):
+        pass
+
+
+class BulkReader():
+    """Reads straight out of the buffer of a CReadableTransport.
+
+    Strings without escapes and numbers are sliced out of the buffer
+    rather than read a character at a time. The transport's buffer is
+    refilled with cstringio_refill() when it runs dry, like fastbinary
+    does, and is only brought up to date with what has been read once a
+    whole message or struct has been read, see release().
+    """
+
+    def __init__(self, protocol):
+        self.protocol = protocol
+        self.buf = None
+        self.data = b''
+        self.pos = 0
+
+    def fill(self, sz):
+        """Makes at least sz bytes available from self.pos."""
+        if self.buf is None:
+            self.buf = self.protocol.trans.cstringio_buf
+            self.data = self.buf.getvalue()
+            self.pos = self.buf.tell()
+            if len(self.data) - self.pos >= sz:
+                return
+        partialread = self.data[self.pos:]
+        self.buf.seek(len(self.data))
+        self.buf = self.protocol.trans.cstringio_refill(partialread, sz)
+        self.data = self.buf.getvalue()
+        self.pos = self.buf.tell()
+
+    def read(self, sz=1):
+        if len(self.data) - self.pos < sz:
+            self.fill(sz)
+        pos = self.pos
+        self.pos = pos + sz
+        return self.data[pos:pos + sz]
+
+    def peek(self):
+        if self.pos >= len(self.data):
+            self.fill(1)
+        return self.data[self.pos:self.pos + 1]
+
+    def readSimpleString(self):
+        """Reads the rest of a string after its opening quote.
+
+        Returns None, having read nothing, if the string holds escapes or
+        control characters.
+        """
+        scanned = 0
+        while True:
+            match = STRING_SPECIAL.search(self.data, self.pos + scanned)
+            if match is not None:
+                break
+            scanned = len(self.data) - self.pos
+            self.fill(scanned + 1)
+        if match.group() != QUOTE:
+            return None
+        string = self.data[self.pos:match.start()]
+        self.pos = match.end()
+        if sys.version_info[0] > 2:
+            string = string.decode('utf8')
+        return string
+
+    def readNumericChars(self):
+        while True:
+            end = NUMERIC_CHARS.match(self.data, self.pos).end()
+            if end < len(self.data):
+                break
+            # The number may go on past the end of the buffer.
+            try:
+                self.fill(end - self.pos + 1)
+            except EOFError:
+                break
+        numeric = self.data[self.pos:end]
+        self.pos = end
+        return numeric.decode('ascii')
+
+    def release(self):
+        """Moves the transport's buffer past what has been read."""
+        if self.buf is not None:
+            self.buf.seek(self.pos)
+            self.buf = None
+            self.data = b''
+
 
 class TJSONProtocolBase(TProtocolBase):
 
@@ -193,7 +286,10 @@ class TJSONProtocolBase(TProtocolBase):
 
     def resetReadContext(self):
         self.resetWriteContext()
-        self.reader = LookaheadReader(self)
+        if isinstance(self.trans, CReadableTransport):
+            self.reader = BulkReader(self)
+        else:
+            self.reader = LookaheadReader(self)
 
     def pushContext(self, ctx):
         self.contextStack.append(ctx)
@@ -205,6 +301,9 @@ class TJSONProtocolBase(TProtocolBase):
             self.context = self.contextStack[-1]
         else:
             self.context = JSONBaseContext(self)
+        if len(self.contextStack) <= 1:
+            # A whole message or struct has been read (or written).
+            self.reader.release()
 
     def writeJSONString(self, string):
         self.context.write()
@@ -283,6 +382,10 @@ class TJSONProtocolBase(TProtocolBase):
         if skipContext is False:
             self.context.read()
         self.readJSONSyntaxChar(QUOTE)
+        if isinstance(self.reader, BulkReader):
+            simple = self.reader.readSimpleString()
+            if simple is not None:
+                return simple
         while True:
             character = self.reader.read()
             if character == QUOTE:
@@ -290,7 +393,10 @@ class TJSONProtocolBase(TProtocolBase):
             if ord(character) == ESCSEQ0:
                 character = self.reader.read()
                 if ord(character) == ESCSEQ1:
-                    character = self.trans.read(4).decode('ascii')
+                    if isinstance(self.reader, BulkReader):
+                        character = self.reader.read(4).decode('ascii')
+                    else:
+                        character = self.trans.read(4).decode('ascii')
                     codeunit = int(character, 16)
                     if self._isHighSurrogate(codeunit):
                         if highSurrogate:
@@ -337,6 +443,8 @@ class TJSONProtocolBase(TProtocolBase):
             self.readJSONSyntaxChar(QUOTE)
 
     def readJSONNumericChars(self):
+        if isinstance(self.reader, BulkReader):
+            return self.reader.readNumericChars()
         numeric = []
         while True:
             character = self.reader.peek()
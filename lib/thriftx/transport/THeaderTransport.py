@@ -179,17 +179,7 @@ class THeaderTransport(TTransportBase, CReadableTransport):
         # the first word could either be the length field of a framed message
         # or the first bytes of an unframed message.
         first_word = self._transport.readAll(I32.size)
-        frame_size, = I32.unpack(first_word)
-        is_unframed = False
-        if frame_size & TBinaryProtocol.VERSION_MASK == TBinaryProtocol.VERSION_1:
-            self._set_client_type(THeaderClientType.UNFRAMED_BINARY)
-            is_unframed = True
-        elif (byte_index(first_word, 0) == TCompactProtocol.PROTOCOL_ID and
-              byte_index(first_word, 1) & TCompactProtocol.VERSION_MASK == TCompactProtocol.VERSION):
-            self._set_client_type(THeaderClientType.UNFRAMED_COMPACT)
-            is_unframed = True
-
-        if is_unframed:
+        if self._detect_unframed(first_word):
             bytes_left_to_read = req_sz - I32.size
             if bytes_left_to_read > 0:
                 rest = self._transport.read(bytes_left_to_read)
@@ -199,13 +189,30 @@ class THeaderTransport(TTransportBase, CReadableTransport):
             return
 
         # ok, we're still here so we're framed.
+        frame_size = self._check_frame_size(first_word)
+        self._read_frame(BufferIO(self._transport.readAll(frame_size)))
+
+    def _detect_unframed(self, first_word):
+        frame_size, = I32.unpack(first_word)
+        if frame_size & TBinaryProtocol.VERSION_MASK == TBinaryProtocol.VERSION_1:
+            self._set_client_type(THeaderClientType.UNFRAMED_BINARY)
+            return True
+        elif (byte_index(first_word, 0) == TCompactProtocol.PROTOCOL_ID and
+              byte_index(first_word, 1) & TCompactProtocol.VERSION_MASK == TCompactProtocol.VERSION):
+            self._set_client_type(THeaderClientType.UNFRAMED_COMPACT)
+            return True
+        return False
+
+    def _check_frame_size(self, first_word):
+        frame_size, = I32.unpack(first_word)
         if frame_size > self._max_frame_size:
             raise TTransportException(
                 TTransportException.SIZE_LIMIT,
                 "Frame was too large.",
             )
-        read_buffer = BufferIO(self._transport.readAll(frame_size))
+        return frame_size
 
+    def _read_frame(self, read_buffer):
         # the next word is either going to be the version field of a
         # binary/compact protocol message or the magic value + flags of a
         # header protocol message.
@@ -285,10 +292,22 @@ class THeaderTransport(TTransportBase, CReadableTransport):
         self._write_buffer.write(buf)
 
     def flush(self):
+        # Transports not derived from TTransportBase may lack writev().
+        writev = getattr(self._transport, "writev", None)
+        if writev is not None:
+            writev(self._frame_buffers())
+        else:
+            self._transport.write(self._frame_bytes())
+        self._transport.flush()
+
+    def _frame_bytes(self):
+        return b"".join(self._frame_buffers())
+
+    def _frame_buffers(self):
+        """Frame the written payload, without copying it behind its header."""
         payload = self._write_buffer.getvalue()
         self._write_buffer = BufferIO()
 
-        buffer = BufferIO()
         if self._client_type == THeaderClientType.HEADERS:
             for transform_id in self._write_transforms:
                 transform_fn = WRITE_TRANSFORMS_BY_ID[transform_id]
@@ -310,18 +329,18 @@ class THeaderTransport(TTransportBase, CReadableTransport):
             headers.write(b"\x00" * padding_needed)
             header_bytes = headers.getvalue()
 
+            buffer = BufferIO()
             buffer.write(I32.pack(10 + len(header_bytes) + len(payload)))
             buffer.write(U16.pack(HEADER_MAGIC))
             buffer.write(U16.pack(self.flags))
             buffer.write(I32.pack(self.sequence_id))
             buffer.write(U16.pack(len(header_bytes) // 4))
             buffer.write(header_bytes)
-            buffer.write(payload)
+            frame_buffers = [buffer.getvalue(), payload]
         elif self._client_type in (THeaderClientType.FRAMED_BINARY, THeaderClientType.FRAMED_COMPACT):
-            buffer.write(I32.pack(len(payload)))
-            buffer.write(payload)
+            frame_buffers = [I32.pack(len(payload)), payload]
         elif self._client_type in (THeaderClientType.UNFRAMED_BINARY, THeaderClientType.UNFRAMED_COMPACT):
-            buffer.write(payload)
+            frame_buffers = [payload]
         else:
             raise TTransportException(
                 TTransportException.INVALID_CLIENT_TYPE,
@@ -329,16 +348,13 @@ class THeaderTransport(TTransportBase, CReadableTransport):
             )
 
         # the frame length field doesn't count towards the frame payload size
-        frame_bytes = buffer.getvalue()
-        frame_payload_size = len(frame_bytes) - 4
+        frame_payload_size = sum(len(buf) for buf in frame_buffers) - 4
         if frame_payload_size > self._max_frame_size:
             raise TTransportException(
                 TTransportException.SIZE_LIMIT,
                 "Attempting to send frame that is too large.",
             )
-
-        self._transport.write(frame_bytes)
-        self._transport.flush()
+        return frame_buffers
 
     @property
     def cstringio_buf(self):
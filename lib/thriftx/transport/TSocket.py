@@ -27,6 +27,9 @@ from .TTransport import TTransportBase, TTransportException, TServerTransportBas
 
 logger = logging.getLogger(__name__)
 
+# The most buffers writev() sends with one call, which POSIX always allows.
+IOV_MAX = 16
+
 
 class TSocketBase(TTransportBase):
     def _resolveAddr(self):
@@ -122,8 +125,15 @@ class TSocket(TSocketBase):
         raise TTransportException(type=TTransportException.NOT_OPEN, message=msg)
 
     def read(self, sz):
+        return self._recv(self.handle.recv, sz)
+
+    def readInto(self, buf):
+        """Receive into the writable buffer buf, returning the size received."""
+        return self._recv(self.handle.recv_into, buf)
+
+    def _recv(self, recv, arg):
         try:
-            buff = self.handle.recv(sz)
+            buff = recv(arg)
         except socket.error as e:
             if (e.args[0] == errno.ECONNRESET and
                     (sys.platform == 'darwin' or sys.platform.startswith('freebsd'))):
@@ -133,12 +143,12 @@ class TSocket(TSocketBase):
                 # in lib/cpp/src/transport/TSocket.cpp.
                 self.close()
                 # Trigger the check to raise the END_OF_FILE exception below.
-                buff = ''
+                buff = 0
             elif e.args[0] == errno.ETIMEDOUT:
                 raise TTransportException(type=TTransportException.TIMED_OUT, message="read timeout", inner=e)
             else:
                 raise TTransportException(message="unexpected exception", inner=e)
-        if len(buff) == 0:
+        if not buff:
             raise TTransportException(type=TTransportException.END_OF_FILE,
                                       message='TSocket read 0 bytes')
         return buff
@@ -160,6 +170,35 @@ class TSocket(TSocketBase):
             except socket.error as e:
                 raise TTransportException(message="unexpected exception", inner=e)
 
+    def writev(self, buffs):
+        """Write the buffers in the list buffs with as few calls as possible.
+
+        Sends them with a single sendmsg() call when it is available, so
+        that they don't have to be copied into one buffer beforehand.
+        """
+        if not self.handle:
+            raise TTransportException(type=TTransportException.NOT_OPEN,
+                                      message='Transport not open')
+        if not hasattr(self.handle, 'sendmsg'):
+            return self.write(b''.join(buffs))
+        buffs = [memoryview(buff) for buff in buffs if len(buff)]
+        while buffs:
+            try:
+                plus = self.handle.sendmsg(buffs[:IOV_MAX])
+            except NotImplementedError:
+                # SSL sockets, which encrypt a copy anyway.
+                return self.write(b''.join(buffs))
+            except socket.error as e:
+                raise TTransportException(message="unexpected exception", inner=e)
+            if plus == 0:
+                raise TTransportException(type=TTransportException.END_OF_FILE,
+                                          message='TSocket sent 0 bytes')
+            # Drop what was sent, which may end in the middle of a buffer.
+            while buffs and plus >= len(buffs[0]):
+                plus -= len(buffs.pop(0))
+            if plus:
+                buffs[0] = buffs[0][plus:]
+
     def flush(self):
         pass
 